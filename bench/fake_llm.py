@@ -0,0 +1,202 @@
+"""Scripted chat model that drives the supervisor and sub-agents without an API."""
+
+import asyncio
+import hashlib
+import itertools
+import json
+from typing import Any, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+_call_ids = itertools.count()
+
+
+def _tokens(text: str) -> int:
+    """Rough token estimate (4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def _tool_call(name: str, args: dict) -> dict:
+    return {
+        "name": name,
+        "args": args,
+        "id": f"call_{next(_call_ids)}",
+        "type": "tool_call",
+    }
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Fake LLM following a fixed ReAct script per agent.
+
+    The agent is recognised by its bound tools. The Supervisor delegates to
+    Confluence, Obsidian or both (in parallel) depending on the words "note"
+    and "both" in the user request; the Confluence agent searches then reads
+    a page; the Obsidian agent searches notes. Latency grows with output size.
+    Bound tool schemas count as prompt tokens ahead of the messages. Like a
+    provider prefix cache, prompt tokens up to the longest prefix seen before
+    are reported as cached.
+    """
+
+    latency: float = 0.2
+    latency_per_token: float = 0.002
+
+    _calls: int = PrivateAttr(default=0)
+    _input_tokens: int = PrivateAttr(default=0)
+    _output_tokens: int = PrivateAttr(default=0)
+    _cached_tokens: int = PrivateAttr(default=0)
+    _seen_prefixes: set = PrivateAttr(default_factory=set)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "calls": self._calls,
+            "input_tokens": self._input_tokens,
+            "output_tokens": self._output_tokens,
+            "cached_tokens": self._cached_tokens,
+        }
+
+    def bind_tools(self, tools: list, **kwargs: Any):
+        names = [t.name if hasattr(t, "name") else t["function"]["name"] for t in tools]
+        schemas = [
+            t if isinstance(t, dict) else convert_to_openai_tool(t) for t in tools
+        ]
+        return self.bind(tool_names=names, tool_tokens=_tokens(json.dumps(schemas)))
+
+    def _respond(
+        self, messages: list[BaseMessage], tool_names: Optional[list[str]]
+    ) -> AIMessage:
+        tool_names = tool_names or []
+        request = next(
+            (str(m.content) for m in reversed(messages) if isinstance(m, HumanMessage)),
+            "",
+        )
+        last_human = max(
+            (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)),
+            default=0,
+        )
+        observations = [m for m in messages[last_human:] if isinstance(m, ToolMessage)]
+
+        if "search_confluence" in tool_names:
+            if observations:
+                return AIMessage(
+                    content="Here is what I found:\n\n"
+                    + "\n\n".join(str(m.content)[:300] for m in observations)
+                )
+            lowered = request.lower()
+            calls = []
+            if "note" not in lowered or "both" in lowered:
+                calls.append(_tool_call("search_confluence", {"request": request}))
+            if "note" in lowered or "both" in lowered:
+                calls.append(_tool_call("manage_obsidian_notes", {"request": request}))
+            return AIMessage(content="", tool_calls=calls)
+
+        if "confluence_search" in tool_names:
+            if not observations:
+                return AIMessage(
+                    content="",
+                    tool_calls=[
+                        _tool_call("confluence_search", {"query": request[:80]})
+                    ],
+                )
+            if len(observations) == 1:
+                return AIMessage(
+                    content="",
+                    tool_calls=[_tool_call("confluence_get_page", {"page_id": "1"})],
+                )
+            return AIMessage(
+                content="According to Confluence: "
+                + str(observations[-1].content)[:400]
+            )
+
+        if "obsidian_global_search" in tool_names:
+            if not observations:
+                return AIMessage(
+                    content="",
+                    tool_calls=[
+                        _tool_call("obsidian_global_search", {"query": request[:80]})
+                    ],
+                )
+            return AIMessage(
+                content="Matching notes: " + str(observations[-1].content)[:400]
+            )
+
+        return AIMessage(content="Summary of the conversation so far.")
+
+    def _cached_prefix_tokens(
+        self, messages: list[BaseMessage], tool_names, tool_tokens: int
+    ) -> int:
+        prefix = hashlib.sha1(json.dumps(tool_names or []).encode())
+        cached, tokens, hit = (
+            0,
+            tool_tokens,
+            tool_names is None or prefix.hexdigest() in self._seen_prefixes,
+        )
+        if hit:
+            cached = tokens
+        else:
+            self._seen_prefixes.add(prefix.hexdigest())
+        for m in messages:
+            prefix.update(f"{m.type}:{m.content}".encode())
+            tokens += _tokens(str(m.content))
+            digest = prefix.hexdigest()
+            if hit and digest in self._seen_prefixes:
+                cached = tokens
+            else:
+                hit = False
+                self._seen_prefixes.add(digest)
+        return cached
+
+    def _generate_result(
+        self, messages: list[BaseMessage], tool_names, tool_tokens: int = 0
+    ) -> tuple[ChatResult, int]:
+        message = self._respond(messages, tool_names)
+        input_tokens = tool_tokens + sum(_tokens(str(m.content)) for m in messages)
+        cached_tokens = self._cached_prefix_tokens(messages, tool_names, tool_tokens)
+        output_tokens = _tokens(
+            str(message.content) + json.dumps([tc["args"] for tc in message.tool_calls])
+        )
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "input_token_details": {"cache_read": cached_tokens},
+        }
+
+        self._calls += 1
+        self._input_tokens += input_tokens
+        self._output_tokens += output_tokens
+        self._cached_tokens += cached_tokens
+        return ChatResult(generations=[ChatGeneration(message=message)]), output_tokens
+
+    def _generate(
+        self,
+        messages,
+        stop=None,
+        run_manager=None,
+        tool_names=None,
+        tool_tokens=0,
+        **kwargs,
+    ):
+        result, _ = self._generate_result(messages, tool_names, tool_tokens)
+        return result
+
+    async def _agenerate(
+        self,
+        messages,
+        stop=None,
+        run_manager=None,
+        tool_names=None,
+        tool_tokens=0,
+        **kwargs,
+    ):
+        result, output_tokens = self._generate_result(messages, tool_names, tool_tokens)
+        await asyncio.sleep(self.latency + self.latency_per_token * output_tokens)
+        return result
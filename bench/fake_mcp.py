@@ -0,0 +1,178 @@
+"""Stand-in Confluence and Obsidian MCP servers speaking streamable HTTP."""
+
+import argparse
+import asyncio
+import json
+
+from mcp.server.fastmcp import FastMCP
+
+PAGE_BODY = (
+    "## Deployment\n\n"
+    "Services are deployed with Helm from the `deploy` pipeline. Run `make release`, "
+    "wait for the canary stage and promote it in Argo CD.\n\n"
+    "## Rollback\n\n"
+    "Use `helm rollback <release> <revision>` and notify #ops.\n"
+)
+FILLER_SECTION = (
+    "<h2>Appendix {n}</h2><p>Historical notes on <strong>capacity planning</strong> for quarter {n}. "
+    'See the <a href="https://wiki.local/capacity">capacity dashboard</a>.</p>'
+    "<table><tr><th>Region</th><th>Nodes</th></tr><tr><td>eu-{n}</td><td>{n}</td></tr></table>"
+)
+NOTE_BODY = (
+    "---\ntags: [meeting, project]\n---\n"
+    "# {title}\n\n- Discussed the release plan\n- Action items: update the runbook\n"
+)
+
+
+# Further tools of a real Confluence MCP server, served with --extra-tools
+EXTRA_CONFLUENCE_TOOLS = [
+    ("confluence_get_page_children", "Get child pages of a Confluence page."),
+    ("confluence_get_comments", "Get comments of a Confluence page."),
+    ("confluence_get_labels", "Get labels of a Confluence page."),
+    ("confluence_add_label", "Add a label to a Confluence page."),
+    ("confluence_create_page", "Create a new Confluence page in a space."),
+    ("confluence_update_page", "Update the content of an existing Confluence page."),
+    ("confluence_delete_page", "Delete a Confluence page."),
+    (
+        "confluence_get_page_history",
+        "Get a historical version of a page, e.g. before a deployment or rollback.",
+    ),
+    ("confluence_search_user", "Search Confluence users, e.g. the owner of a service."),
+    ("confluence_list_spaces", "List Confluence spaces."),
+    ("confluence_add_comment", "Add a comment to a Confluence page."),
+    (
+        "confluence_get_attachments",
+        "List attachments of a page, such as deployment diagrams.",
+    ),
+]
+
+
+def _filler(size_kb: int) -> str:
+    """Storage format HTML of about ``size_kb`` kilobytes appended to every page."""
+    sections, size, n = [], 0, 0
+    while size < size_kb * 1024:
+        section = FILLER_SECTION.format(n=n)
+        sections.append(section)
+        size += len(section)
+        n += 1
+    return "".join(sections)
+
+
+def create_confluence_server(
+    latency: float, pages: int, page_kb: int = 0, extra_tools: int = 0
+) -> FastMCP:
+    server = FastMCP("fake-confluence", log_level="WARNING")
+    filler = _filler(page_kb)
+
+    for name, description in EXTRA_CONFLUENCE_TOOLS[:extra_tools]:
+
+        async def extra(page_id: str = "", query: str = "") -> str:
+            await asyncio.sleep(latency)
+            return "{}"
+
+        server.add_tool(extra, name=name, description=description)
+
+    @server.tool()
+    async def confluence_search(query: str, limit: int = 10) -> str:
+        """Search Confluence pages with text or CQL."""
+        await asyncio.sleep(latency)
+        return json.dumps(
+            [
+                {
+                    "id": str(i),
+                    "title": f"Service {i} deployment guide",
+                    "url": f"https://wiki.local/{i}",
+                    "space": {"key": "ENG"},
+                    "version": {"number": 1},
+                    "updated": "2026-01-01T10:00:00+00:00",
+                    "content": {"value": f"How to deploy service {i} ({query})"},
+                }
+                for i in range(min(limit, pages))
+            ]
+        )
+
+    @server.tool()
+    async def confluence_get_page(
+        page_id: str, include_metadata: bool = True, convert_to_markdown: bool = True
+    ) -> str:
+        """Get a Confluence page by ID."""
+        await asyncio.sleep(latency)
+        return json.dumps(
+            {
+                "metadata": {
+                    "id": page_id,
+                    "title": f"Service {page_id} deployment guide",
+                    "url": f"https://wiki.local/{page_id}",
+                    "version": {"number": 1},
+                },
+                "content": {
+                    "value": f"# Service {page_id} deployment guide\n\n{PAGE_BODY}{filler}"
+                },
+            }
+        )
+
+    return server
+
+
+def create_obsidian_server(latency: float, notes: int) -> FastMCP:
+    server = FastMCP("fake-obsidian", log_level="WARNING")
+
+    @server.tool()
+    async def obsidian_global_search(query: str) -> str:
+        """Search all notes in the vault."""
+        await asyncio.sleep(latency)
+        return json.dumps(
+            [
+                {"path": f"Meetings/meeting-{i}.md", "matches": [f"... {query} ..."]}
+                for i in range(min(5, notes))
+            ]
+        )
+
+    @server.tool()
+    async def obsidian_read_note(path: str) -> str:
+        """Read a note from the vault."""
+        await asyncio.sleep(latency)
+        return NOTE_BODY.format(title=path.rsplit("/", 1)[-1].removesuffix(".md"))
+
+    @server.tool()
+    async def obsidian_update_note(path: str, content: str) -> str:
+        """Create or overwrite a note in the vault."""
+        await asyncio.sleep(latency)
+        return f"Note {path} updated ({len(content)} chars)"
+
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("kind", choices=["confluence", "obsidian"])
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Seconds per tool call"
+    )
+    parser.add_argument(
+        "--documents", type=int, default=20, help="Pages or notes to serve"
+    )
+    parser.add_argument(
+        "--page-kb",
+        type=int,
+        default=0,
+        help="HTML appended to each Confluence page, in KB",
+    )
+    parser.add_argument(
+        "--extra-tools", type=int, default=0, help="Further Confluence tools to serve"
+    )
+    args = parser.parse_args()
+
+    if args.kind == "confluence":
+        server = create_confluence_server(
+            args.latency, args.documents, args.page_kb, args.extra_tools
+        )
+    else:
+        server = create_obsidian_server(args.latency, args.documents)
+    server.settings.port = args.port
+    server.run(transport="streamable-http")
+
+
+if __name__ == "__main__":
+    main()
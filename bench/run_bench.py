@@ -0,0 +1,287 @@
+"""Load test SupervisorSystem against fake MCP servers and a scripted LLM.
+
+Example:
+    python bench/run_bench.py --concurrency 8 --turns 5 --llm-latency 0.2 --mcp-latency 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(BENCH_DIR))
+
+from agents.supervisor_graph import SupervisorSystem  # noqa: E402
+from config.settings import settings  # noqa: E402
+from fake_llm import ScriptedChatModel  # noqa: E402
+
+REQUESTS = [
+    "How do we deploy the payments service?",
+    "Find my notes about the release meeting",
+    "What is the rollback procedure for the auth service?",
+    "Check both the deployment guide and my notes on the canary rollout",
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, process: subprocess.Popen, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Fake MCP server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"Fake MCP server on port {port} did not start")
+
+
+@contextmanager
+def fake_mcp_servers(
+    latency: float, documents: int, page_kb: int = 0, extra_tools: int = 0
+):
+    """Start the fake Confluence and Obsidian servers and yield their URLs."""
+    processes, urls = [], {}
+    try:
+        for kind in ("confluence", "obsidian"):
+            port = _free_port()
+            command = [
+                sys.executable,
+                str(BENCH_DIR / "fake_mcp.py"),
+                kind,
+                "--port",
+                str(port),
+                "--latency",
+                str(latency),
+                "--documents",
+                str(documents),
+            ]
+            if kind == "confluence":
+                command += [
+                    "--page-kb",
+                    str(page_kb),
+                    "--extra-tools",
+                    str(extra_tools),
+                ]
+            process = subprocess.Popen(command)
+            processes.append(process)
+            _wait_for_port(port, process)
+            urls[kind] = f"http://127.0.0.1:{port}/mcp"
+        yield urls
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+async def _worker(
+    system: SupervisorSystem,
+    worker_id: int,
+    turns: int,
+    latencies: list[float],
+    failures: list[str],
+):
+    thread_id = f"bench-{worker_id}-{uuid.uuid4().hex[:8]}"
+    for turn in range(turns):
+        request = REQUESTS[(worker_id + turn) % len(REQUESTS)]
+        started = time.perf_counter()
+        try:
+            result = await system.run(request, thread_id)
+            while result["status"] == "pending_approval":
+                result = await system.resume_after_approval(thread_id, approved=True)
+            if result["status"] != "complete":
+                failures.append(
+                    f"{thread_id}: {result['status']}: {result.get('content')}"
+                )
+        except Exception as e:
+            failures.append(f"{thread_id}: {e!r}")
+        latencies.append(time.perf_counter() - started)
+
+
+async def run_benchmark(args, urls: dict, data_dir: str) -> dict:
+    settings.CONFLUENCE_MCP_URL = urls["confluence"]
+    settings.OBSIDIAN_MCP_URL = urls["obsidian"]
+    settings.SYSTEM_PROMPT_DIR = str(ROOT / "src" / "prompts")
+    settings.ENABLE_HUMAN_APPROVAL = args.hitl
+    settings.RESPONSE_CACHE_ENABLED = args.response_cache
+    settings.CHECKPOINT_BACKEND = args.checkpoint_backend
+    settings.CHECKPOINT_SQLITE_PATH = str(Path(data_dir) / "checkpoints.sqlite")
+    settings.BLOB_STORE_PATH = str(Path(data_dir) / "blobs")
+    settings.OBSIDIAN_VAULT_PATH = None
+    settings.CONFLUENCE_MIRROR_SPACES = ""
+    if args.tool_selection_top_k is not None:
+        settings.TOOL_SELECTION_TOP_K = args.tool_selection_top_k
+
+    llm = ScriptedChatModel(
+        latency=args.llm_latency, latency_per_token=args.llm_latency_per_token
+    )
+    system = SupervisorSystem(llm=llm)
+
+    started = time.perf_counter()
+    await system.initialize()
+    init_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await system._ensure_graph()
+    graph_build_seconds = time.perf_counter() - started
+
+    latencies: list[float] = []
+    failures: list[str] = []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _worker(system, worker_id, args.turns, latencies, failures)
+            for worker_id in range(args.concurrency)
+        )
+    )
+    wall_seconds = time.perf_counter() - started
+
+    if hasattr(system.checkpointer, "close"):
+        system.checkpointer.close()
+
+    requests = len(latencies)
+    stats = llm.stats
+    return {
+        "concurrency": args.concurrency,
+        "requests": requests,
+        "failures": len(failures),
+        "init_seconds": round(init_seconds, 4),
+        "graph_build_seconds": round(graph_build_seconds, 4),
+        "latency_p50": round(percentile(latencies, 50), 4),
+        "latency_p95": round(percentile(latencies, 95), 4),
+        "latency_p99": round(percentile(latencies, 99), 4),
+        "latency_mean": round(sum(latencies) / requests, 4) if requests else 0.0,
+        "throughput_rps": round(requests / wall_seconds, 3) if wall_seconds else 0.0,
+        "llm_calls_per_request": round(stats["calls"] / requests, 2)
+        if requests
+        else 0.0,
+        "input_tokens_per_request": round(stats["input_tokens"] / requests, 1)
+        if requests
+        else 0.0,
+        "output_tokens_per_request": round(stats["output_tokens"] / requests, 1)
+        if requests
+        else 0.0,
+        "prefix_cache_hit_ratio": round(
+            stats["cached_tokens"] / stats["input_tokens"], 3
+        )
+        if stats["input_tokens"]
+        else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "failure_samples": failures[:5],
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark SupervisorSystem with fake LLM and MCP servers"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Concurrent conversation threads"
+    )
+    parser.add_argument("--turns", type=int, default=5, help="Turns per thread")
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.2, help="Seconds per LLM call"
+    )
+    parser.add_argument(
+        "--llm-latency-per-token",
+        type=float,
+        default=0.002,
+        help="Extra seconds per generated token",
+    )
+    parser.add_argument(
+        "--mcp-latency", type=float, default=0.05, help="Seconds per MCP tool call"
+    )
+    parser.add_argument(
+        "--documents",
+        type=int,
+        default=20,
+        help="Pages/notes served by fake MCP servers",
+    )
+    parser.add_argument(
+        "--page-kb", type=int, default=0, help="Extra HTML per Confluence page, in KB"
+    )
+    parser.add_argument(
+        "--extra-tools",
+        type=int,
+        default=0,
+        help="Further tools served by fake Confluence",
+    )
+    parser.add_argument(
+        "--tool-selection-top-k", type=int, help="Override TOOL_SELECTION_TOP_K"
+    )
+    parser.add_argument(
+        "--hitl", action="store_true", help="Enable human approval and auto-approve"
+    )
+    parser.add_argument(
+        "--response-cache",
+        action="store_true",
+        help="Enable the sub-agent response cache",
+    )
+    parser.add_argument(
+        "--checkpoint-backend", choices=["memory", "sqlite"], default="memory"
+    )
+    parser.add_argument(
+        "--json", dest="json_path", help="Also write the report as JSON to this file"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as data_dir, fake_mcp_servers(
+        args.mcp_latency, args.documents, args.page_kb, args.extra_tools
+    ) as urls:
+        report = asyncio.run(run_benchmark(args, urls, data_dir))
+
+    width = max(len(key) for key in report)
+    for key, value in report.items():
+        if key != "failure_samples":
+            print(f"{key:<{width}}  {value}")
+    for sample in report["failure_samples"]:
+        print(f"failure: {sample}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    exit(main())
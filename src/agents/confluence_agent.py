@@ -1,31 +1,102 @@
-import os
+import asyncio
+from typing import Optional, Sequence
 
 from langchain.agents import create_agent
+from langchain.tools import tool
 from langchain_core.language_models import BaseChatModel
-from langchain.agents.middleware import ToolRetryMiddleware
+from langchain_core.tools import BaseTool
+from langchain.agents.middleware import AgentMiddleware
 
 from config.settings import settings
+from middleware.deadline import DeadlineMiddleware, DeadlineToolRetryMiddleware
+from middleware.metrics import MetricsMiddleware
+from middleware.tool_selection import ToolSelectionMiddleware
+from retrieval.confluence_mirror import ConfluenceMirror
+from utils.prompts import load_prompt
+
+# Search and read tools stay bound whatever the task ranking says
+CONFLUENCE_CORE_TOOLS = (
+    "confluence_mirror_search",
+    "confluence_search",
+    "confluence_get_page",
+)
 
 
 def load_confluence_prompt() -> str:
     """Load system prompt for Confluence agent."""
-    prompt_path = os.path.join(settings.SYSTEM_PROMPT_DIR, "confluence_agent_prompt.md")
-    with open(prompt_path, "r", encoding="utf-8") as f:
-        return f.read()
+    return load_prompt("confluence_agent_prompt.md")
+
+
+def _content_text(content) -> str:
+    if isinstance(content, list):
+        return "\n".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return str(content)
+
+
+def create_mirror_search_tool(
+    mirror: ConfluenceMirror, live_search: Optional[BaseTool] = None
+):
+    """Create a tool answering from the local Confluence mirror, falling back to live search."""
+
+    @tool
+    async def confluence_mirror_search(query: str, limit: int = 5) -> str:
+        """Search the local mirror of Confluence spaces.
 
+        Returns matching page fragments with page ID, URL and last update time.
+        Falls back to live Confluence search when the mirror has no match.
+        """
+        hits = await asyncio.to_thread(mirror.search, query, limit)
+        if hits:
+            return "\n\n".join(
+                f"## {hit.title} (page ID {hit.metadata.get('page_id')}, "
+                f"space {hit.metadata.get('space')}, updated {hit.metadata.get('updated') or 'unknown'})\n"
+                f"{hit.metadata.get('url', '')}\n\n{hit.body}"
+                for hit in hits
+            )
 
-def create_confluence_agent(llm: BaseChatModel, tools: list):
+        if live_search is None:
+            return "No matching pages in the local Confluence mirror."
+        result = await live_search.ainvoke({"query": query, "limit": limit})
+        return (
+            "No matching pages in the local mirror. Live Confluence search results:\n"
+            + _content_text(result)
+        )
+
+    return confluence_mirror_search
+
+
+def create_confluence_agent(
+    llm: BaseChatModel,
+    tools: list,
+    middleware: Sequence[AgentMiddleware] = (),
+    mirror: Optional[ConfluenceMirror] = None,
+):
     """Create Confluence agent with provided tools."""
+    if mirror is not None:
+        live_search = next((t for t in tools if t.name == "confluence_search"), None)
+        tools = [create_mirror_search_tool(mirror, live_search), *tools]
+
     return create_agent(
         model=llm,
         tools=tools,
         system_prompt=load_confluence_prompt(),
         name="confluence_agent",
         middleware=[
-            ToolRetryMiddleware(
-                max_retries=3,
-                initial_delay=1.0,
-                backoff_factor=2.0
+            MetricsMiddleware("confluence_agent"),
+            DeadlineMiddleware("confluence_agent"),
+            ToolSelectionMiddleware(
+                tools,
+                top_k=settings.TOOL_SELECTION_TOP_K,
+                always_include=CONFLUENCE_CORE_TOOLS,
+                compact=settings.TOOL_SCHEMA_COMPACT,
+                agent_name="confluence_agent",
+            ),
+            DeadlineToolRetryMiddleware(
+                max_retries=3, initial_delay=1.0, backoff_factor=2.0
             ),
+            *middleware,
         ],
     )
@@ -1,31 +1,82 @@
-import os
+import asyncio
+from typing import Optional, Sequence
 
 from langchain.agents import create_agent
+from langchain.tools import tool
 from langchain_core.language_models import BaseChatModel
-from langchain.agents.middleware import ToolRetryMiddleware
+from langchain.agents.middleware import AgentMiddleware
 
 from config.settings import settings
+from middleware.deadline import DeadlineMiddleware, DeadlineToolRetryMiddleware
+from middleware.metrics import MetricsMiddleware
+from middleware.tool_selection import ToolSelectionMiddleware
+from retrieval.vault_index import VaultIndex
+from utils.prompts import load_prompt
+
+# Search and read tools stay bound whatever the task ranking says
+OBSIDIAN_CORE_TOOLS = (
+    "obsidian_index_search",
+    "obsidian_global_search",
+    "obsidian_read_note",
+)
 
 
 def load_obsidian_prompt() -> str:
     """Load system prompt for Obsidian agent."""
-    prompt_path = os.path.join(settings.SYSTEM_PROMPT_DIR, "obsidian_agent_prompt.md")
-    with open(prompt_path, "r", encoding="utf-8") as f:
-        return f.read()
+    return load_prompt("obsidian_agent_prompt.md")
+
+
+def create_vault_search_tool(vault_index: VaultIndex):
+    """Create a tool searching the local full-text index of the vault."""
+
+    @tool
+    async def obsidian_index_search(query: str, limit: int = 10) -> str:
+        """Fast full-text search over all vault notes, including frontmatter and tags.
+
+        Returns note paths ranked by relevance with matching snippets.
+        """
+        hits = await asyncio.to_thread(vault_index.search, query, limit)
+        if not hits:
+            return "No matching notes found."
 
+        lines = []
+        for i, hit in enumerate(hits, 1):
+            tags = f" [{', '.join('#' + t for t in hit.tags)}]" if hit.tags else ""
+            snippet = " ".join(hit.snippet.split())
+            lines.append(f"{i}. {hit.doc_id} — {hit.title}{tags}\n   {snippet}")
+        return "\n".join(lines)
 
-def create_obsidian_agent(llm: BaseChatModel, tools: list):
+    return obsidian_index_search
+
+
+def create_obsidian_agent(
+    llm: BaseChatModel,
+    tools: list,
+    middleware: Sequence[AgentMiddleware] = (),
+    vault_index: Optional[VaultIndex] = None,
+):
     """Create Obsidian agent with provided tools."""
+    if vault_index is not None:
+        tools = [create_vault_search_tool(vault_index), *tools]
+
     return create_agent(
         model=llm,
         tools=tools,
         system_prompt=load_obsidian_prompt(),
         name="obsidian_agent",
         middleware=[
-            ToolRetryMiddleware(
-                max_retries=3,
-                initial_delay=1.0,
-                backoff_factor=2.0
+            MetricsMiddleware("obsidian_agent"),
+            DeadlineMiddleware("obsidian_agent"),
+            ToolSelectionMiddleware(
+                tools,
+                top_k=settings.TOOL_SELECTION_TOP_K,
+                always_include=OBSIDIAN_CORE_TOOLS,
+                compact=settings.TOOL_SCHEMA_COMPACT,
+                agent_name="obsidian_agent",
+            ),
+            DeadlineToolRetryMiddleware(
+                max_retries=3, initial_delay=1.0, backoff_factor=2.0
             ),
+            *middleware,
         ],
     )
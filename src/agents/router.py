@@ -0,0 +1,176 @@
+"""Keyword router that sends single-domain requests straight to one sub-agent."""
+
+import re
+import uuid
+from typing import Optional
+
+from langchain_core.messages import AIMessage
+
+# Word stems, matched against the start of each word of the request
+CONFLUENCE_STEMS = (
+    "confluence",
+    "конфлюенс",
+    "конфлюэнс",
+    "wiki",
+    "вики",
+    "документац",
+    "documentation",
+    "спецификац",
+    "specification",
+    "регламент",
+    "инструкц",
+    "runbook",
+    "ранбук",
+    "cql",
+)
+OBSIDIAN_STEMS = (
+    "obsidian",
+    "обсидиан",
+    "заметк",
+    "заметок",
+    "note",
+    "notes",
+    "vault",
+    "волт",
+    "тег",
+    "tag",
+    "frontmatter",
+    "дневник",
+    "journal",
+)
+# Requests that combine results or refer back to the conversation need the Supervisor
+MULTI_STEP_STEMS = (
+    "сравн",
+    "compar",
+    "сохрани",
+    "save",
+    "перенес",
+    "скопир",
+    "copy",
+    "оба",
+    "обе",
+    "both",
+    "также",
+    "also",
+    "потом",
+    "then",
+    "выше",
+    "above",
+    "предыдущ",
+    "previous",
+)
+
+# In a thread with earlier turns, requests this short or starting with one of these
+# words likely lean on the conversation ("and in my notes?", "а что там про X?")
+FOLLOW_UP_MAX_WORDS = 4
+FOLLOW_UP_OPENERS = (
+    "and",
+    "but",
+    "or",
+    "so",
+    "also",
+    "what about",
+    "how about",
+    "it",
+    "its",
+    "this",
+    "that",
+    "these",
+    "those",
+    "they",
+    "them",
+    "their",
+    "there",
+    "same",
+    "и",
+    "а",
+    "но",
+    "или",
+    "тогда",
+    "также",
+    "это",
+    "этот",
+    "эта",
+    "эти",
+    "этого",
+    "тот",
+    "та",
+    "те",
+    "там",
+    "туда",
+    "он",
+    "она",
+    "оно",
+    "они",
+    "его",
+    "её",
+    "ее",
+    "их",
+)
+
+FAST_PATH_MARKER = "fast_path"
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def _matches(words: list[str], stems: tuple[str, ...]) -> bool:
+    return any(word.startswith(stem) for word in words for stem in stems)
+
+
+class KeywordRouter:
+    """Pick the Supervisor tool for requests that clearly target one system.
+
+    Returns None whenever the request mentions both systems, none of them or
+    asks for a multi-step task; such requests go through the Supervisor LLM.
+    """
+
+    def __init__(self, confluence_tool: str, obsidian_tool: str):
+        self.confluence_tool = confluence_tool
+        self.obsidian_tool = obsidian_tool
+
+    def route(self, request: str) -> Optional[str]:
+        words = _words(request)
+        if _matches(words, MULTI_STEP_STEMS):
+            return None
+
+        confluence = _matches(words, CONFLUENCE_STEMS)
+        obsidian = _matches(words, OBSIDIAN_STEMS)
+        if confluence and not obsidian:
+            return self.confluence_tool
+        if obsidian and not confluence:
+            return self.obsidian_tool
+        return None
+
+
+def is_elliptical(request: str) -> bool:
+    """Whether a request may only make sense with the earlier turns of the conversation."""
+    words = _words(request)
+    return (
+        len(words) <= FOLLOW_UP_MAX_WORDS
+        or words[0] in FOLLOW_UP_OPENERS
+        or " ".join(words[:2]) in FOLLOW_UP_OPENERS
+    )
+
+
+def routed_tool_call(tool_name: str, request: str) -> AIMessage:
+    """Supervisor message delegating the request as if the Supervisor had decided it."""
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {
+                "name": tool_name,
+                "args": {"request": request},
+                "id": f"call_route_{uuid.uuid4().hex[:24]}",
+                "type": "tool_call",
+            }
+        ],
+        response_metadata={FAST_PATH_MARKER: True},
+    )
+
+
+def is_routed(message) -> bool:
+    return isinstance(message, AIMessage) and bool(
+        message.response_metadata.get(FAST_PATH_MARKER)
+    )
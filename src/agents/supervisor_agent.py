@@ -1,69 +1,185 @@
 import logging
-import os
+from typing import Optional
 
 from langchain.tools import tool, ToolRuntime
+from langchain_core.messages import ToolMessage
+from langgraph.types import Command
 
 from config.settings import settings
+from middleware.deadline import PARTIAL_MARKER, is_partial
+from storage.blob_store import BlobStore
+from storage.scratchpad import Scratchpad
+from utils.approval_policy import ApprovalPolicy
+from utils.prompts import load_prompt
+from utils.response_cache import ResponseCache
+from utils.tool_access import read_only_delegation
 
 logger = logging.getLogger(__name__)
 
+CONFLUENCE_AGENT_NAME = "Confluence agent"
+OBSIDIAN_AGENT_NAME = "Obsidian agent"
+
+# Confluence is read through one shared MCP connection, so its answers depend only
+# on the task and are shared across threads; notes are personal and their answers
+# stay within the thread that asked
+SHARED_CACHE_AGENTS = frozenset({CONFLUENCE_AGENT_NAME})
+
 
 def load_supervisor_prompt() -> str:
     """Load system prompt for Supervisor agent."""
-    prompt_path = os.path.join(settings.SYSTEM_PROMPT_DIR, "supervisor_agent_prompt.md")
-    with open(prompt_path, "r", encoding="utf-8") as f:
-        return f.read()
+    return load_prompt("supervisor_agent_prompt.md")
+
+
+def _build_subagent_prompt(request: str, messages: list) -> str:
+    """Combine the delegated task with the user's request of this turn.
+
+    The user's request comes first: it is the same for every delegation of
+    the turn, so only the task after it misses the provider prefix cache.
+    """
+    original_user_message = next(
+        (msg for msg in reversed(messages) if msg.type == "human"), None
+    )
+
+    if original_user_message:
+        return (
+            f"User's original request:\n{original_user_message.content}\n\n"
+            f"Your task:\n{request}"
+        )
+    return request
+
+
+async def _delegate(
+    agent,
+    agent_name: str,
+    request: str,
+    messages: list,
+    response_cache: Optional[ResponseCache] = None,
+    scratchpad: Optional[Scratchpad] = None,
+    thread_id: str = "",
+) -> tuple[str, bool]:
+    """Run a sub-agent on the delegated task and return its final answer and whether it is partial.
+
+    The scratchpad is passed as the sub-agent's run context. Answers of
+    ``SHARED_CACHE_AGENTS`` are cached by the task for every thread, other
+    answers by the prompt the sub-agent gets, within the conversation thread.
+    Partial answers, cut short by the request deadline, are not cached.
+    """
+    logger.debug("%s request: %s", agent_name, request)
+    prompt = _build_subagent_prompt(request, messages)
+    if agent_name in SHARED_CACHE_AGENTS:
+        cache_key, scope = request, ""
+    else:
+        cache_key, scope = prompt, thread_id
+
+    if response_cache is not None:
+        cached = await response_cache.aget(agent_name, cache_key, scope)
+        if cached is not None:
+            logger.debug("%s answer served from cache", agent_name)
+            return cached, False
+        generation = response_cache.generation(agent_name)
 
+    result = await agent.ainvoke(
+        {"messages": [{"role": "user", "content": prompt}]},
+        context=scratchpad,
+    )
+    final = result["messages"][-1]
+    answer, partial = final.content, is_partial(final)
+
+    if response_cache is not None and not partial:
+        await response_cache.aset(agent_name, cache_key, answer, generation, scope)
+    return answer, partial
+
+
+async def _delegate_with_scratchpad(
+    agent,
+    agent_name: str,
+    tool_name: str,
+    request: str,
+    runtime: ToolRuntime,
+    response_cache: Optional[ResponseCache],
+    blob_store: Optional[BlobStore],
+    read_policy: Optional[ApprovalPolicy] = None,
+):
+    """Delegate with the thread's scratchpad and write its changes back to Supervisor state.
+
+    A delegation ``read_policy`` auto-approved as a read runs with read-only
+    tools only. A partial answer is returned as a ToolMessage marked with ``PARTIAL_MARKER``.
+    """
+    scratchpad = None
+    if blob_store is not None and settings.SCRATCHPAD_MAX_ENTRIES > 0:
+        scratchpad = Scratchpad(blob_store, runtime.state.get("scratchpad"), agent_name)
+
+    read_only = read_policy is not None and not read_policy.requires_approval(
+        tool_name, {"request": request}
+    )
+    with read_only_delegation(read_only):
+        answer, partial = await _delegate(
+            agent,
+            agent_name,
+            request,
+            runtime.state["messages"],
+            response_cache,
+            scratchpad,
+            str(runtime.config.get("configurable", {}).get("thread_id", "")),
+        )
+    changes = scratchpad.changes if scratchpad is not None else {}
+    if not partial and not changes:
+        return answer
+    message = ToolMessage(
+        content=answer,
+        name=tool_name,
+        tool_call_id=runtime.tool_call_id,
+        response_metadata={PARTIAL_MARKER: True} if partial else {},
+    )
+    if not changes:
+        return message
+    return Command(update={"messages": [message], "scratchpad": changes})
+
+
+def create_supervisor_tools(
+    confluence_agent,
+    obsidian_agent,
+    response_cache: Optional[ResponseCache] = None,
+    blob_store: Optional[BlobStore] = None,
+    read_policy: Optional[ApprovalPolicy] = None,
+) -> list:
+    """Create tools that wrap sub-agents for Supervisor.
+
+    Each tool call the Supervisor emits in one turn is dispatched as its own
+    graph task, so independent delegations run concurrently (bounded by the
+    run's ``max_concurrency``) and their results are merged back in tool call order.
+    Answers are served from ``response_cache`` when given. With ``blob_store``,
+    sub-agents reuse the tool results kept in the thread's scratchpad. With
+    ``read_policy``, the policy whose reads run without approval, sub-agents
+    of delegations it classifies as reads can't call write tools.
+    """
 
-def create_supervisor_tools(confluence_agent, obsidian_agent) -> list:
-    """Create tools that wrap sub-agents for Supervisor."""
-    
     @tool
-    async def search_confluence(request: str, runtime: ToolRuntime) -> str:
+    async def search_confluence(request: str, runtime: ToolRuntime):
         """Search in Confluence documentation."""
-        original_user_message = next(
-            (msg for msg in runtime.state["messages"] if msg.type == "human"),
-            None
+        return await _delegate_with_scratchpad(
+            confluence_agent,
+            CONFLUENCE_AGENT_NAME,
+            "search_confluence",
+            request,
+            runtime,
+            response_cache,
+            blob_store,
+            read_policy,
         )
-        
-        if original_user_message:
-            prompt = (
-                f"User's original request:\n{original_user_message.content}\n\n"
-                f"Your task:\n{request}"
-            )
-        else:
-            prompt = request
-        
-        logger.debug("Confluence agent request: %s", request)
-        
-        result = await confluence_agent.ainvoke({
-            "messages": [{"role": "user", "content": prompt}]
-        })
-        
-        return result["messages"][-1].content
-    
+
     @tool
-    async def manage_obsidian_notes(request: str, runtime: ToolRuntime) -> str:
+    async def manage_obsidian_notes(request: str, runtime: ToolRuntime):
         """Manage personal notes in Obsidian vault."""
-        original_user_message = next(
-            (msg for msg in runtime.state["messages"] if msg.type == "human"),
-            None
+        return await _delegate_with_scratchpad(
+            obsidian_agent,
+            OBSIDIAN_AGENT_NAME,
+            "manage_obsidian_notes",
+            request,
+            runtime,
+            response_cache,
+            blob_store,
+            read_policy,
         )
-        
-        if original_user_message:
-            prompt = (
-                f"User's original request:\n{original_user_message.content}\n\n"
-                f"Your task:\n{request}"
-            )
-        else:
-            prompt = request
-        
-        logger.debug("Obsidian agent request: %s", request)
-        
-        result = await obsidian_agent.ainvoke({
-            "messages": [{"role": "user", "content": prompt}]
-        })
-        
-        return result["messages"][-1].content
-    
+
     return [search_confluence, manage_obsidian_notes]
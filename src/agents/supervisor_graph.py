@@ -1,147 +1,573 @@
+import asyncio
 import logging
+import threading
+from typing import Optional
 
 from langchain.agents import create_agent
-from langchain.agents.middleware import SummarizationMiddleware, ToolRetryMiddleware
-from langchain_core.messages import AIMessage, HumanMessage
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
 from langgraph.types import Command
 
 from agents.confluence_agent import create_confluence_agent
 from agents.obsidian_agent import create_obsidian_agent
-from agents.supervisor_agent import create_supervisor_tools, load_supervisor_prompt
+from agents.router import (
+    FAST_PATH_MARKER,
+    KeywordRouter,
+    is_elliptical,
+    is_routed,
+    routed_tool_call,
+)
+from agents.supervisor_agent import (
+    CONFLUENCE_AGENT_NAME,
+    OBSIDIAN_AGENT_NAME,
+    create_supervisor_tools,
+    load_supervisor_prompt,
+)
 from config.settings import settings
-from utils.llm_retry import create_llm
+from middleware.approval import ApprovalPolicyMiddleware, ReadOnlyToolsMiddleware
+from middleware.deadline import (
+    DeadlineMiddleware,
+    DeadlineToolRetryMiddleware,
+    is_partial,
+)
+from middleware.metrics import MetricsMiddleware, node_timing
+from middleware.response_cache import ResponseCacheInvalidationMiddleware
+from middleware.scratchpad import ScratchpadMiddleware, ScratchpadStateMiddleware
+from middleware.summarization import (
+    RollingSummarizationMiddleware,
+    summarization_limits,
+)
+from middleware.tool_output_budget import ToolOutputBudgetMiddleware
+from retrieval.confluence_mirror import create_confluence_mirror
+from retrieval.vault_index import create_vault_index
+from storage.blob_store import create_blob_store
+from storage.checkpoint_serde import create_checkpoint_serde
+from storage.checkpointer import create_checkpointer
+from utils.approval_policy import load_approval_policy
+from utils.concurrency import LoopLocal
+from utils.deadline import request_deadline
+from utils.llm_registry import SUBAGENT, SUMMARIZER, SUPERVISOR, get_llm
+from utils.mcp_pool import get_tool_pool
+from utils.metrics import start_metrics_server
+from utils.response_cache import create_response_cache
+from utils.startup import startup_report
+from utils.tokens import DEFAULT_ENCODING, get_encoding
 
 logger = logging.getLogger(__name__)
 
 
 class SupervisorSystem:
     """Multi-agent system coordinator."""
-    
-    def __init__(self):
+
+    def __init__(self, llm: Optional[BaseChatModel] = None):
         self.checkpointer = None
         self._initialized = False
-        self.llm = None
+        self.llm = llm
+        self.subagent_llm = llm
+        self.summary_llm = None
         self.confluence_mcp = None
         self.obsidian_mcp = None
+        self.response_cache = None
+        self.blob_store = None
+        self.vault_index = None
+        self.confluence_mirror = None
+        self.router = None
+        self.approval_policy = None
         self._current_graph = None
-    
+        self._tool_versions = None
+        self._warm_up_task: Optional[asyncio.Task] = None
+        self._lock = LoopLocal(asyncio.Lock)
+
     async def initialize(self):
-        """Initialize system components."""
+        """Initialize system components; with ``WARMUP_ON_START`` also start warming up in the background."""
         if self._initialized:
             return
-        
+
+        async with self._lock.get():
+            if not self._initialized:
+                with startup_report.phase("initialize"):
+                    await self._initialize()
+                if settings.WARMUP_ON_START:
+                    self._start_warm_up()
+
+    async def warm_up(self):
+        """Connect MCP servers, load their tools, build the graph and open LLM connections.
+
+        Concurrent callers and the background warm-up share one run.
+        """
+        await self.initialize()
+        await asyncio.shield(self._start_warm_up())
+
+    def _start_warm_up(self) -> asyncio.Task:
+        task = self._warm_up_task
+        if task is None or (
+            task.done() and (task.cancelled() or task.exception() is not None)
+        ):
+            task = self._warm_up_task = asyncio.create_task(self._warm_up())
+            task.add_done_callback(self._log_warm_up_failure)
+        return task
+
+    async def _warm_up(self):
+        logger.info("Warming up...")
+
+        async def mcp_and_graph():
+            with startup_report.phase("mcp_tools"):
+                await asyncio.gather(
+                    self.confluence_mcp.get_tools(), self.obsidian_mcp.get_tools()
+                )
+            with startup_report.phase("graph_build"):
+                await self._ensure_graph()
+
+        async def llm_connections():
+            with startup_report.phase("llm_connections"):
+                await self._open_llm_connections()
+
+        await asyncio.gather(mcp_and_graph(), llm_connections())
+        startup_report.log("Warm-up")
+
+    async def _open_llm_connections(self):
+        """Open a pooled connection to each LLM endpoint with a cheap models request."""
+        # Roles sharing an HTTP client need only one connection opened
+        llms = {
+            id(getattr(llm, "http_async_client", None) or llm): llm
+            for llm in (self.llm, self.subagent_llm, self.summary_llm)
+            if llm is not None
+        }
+
+        async def open_connection(llm):
+            client = getattr(llm, "root_async_client", None)
+            if client is None:
+                return
+            try:
+                await asyncio.wait_for(client.models.list(), timeout=10)
+            except Exception as e:
+                logger.warning(
+                    "Could not pre-open LLM connection to %s: %s", client.base_url, e
+                )
+
+        await asyncio.gather(*(open_connection(llm) for llm in llms.values()))
+
+    @staticmethod
+    def _log_warm_up_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(
+                "Warm-up failed, the first request will retry it: %s", task.exception()
+            )
+
+    async def _initialize(self):
         logger.info("Initializing Supervisor system...")
-        
-        self.llm = create_llm()
-        self.checkpointer = MemorySaver()
-        
-        self.confluence_mcp = MultiServerMCPClient(settings.confluence_mcp_config)
-        self.obsidian_mcp = MultiServerMCPClient(settings.obsidian_mcp_config)
-        
-        logger.info("LLM and MCP clients initialized")
+
+        if settings.METRICS_PORT:
+            start_metrics_server(settings.METRICS_PORT)
+
+        # An injected model serves every role
+        if self.llm is None:
+            self.llm = get_llm(SUPERVISOR)
+            self.subagent_llm = get_llm(SUBAGENT)
+            self.summary_llm = get_llm(SUMMARIZER)
+        # Loading a tiktoken encoding may download it; keep that off the event loop
+        await asyncio.to_thread(
+            get_encoding, getattr(self.llm, "model_name", None) or DEFAULT_ENCODING
+        )
+        self.blob_store = create_blob_store()
+        await asyncio.to_thread(self.blob_store.prune)
+        serde = create_checkpoint_serde()
+        if serde is not None:
+            await asyncio.to_thread(serde.store.prune)
+        self.checkpointer = create_checkpointer(serde)
+        self.response_cache = create_response_cache()
+        self.confluence_mirror = create_confluence_mirror()
+        self.vault_index = create_vault_index()
+        if settings.ENABLE_HUMAN_APPROVAL:
+            self.approval_policy = load_approval_policy()
+        if settings.ROUTER_ENABLED:
+            self.router = KeywordRouter("search_confluence", "manage_obsidian_notes")
+        if self.vault_index is not None:
+            self.vault_index.sync_in_background()
+
+        self.confluence_mcp = get_tool_pool(settings.confluence_mcp_config)
+        self.obsidian_mcp = get_tool_pool(settings.obsidian_mcp_config)
+
+        logger.info("LLM and MCP tool pools initialized")
         self._initialized = True
-    
+
     async def _ensure_graph(self):
-        """Create or return existing graph."""
-        if self._current_graph is None:
-            confluence_tools = await self.confluence_mcp.get_tools()
-            obsidian_tools = await self.obsidian_mcp.get_tools()
-            
-            logger.debug("Confluence tools: %d, Obsidian tools: %d", 
-                        len(confluence_tools), len(obsidian_tools))
-            
-            confluence_agent = create_confluence_agent(self.llm, confluence_tools)
-            obsidian_agent = create_obsidian_agent(self.llm, obsidian_tools)
-            
-            supervisor_tools = create_supervisor_tools(confluence_agent, obsidian_agent)
+        """Create the graph or return the existing one while MCP tool schemas are unchanged."""
+        confluence_tools = await self.confluence_mcp.get_tools()
+        obsidian_tools = await self.obsidian_mcp.get_tools()
+        tool_versions = (self.confluence_mcp.version, self.obsidian_mcp.version)
+
+        if self._current_graph is not None and tool_versions == self._tool_versions:
+            return self._current_graph
+
+        async with self._lock.get():
+            if self._current_graph is not None and tool_versions == self._tool_versions:
+                return self._current_graph
+
+            logger.debug(
+                "Confluence tools: %d, Obsidian tools: %d",
+                len(confluence_tools),
+                len(obsidian_tools),
+            )
+
+            confluence_agent = create_confluence_agent(
+                self.subagent_llm,
+                confluence_tools,
+                self._subagent_middleware(CONFLUENCE_AGENT_NAME),
+                mirror=self.confluence_mirror,
+            )
+            obsidian_agent = create_obsidian_agent(
+                self.subagent_llm,
+                obsidian_tools,
+                self._subagent_middleware(OBSIDIAN_AGENT_NAME),
+                vault_index=self.vault_index,
+            )
+
+            # Reads the policy lets through without approval may only read in sub-agents too
+            read_policy = (
+                self.approval_policy if settings.APPROVAL_AUTO_APPROVE_READS else None
+            )
+            supervisor_tools = create_supervisor_tools(
+                confluence_agent,
+                obsidian_agent,
+                self.response_cache,
+                self.blob_store,
+                read_policy,
+            )
             system_prompt = load_supervisor_prompt()
-            
-            interrupt_config = ["tools"] if settings.ENABLE_HUMAN_APPROVAL else None
-            
+
+            trigger_tokens, keep_tokens = summarization_limits(self.llm)
+
+            middleware = [
+                MetricsMiddleware("supervisor"),
+                # Sub-agents stop their own tool calls, so delegations return what they gathered
+                DeadlineMiddleware("supervisor", limit_tool_calls=False),
+                ScratchpadStateMiddleware(),
+                RollingSummarizationMiddleware(
+                    self.llm,
+                    trigger_tokens=trigger_tokens,
+                    keep_tokens=keep_tokens,
+                    summarizer=self.summary_llm,
+                ),
+                DeadlineToolRetryMiddleware(
+                    max_retries=3, initial_delay=1.0, backoff_factor=2.0
+                ),
+            ]
+            if self.approval_policy is not None:
+                middleware.append(
+                    ApprovalPolicyMiddleware(
+                        self.approval_policy, settings.APPROVAL_AUTO_APPROVE_READS
+                    )
+                )
+
             self._current_graph = create_agent(
                 model=self.llm,
                 tools=supervisor_tools,
                 system_prompt=system_prompt,
                 checkpointer=self.checkpointer,
-                middleware=[
-                    SummarizationMiddleware(
-                        model=self.llm,
-                        trigger=("tokens", settings.SUMMARIZATION_TRIGGER_TOKENS),
-                        keep=("messages", 10),
-                    ),
-                    ToolRetryMiddleware(
-                        max_retries=3,
-                        initial_delay=1.0,
-                        backoff_factor=2.0
-                    ),
-                ],
-                interrupt_before=interrupt_config,
+                middleware=middleware,
                 name="supervisor",
             )
+            self._tool_versions = tool_versions
         return self._current_graph
-    
+
+    def _subagent_middleware(self, agent_name: str) -> list:
+        """Read-only tools for delegations approved as reads, tool output budget,
+        invalidation of the agent's cached answers after write tools and the
+        thread scratchpad, innermost so it stores raw tool results."""
+        middleware = [
+            ReadOnlyToolsMiddleware(agent_name),
+            ToolOutputBudgetMiddleware(
+                self.blob_store,
+                max_call_chars=settings.TOOL_OUTPUT_MAX_CHARS,
+                max_turn_chars=settings.TOOL_OUTPUT_TURN_MAX_CHARS,
+                chunk_chars=settings.TOOL_OUTPUT_CHUNK_CHARS,
+                agent_name=agent_name,
+            ),
+        ]
+        if self.response_cache is not None:
+            middleware.append(
+                ResponseCacheInvalidationMiddleware(self.response_cache, agent_name)
+            )
+        middleware.append(ScratchpadMiddleware(agent_name))
+        return middleware
+
     async def run(self, user_input: str, thread_id: str):
         """Run the multi-agent system."""
         await self.initialize()
-        
+
         graph = await self._ensure_graph()
-        
-        config = {
-            "configurable": {"thread_id": thread_id},
-            "recursion_limit": settings.MAX_RECURSION_LIMIT,
-        }
-        
-        result = await graph.ainvoke(
-            {"messages": [HumanMessage(content=user_input)]},
-            config=config
-        )
-        
+
+        config = self._build_config(thread_id)
+
+        with request_deadline(settings.REQUEST_TIMEOUT_SECONDS):
+            if await self._start_fast_path(graph, config, user_input):
+                await graph.ainvoke(None, config=config, interrupt_after=["tools"])
+                result = await self._finish_fast_path(graph, config)
+            else:
+                result = await graph.ainvoke(
+                    {"messages": [HumanMessage(content=user_input)]}, config=config
+                )
+
         return self._process_result(result)
-    
+
     async def resume_after_approval(self, thread_id: str, approved: bool = True):
         """Resume execution after human approval."""
         await self.initialize()
-        
+
         graph = await self._ensure_graph()
-        
-        config = {
-            "configurable": {"thread_id": thread_id},
-            "recursion_limit": settings.MAX_RECURSION_LIMIT,
-        }
-        
-        if approved:
-            result = await graph.ainvoke(Command(resume=True), config=config)
-        else:
+
+        config = self._build_config(thread_id)
+        fast_path = await self._is_fast_path_pending(graph, config)
+        interrupt_after = ["tools"] if fast_path else None
+
+        with request_deadline(settings.REQUEST_TIMEOUT_SECONDS):
             result = await graph.ainvoke(
-                Command(resume={"action": "rejected"}),
-                config=config
+                self._resume_command(approved),
+                config=config,
+                interrupt_after=interrupt_after,
             )
-        
+
+        if fast_path:
+            result = await self._finish_fast_path(graph, config)
         return self._process_result(result)
-    
+
+    async def astream_run(self, user_input: str, thread_id: str):
+        """Run the multi-agent system, yielding events as they happen.
+
+        Yields ``token`` events with Supervisor output, ``progress`` events for
+        delegations and sub-agent tool calls, and finally one event whose type is
+        the status of ``_process_result`` (``complete``, ``pending_approval``, ``error``).
+        """
+        await self.initialize()
+
+        graph = await self._ensure_graph()
+
+        config = self._build_config(thread_id)
+
+        if not await self._start_fast_path(graph, config, user_input):
+            graph_input = {"messages": [HumanMessage(content=user_input)]}
+            async for event in self._astream(graph_input, thread_id):
+                yield event
+        else:
+            async for event in self._astream(None, thread_id, fast_path=True):
+                yield event
+
+    async def astream_resume_after_approval(
+        self, thread_id: str, approved: bool = True
+    ):
+        """Resume execution after human approval, yielding events as they happen."""
+        await self.initialize()
+
+        graph = await self._ensure_graph()
+        fast_path = await self._is_fast_path_pending(
+            graph, self._build_config(thread_id)
+        )
+
+        async for event in self._astream(
+            self._resume_command(approved), thread_id, fast_path
+        ):
+            yield event
+
+    @staticmethod
+    def _resume_command(approved: bool) -> Command:
+        """Answer the pending approval of a thread's write tool calls."""
+        return Command(resume={"action": "approved" if approved else "rejected"})
+
+    async def _start_fast_path(self, graph, config: dict, user_input: str) -> bool:
+        """Record a routed delegation as the Supervisor's decision for single-domain requests.
+
+        The graph then continues after the ``model`` node as if the Supervisor LLM had
+        emitted the call, so the approval policy still applies: a call that needs
+        approval stops the turn like an interrupted Supervisor turn. The routed
+        call carries only this message, so elliptical follow-ups in a thread
+        with earlier turns are left to the Supervisor, which sees the history.
+        """
+        tool_name = self.router.route(user_input) if self.router is not None else None
+        if tool_name is None:
+            return False
+        if is_elliptical(user_input):
+            state = await graph.aget_state(config)
+            if state.values.get("messages"):
+                logger.debug("Not routing follow-up request %r", user_input)
+                return False
+
+        logger.debug("Routing request directly to %s", tool_name)
+        await graph.aupdate_state(
+            config,
+            {
+                "messages": [
+                    HumanMessage(content=user_input),
+                    routed_tool_call(tool_name, user_input),
+                ]
+            },
+            as_node="model",
+        )
+        return True
+
+    async def _is_fast_path_pending(self, graph, config: dict) -> bool:
+        state = await graph.aget_state(config)
+        messages = state.values.get("messages", [])
+        return bool(messages) and is_routed(messages[-1])
+
+    async def _finish_fast_path(self, graph, config: dict) -> dict:
+        """Return the sub-agent's answer as the Supervisor's reply, skipping its summarizing call."""
+        state = await graph.aget_state(config)
+        messages = state.values.get("messages", [])
+        if not state.next or not messages or not isinstance(messages[-1], ToolMessage):
+            return self._state_values(state)
+
+        answer = AIMessage(
+            content=messages[-1].content,
+            response_metadata={FAST_PATH_MARKER: True},
+        )
+        await graph.aupdate_state(config, {"messages": [answer]}, as_node="model")
+        return self._state_values(await graph.aget_state(config))
+
+    async def _astream(self, graph_input, thread_id: str, fast_path: bool = False):
+        """Stream graph execution as UI events."""
+        await self.initialize()
+
+        graph = await self._ensure_graph()
+
+        config = self._build_config(thread_id)
+        agent_names = {}
+        streamed_ids = set()
+
+        with request_deadline(settings.REQUEST_TIMEOUT_SECONDS):
+            async for namespace, mode, data in graph.astream(
+                graph_input,
+                config=config,
+                stream_mode=["messages", "updates"],
+                subgraphs=True,
+                interrupt_after=["tools"] if fast_path else None,
+            ):
+                if mode == "messages":
+                    chunk, metadata = data
+                    agent_name = metadata.get("lc_agent_name", "supervisor")
+                    agent_names[namespace] = agent_name
+
+                    if (
+                        not namespace
+                        and metadata.get("langgraph_node") == "model"
+                        and isinstance(chunk, (AIMessage, AIMessageChunk))
+                        and chunk.text
+                    ):
+                        streamed_ids.add(chunk.id)
+                        yield {"type": "token", "content": chunk.text}
+                else:
+                    agent_name = agent_names.get(
+                        namespace, "supervisor" if not namespace else "sub-agent"
+                    )
+                    for event in self._progress_events(agent_name, data):
+                        yield event
+
+        if fast_path:
+            values = await self._finish_fast_path(graph, config)
+            result = self._process_result(values)
+            if result["status"] == "complete":
+                yield {"type": "token", "content": result["content"]}
+        else:
+            values = self._state_values(await graph.aget_state(config))
+            result = self._process_result(values)
+            # A partial answer made without the model was not streamed
+            final = (values.get("messages") or [None])[-1]
+            if (
+                isinstance(final, AIMessage)
+                and is_partial(final)
+                and final.id not in streamed_ids
+            ):
+                yield {"type": "token", "content": result["content"]}
+        yield {"type": result["status"], **result}
+
+    def _progress_events(self, agent_name: str, update: dict) -> list[dict]:
+        """Convert a node update into progress events for tool calls."""
+        events = []
+        for node, node_update in update.items():
+            if node != "model" or not isinstance(node_update, dict):
+                continue
+            for message in node_update.get("messages", []):
+                for tc in getattr(message, "tool_calls", None) or []:
+                    events.append(
+                        {
+                            "type": "progress",
+                            "agent": agent_name,
+                            "tool": tc["name"],
+                            "args": tc["args"],
+                        }
+                    )
+        return events
+
+    def _build_config(self, thread_id: str) -> dict:
+        """Build run config for a conversation thread."""
+        return {
+            "configurable": {"thread_id": thread_id},
+            "recursion_limit": settings.MAX_RECURSION_LIMIT,
+            # Bounds how many sub-agent delegations of one turn run at once
+            "max_concurrency": settings.MAX_PARALLEL_SUBAGENTS,
+            "callbacks": [node_timing],
+        }
+
+    @staticmethod
+    def _state_values(state) -> dict:
+        """State values with pending interrupts under ``__interrupt__``, as ``ainvoke`` returns them."""
+        if not state.interrupts:
+            return state.values
+        return {**state.values, "__interrupt__": list(state.interrupts)}
+
     def _process_result(self, result):
-        """Process graph result."""
+        """Process graph result.
+
+        A pending approval lists the tool calls waiting for it; calls the policy
+        approved run without being reported. Answers cut short by the request
+        deadline are marked ``partial``.
+        """
         messages = result.get("messages", [])
-        
+
         if not messages:
             return {"status": "error", "content": "No messages in result"}
-        
-        last_message = messages[-1]
-        
-        if isinstance(last_message, AIMessage) and last_message.tool_calls:
+
+        pending = [
+            tc
+            for pending_interrupt in result.get("__interrupt__", [])
+            if isinstance(pending_interrupt.value, dict)
+            for tc in pending_interrupt.value.get("tool_calls", [])
+        ]
+        if pending:
             return {
                 "status": "pending_approval",
-                "tool_calls": [
-                    {"name": tc["name"], "args": tc["args"], "id": tc["id"]}
-                    for tc in last_message.tool_calls
-                ],
+                "tool_calls": pending,
                 "content": "Actions require approval",
             }
-        
+
         for message in reversed(messages):
             if isinstance(message, AIMessage) and not message.tool_calls:
-                return {"status": "complete", "content": message.content}
-        
+                result = {"status": "complete", "content": message.content}
+                if self._is_partial_turn(messages):
+                    result["partial"] = True
+                return result
+
         return {"status": "error", "content": "Could not get response"}
+
+    @staticmethod
+    def _is_partial_turn(messages: list) -> bool:
+        """Whether the deadline cut the last turn's answer or one of its delegations short."""
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                return False
+            if isinstance(message, (AIMessage, ToolMessage)) and is_partial(message):
+                return True
+        return False
+
+
+_shared_system: Optional[SupervisorSystem] = None
+_shared_system_lock = threading.Lock()
+
+
+def get_shared_system() -> SupervisorSystem:
+    """Return the process-wide SupervisorSystem; sessions address it by thread_id."""
+    global _shared_system
+    with _shared_system_lock:
+        if _shared_system is None:
+            _shared_system = SupervisorSystem()
+        return _shared_system
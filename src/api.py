@@ -0,0 +1,278 @@
+# First, so startup timings count from process start
+from utils.startup import startup_report
+
+import json
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from config.settings import settings
+from logger.logger import init_logs
+from utils.concurrency import AdmissionController, KeyedLocks, QueueFullError
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AssistantService:
+    """Serves SupervisorSystem to many clients at once.
+
+    Requests of one conversation thread run one at a time, at most
+    ``API_MAX_RUNNING_REQUESTS`` graphs run in total, and up to
+    ``API_MAX_QUEUED_REQUESTS`` more wait for a slot; beyond that clients get
+    429. Once the server is told to stop, new requests get 503 while
+    admitted ones finish.
+    """
+
+    def __init__(self):
+        self.system = None
+        self.thread_locks = KeyedLocks()
+        self.admission = AdmissionController(
+            settings.API_MAX_RUNNING_REQUESTS,
+            settings.API_MAX_QUEUED_REQUESTS,
+            settings.API_QUEUE_TIMEOUT_SECONDS,
+        )
+
+    @asynccontextmanager
+    async def slot(self, thread_id: str):
+        """Hold the request's thread, then admit it; ``API_QUEUE_TIMEOUT_SECONDS`` bounds both waits.
+
+        The thread is taken first, so a request waiting for an earlier one of
+        its thread doesn't keep a slot from requests of other threads.
+        """
+        self.admission.check()
+        started = time.perf_counter()
+        timeout = self.admission.queue_timeout
+        async with self.thread_locks.hold(thread_id, timeout):
+            async with self.admission.admit(
+                max(timeout - (time.perf_counter() - started), 0)
+            ):
+                metrics.observe("api_queue_wait_seconds", time.perf_counter() - started)
+                yield
+
+    async def startup(self):
+        """Load the system and warm it up before the server starts accepting requests."""
+        with startup_report.phase("imports"):
+            from agents.supervisor_graph import get_shared_system
+        self.system = get_shared_system()
+        await self.system.warm_up()
+        logger.info("API ready on %s:%d", settings.API_HOST, settings.API_PORT)
+
+    async def shutdown(self):
+        from utils.llm_registry import close_llm_clients
+
+        logger.info(
+            "Draining %d running and %d queued requests...",
+            self.admission.running,
+            self.admission.queued,
+        )
+        if not await self.admission.drain(settings.API_DRAIN_TIMEOUT_SECONDS):
+            logger.warning(
+                "Drain timed out with %d requests still running", self.admission.running
+            )
+        if hasattr(self.system.checkpointer, "close"):
+            self.system.checkpointer.close()
+        await close_llm_clients()
+        logger.info("API stopped")
+
+
+service = AssistantService()
+
+
+def _error(status_code: int, message: str) -> JSONResponse:
+    headers = {"Retry-After": "5"} if status_code in (429, 503) else None
+    return JSONResponse(
+        {"status": "error", "content": message},
+        status_code=status_code,
+        headers=headers,
+    )
+
+
+def _rejected(endpoint: str, error: QueueFullError) -> JSONResponse:
+    status_code = 503 if service.admission.draining else 429
+    metrics.inc("api_requests_total", endpoint=endpoint, outcome=str(status_code))
+    return _error(status_code, str(error))
+
+
+async def _json_body(request: Request) -> dict:
+    try:
+        body = await request.json()
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def _sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _run(endpoint: str, thread_id: str, call):
+    """Run a SupervisorSystem call for the thread and respond with its result."""
+    try:
+        async with service.slot(thread_id):
+            result = await call()
+    except QueueFullError as e:
+        return _rejected(endpoint, e)
+    except Exception as e:
+        logger.error("Error processing request: %s", e, exc_info=True)
+        metrics.inc("api_requests_total", endpoint=endpoint, outcome="error")
+        return _error(500, str(e))
+
+    metrics.inc("api_requests_total", endpoint=endpoint, outcome=result["status"])
+    return JSONResponse({"thread_id": thread_id, **result})
+
+
+async def _stream(endpoint: str, thread_id: str, events):
+    """Stream SupervisorSystem events for the thread as server-sent events.
+
+    Overload is checked before the response starts so it is still reported as
+    429; the slot itself is taken inside the stream and released when the
+    stream ends or the client disconnects.
+    """
+    try:
+        service.admission.check()
+    except QueueFullError as e:
+        return _rejected(endpoint, e)
+
+    async def body():
+        outcome = "error"
+        yield _sse({"type": "thread", "thread_id": thread_id})
+        try:
+            async with service.slot(thread_id):
+                async for event in events():
+                    if event["type"] not in ("token", "progress"):
+                        outcome = event["type"]
+                    yield _sse(event)
+        except QueueFullError as e:
+            outcome = "503" if service.admission.draining else "429"
+            yield _sse({"type": "error", "status": "error", "content": str(e)})
+        except Exception as e:
+            logger.error("Error processing request: %s", e, exc_info=True)
+            yield _sse({"type": "error", "status": "error", "content": str(e)})
+        finally:
+            metrics.inc("api_requests_total", endpoint=endpoint, outcome=outcome)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def chat(request: Request):
+    body = await _json_body(request)
+    message = body.get("message")
+    if not isinstance(message, str) or not message.strip():
+        return _error(400, "'message' is required")
+    thread_id = str(body.get("thread_id") or uuid.uuid4())
+    return await _run("chat", thread_id, lambda: service.system.run(message, thread_id))
+
+
+async def chat_stream(request: Request):
+    body = await _json_body(request)
+    message = body.get("message")
+    if not isinstance(message, str) or not message.strip():
+        return _error(400, "'message' is required")
+    thread_id = str(body.get("thread_id") or uuid.uuid4())
+    return await _stream(
+        "chat_stream", thread_id, lambda: service.system.astream_run(message, thread_id)
+    )
+
+
+async def approval(request: Request):
+    thread_id = request.path_params["thread_id"]
+    approved = (await _json_body(request)).get("approved") is True
+    return await _run(
+        "approval",
+        thread_id,
+        lambda: service.system.resume_after_approval(thread_id, approved),
+    )
+
+
+async def approval_stream(request: Request):
+    thread_id = request.path_params["thread_id"]
+    approved = (await _json_body(request)).get("approved") is True
+    return await _stream(
+        "approval_stream",
+        thread_id,
+        lambda: service.system.astream_resume_after_approval(thread_id, approved),
+    )
+
+
+async def health(request: Request):
+    admission = service.admission
+    return JSONResponse(
+        {
+            "status": "draining" if admission.draining else "ok",
+            "running": admission.running,
+            "queued": admission.queued,
+        },
+        status_code=503 if admission.draining else 200,
+    )
+
+
+async def prometheus_metrics(request: Request):
+    return PlainTextResponse(
+        metrics.render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    await service.startup()
+    try:
+        yield
+    finally:
+        await service.shutdown()
+
+
+app = Starlette(
+    routes=[
+        Route("/v1/chat", chat, methods=["POST"]),
+        Route("/v1/chat/stream", chat_stream, methods=["POST"]),
+        Route("/v1/threads/{thread_id}/approval", approval, methods=["POST"]),
+        Route(
+            "/v1/threads/{thread_id}/approval/stream", approval_stream, methods=["POST"]
+        ),
+        Route("/health", health, methods=["GET"]),
+        Route("/metrics", prometheus_metrics, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+class Server(uvicorn.Server):
+    """uvicorn server that stops admitting requests as soon as it is signalled to exit.
+
+    uvicorn finishes in-flight connections before running the lifespan
+    shutdown, so requests arriving on them meanwhile get 503 from here on.
+    """
+
+    def handle_exit(self, sig, frame):
+        service.admission.stop()
+        super().handle_exit(sig, frame)
+
+
+def run():
+    init_logs()
+    settings.configure_langsmith()
+    Server(
+        uvicorn.Config(
+            app,
+            host=settings.API_HOST,
+            port=settings.API_PORT,
+            log_config=None,
+            timeout_graceful_shutdown=int(settings.API_DRAIN_TIMEOUT_SECONDS),
+        )
+    ).run()
+
+
+if __name__ == "__main__":
+    run()
@@ -1,10 +1,16 @@
-import asyncio
 import uuid
 
+import logging
+
+# First, so startup timings count from process start
+from utils.startup import startup_report
+
 import streamlit as st
 
-from agents.supervisor_graph import SupervisorSystem
 from config.settings import settings
+from utils.async_runner import get_background_loop
+
+logger = logging.getLogger(__name__)
 
 st.set_page_config(
     page_title="Knowledge Assistant",
@@ -15,75 +21,118 @@ st.set_page_config(
 settings.configure_langsmith()
 
 
+def get_system():
+    # Imported on first use so the page renders before LangChain, LangGraph and MCP load
+    from agents.supervisor_graph import get_shared_system
+
+    return get_shared_system()
+
+
+async def _warm_up():
+    with startup_report.phase("imports"):
+        system = get_system()
+    await system.warm_up()
+
+
+def _log_warm_up_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("Warm-up failed: %s", future.exception())
+
+
+@st.cache_resource
+def start_warm_up():
+    """Warm up the shared system on the background loop once per process."""
+    future = get_background_loop().submit(_warm_up())
+    future.add_done_callback(_log_warm_up_failure)
+    return future
+
+
+if settings.WARMUP_ON_START:
+    start_warm_up()
+
+
 def init_session_state():
     if "messages" not in st.session_state:
         st.session_state.messages = []
     if "thread_id" not in st.session_state:
         st.session_state.thread_id = str(uuid.uuid4())
-    if "system" not in st.session_state:
-        st.session_state.system = None
-    if "initialized" not in st.session_state:
-        st.session_state.initialized = False
     if "pending_approval" not in st.session_state:
         st.session_state.pending_approval = None
 
 
-async def initialize_system():
-    if st.session_state.system is None:
-        st.session_state.system = SupervisorSystem()
-    if not st.session_state.initialized:
-        await st.session_state.system.initialize()
-        st.session_state.initialized = True
+def stream_message(user_input: str):
+    system = get_system()
+    return get_background_loop().iterate(
+        system.astream_run(user_input, st.session_state.thread_id)
+    )
 
 
-async def process_message(user_input: str) -> dict:
-    await initialize_system()
-    result = await st.session_state.system.run(
-        user_input,
-        st.session_state.thread_id
+def stream_resume(approved: bool):
+    system = get_system()
+    return get_background_loop().iterate(
+        system.astream_resume_after_approval(st.session_state.thread_id, approved)
     )
-    return result
 
 
-async def resume_execution(approved: bool) -> dict:
-    await initialize_system()
-    result = await st.session_state.system.resume_after_approval(
-        st.session_state.thread_id,
-        approved
-    )
-    return result
+def render_stream(events) -> dict:
+    """Render streamed events incrementally and return the final event."""
+    status = st.status("Processing...")
+    placeholder = st.empty()
+    text = ""
+
+    for event in events:
+        if event["type"] == "token":
+            text += event["content"]
+            placeholder.markdown(text + "▌")
+        elif event["type"] == "progress":
+            status.write(f"🔧 **{event['agent']}** → `{event['tool']}`")
+        else:
+            if event["type"] == "error":
+                status.update(label="Error", state="error")
+            elif event.get("partial"):
+                status.update(
+                    label="Time limit reached, partial answer",
+                    state="complete",
+                    expanded=False,
+                )
+            else:
+                status.update(label="Done", state="complete", expanded=False)
+            placeholder.markdown(
+                event["content"] if event["type"] == "complete" else text
+            )
+            return event
+
+    return {"type": "error", "status": "error", "content": "No response"}
 
 
 def render_sidebar():
     with st.sidebar:
         st.header("⚙️ Settings")
-        
+
         st.subheader("MCP Servers")
         st.info(f"**Confluence:** `{settings.CONFLUENCE_MCP_URL}`")
         st.info(f"**Obsidian:** `{settings.OBSIDIAN_MCP_URL}`")
-        
+
         st.subheader("Model")
         st.write(f"**{settings.OPENAI_DEFAULT_MODEL}**")
         st.write(f"Temperature: {settings.TEMPERATURE}")
-        
+
         st.subheader("Human-in-the-Loop")
         if settings.ENABLE_HUMAN_APPROVAL:
             st.success("✅ Enabled")
         else:
             st.warning("⚠️ Disabled")
-        
+
         st.divider()
-        
+
         if st.button("🔄 New Conversation", use_container_width=True):
             st.session_state.messages = []
             st.session_state.thread_id = str(uuid.uuid4())
             st.session_state.pending_approval = None
-            st.session_state.system = None
-            st.session_state.initialized = False
             st.rerun()
-        
+
         st.divider()
-        
+
         st.subheader("Capabilities")
         st.markdown("""
         - 📚 **Confluence** — search docs
@@ -95,88 +144,82 @@ def render_approval_ui():
     """Render human-in-the-loop approval UI."""
     if st.session_state.pending_approval is None:
         return
-    
+
     tool_calls = st.session_state.pending_approval
-    
+
     st.warning("🛡️ **Actions require your approval**")
-    
+
     for tc in tool_calls:
         with st.expander(f"🔧 Tool: `{tc['name']}`", expanded=True):
             st.json(tc["args"])
-    
+
     col1, col2 = st.columns(2)
-    
+
     with col1:
         if st.button("✅ Approve", type="primary", use_container_width=True):
-            with st.spinner("Executing..."):
+            with st.chat_message("assistant"):
                 try:
-                    result = asyncio.run(resume_execution(approved=True))
+                    result = render_stream(stream_resume(approved=True))
                     st.session_state.pending_approval = None
-                    
+
                     if result["status"] == "complete":
-                        st.session_state.messages.append({
-                            "role": "assistant",
-                            "content": result["content"]
-                        })
+                        st.session_state.messages.append(
+                            {"role": "assistant", "content": result["content"]}
+                        )
                     elif result["status"] == "pending_approval":
                         st.session_state.pending_approval = result["tool_calls"]
-                    
+
                     st.rerun()
                 except Exception as e:
                     st.error(f"Error: {e}")
-    
+
     with col2:
         if st.button("❌ Reject", use_container_width=True):
             st.session_state.pending_approval = None
-            st.session_state.messages.append({
-                "role": "assistant",
-                "content": "❌ Action was rejected by user."
-            })
+            st.session_state.messages.append(
+                {"role": "assistant", "content": "❌ Action was rejected by user."}
+            )
             st.rerun()
 
 
 def render_chat():
     st.title("🧠 Knowledge Assistant")
     st.caption("Multi-agent system for Confluence & Obsidian")
-    
+
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
-    
+
     if st.session_state.pending_approval:
         render_approval_ui()
         return
-    
+
     if prompt := st.chat_input("Ask about Confluence or Obsidian..."):
         st.session_state.messages.append({"role": "user", "content": prompt})
-        
+
         with st.chat_message("user"):
             st.markdown(prompt)
-        
+
         with st.chat_message("assistant"):
-            with st.spinner("Processing..."):
-                try:
-                    result = asyncio.run(process_message(prompt))
-                    
-                    if result["status"] == "complete":
-                        st.markdown(result["content"])
-                        st.session_state.messages.append({
-                            "role": "assistant",
-                            "content": result["content"]
-                        })
-                    elif result["status"] == "pending_approval":
-                        st.session_state.pending_approval = result["tool_calls"]
-                        st.rerun()
-                    else:
-                        st.error(result["content"])
-                        
-                except Exception as e:
-                    error_msg = f"❌ Error: {str(e)}"
-                    st.error(error_msg)
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": error_msg
-                    })
+            try:
+                result = render_stream(stream_message(prompt))
+
+                if result["status"] == "complete":
+                    st.session_state.messages.append(
+                        {"role": "assistant", "content": result["content"]}
+                    )
+                elif result["status"] == "pending_approval":
+                    st.session_state.pending_approval = result["tool_calls"]
+                    st.rerun()
+                else:
+                    st.error(result["content"])
+
+            except Exception as e:
+                error_msg = f"❌ Error: {str(e)}"
+                st.error(error_msg)
+                st.session_state.messages.append(
+                    {"role": "assistant", "content": error_msg}
+                )
 
 
 def main():
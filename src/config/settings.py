@@ -2,6 +2,7 @@ import os
 from pydantic_settings import BaseSettings
 from typing import Optional
 
+
 class Settings(BaseSettings):
     model_config = {
         "env_file": ".env",
@@ -12,49 +13,186 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = ""
     OPENAI_API_BASE: Optional[str] = None
     OPENAI_DEFAULT_MODEL: str = "gpt-4.1"
-    
+
     TEMPERATURE: float = 0.3
     MAX_TOKENS: Optional[int] = 4096
+    # Context window of the model; taken from the model profile when unset
+    LLM_CONTEXT_WINDOW: Optional[int] = None
+
+    # Retries and circuit breaker for LLM calls
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BASE_DELAY: float = 0.5
+    LLM_RETRY_MAX_DELAY: float = 20.0
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0
+    # Process-wide limit of concurrent LLM requests (0 - unlimited)
+    LLM_MAX_CONCURRENCY: int = 16
+
+    # Per-role models: sub-agent tool loops and summaries can run on cheaper, faster
+    # endpoints. Unset values fall back to the OPENAI_* settings; roles without their
+    # own API base or concurrency limit share LLM_MAX_CONCURRENCY with the Supervisor
+    SUBAGENT_MODEL: Optional[str] = None
+    SUBAGENT_API_BASE: Optional[str] = None
+    SUBAGENT_API_KEY: Optional[str] = None
+    SUBAGENT_MAX_TOKENS: Optional[int] = None
+    SUBAGENT_MAX_CONCURRENCY: Optional[int] = None
+    SUMMARIZER_MODEL: Optional[str] = None
+    SUMMARIZER_API_BASE: Optional[str] = None
+    SUMMARIZER_API_KEY: Optional[str] = None
+    SUMMARIZER_MAX_TOKENS: Optional[int] = None
+    SUMMARIZER_MAX_CONCURRENCY: Optional[int] = None
 
     # LangSmith tracing
     LANGSMITH_API_KEY: str = ""
     LANGSMITH_PROJECT: str = "knowledge-assistant"
     LANGSMITH_TRACING: bool = True
     LANGSMITH_ENDPOINT: str = "https://api.smith.langchain.com"
-    
+
     def configure_langsmith(self):
         """Configure LangSmith environment variables."""
         if self.LANGSMITH_API_KEY:
             os.environ["LANGSMITH_PROJECT"] = self.LANGSMITH_PROJECT
-            os.environ["LANGSMITH_TRACING"] = "true" if self.LANGSMITH_TRACING else "false"
+            os.environ["LANGSMITH_TRACING"] = (
+                "true" if self.LANGSMITH_TRACING else "false"
+            )
             os.environ["LANGSMITH_ENDPOINT"] = self.LANGSMITH_ENDPOINT
             os.environ["LANGSMITH_API_KEY"] = self.LANGSMITH_API_KEY
-    
+
     # Settings for Confluence MCP Server
     CONFLUENCE_MCP_URL: str = "http://127.0.0.1:9000/mcp"
     CONFLUENCE_ACCESS_TOKEN: str = ""
-    
-    # Settings for Obsidian MCP Server  
+
+    # Settings for local Confluence mirror (comma-separated space keys)
+    CONFLUENCE_MIRROR_SPACES: str = ""
+    CONFLUENCE_MIRROR_PATH: str = "data/confluence_mirror.sqlite"
+    CONFLUENCE_MIRROR_CHUNK_SIZE: int = 1500
+    CONFLUENCE_MIRROR_CHUNK_OVERLAP: int = 200
+
+    # Settings for Obsidian MCP Server
     OBSIDIAN_MCP_URL: str = "http://127.0.0.1:3010/mcp"
-    
+
+    # Settings for local Obsidian vault index
+    OBSIDIAN_VAULT_PATH: Optional[str] = None
+    OBSIDIAN_INDEX_PATH: str = "data/obsidian_index.sqlite"
+    OBSIDIAN_INDEX_REFRESH_SECONDS: int = 30
+
+    # Settings for MCP tool cache
+    MCP_TOOLS_TTL_SECONDS: int = 300
+    # Identical concurrent read-only tool calls share one request; results are reused this long (0 - off)
+    MCP_CALL_CACHE_TTL_SECONDS: float = 10.0
+    MCP_CALL_CACHE_MAX_ENTRIES: int = 512
+
     # Settings for Agent
     MAX_RECURSION_LIMIT: int = 50
-    SUMMARIZATION_TRIGGER_TOKENS: int = 4096
-    
+    # Time budget of one request; past it agents answer with what they gathered (0 disables it)
+    REQUEST_TIMEOUT_SECONDS: float = 120.0
+    # Connect MCP servers, build the graph and open LLM connections right after initialize()
+    WARMUP_ON_START: bool = False
+    MAX_PARALLEL_SUBAGENTS: int = 4
+    # Send clearly single-domain requests straight to one sub-agent
+    ROUTER_ENABLED: bool = True
+    # Summarize at this fraction of the context window (capped by SUMMARIZATION_TRIGGER_TOKENS)
+    # and keep this share of the trigger verbatim
+    SUMMARIZATION_TRIGGER_FRACTION: float = 0.6
+    SUMMARIZATION_TRIGGER_TOKENS: Optional[int] = None
+    SUMMARIZATION_KEEP_RATIO: float = 0.4
+    # Sub-agents bind compact schemas of all tools, so tools and system prompt are a prefix
+    # cached across tasks; top-k > 0 binds only the tools ranked best for the task instead
+    TOOL_SELECTION_TOP_K: int = 0
+    TOOL_SCHEMA_COMPACT: bool = True
+    # Tool results over budget keep their most relevant chunks; the rest goes to the blob store
+    TOOL_OUTPUT_MAX_CHARS: int = 12000
+    TOOL_OUTPUT_TURN_MAX_CHARS: int = 40000
+    TOOL_OUTPUT_CHUNK_CHARS: int = 1500
+
+    # Settings for checkpointer ("memory" or "sqlite")
+    CHECKPOINT_BACKEND: str = "memory"
+    CHECKPOINT_SQLITE_PATH: str = "data/checkpoints.sqlite"
+    CHECKPOINT_MAX_PER_THREAD: int = 20
+    CHECKPOINT_MAX_THREADS: int = 1000
+    CHECKPOINT_THREAD_TTL_SECONDS: int = 7 * 24 * 3600
+    CHECKPOINT_WRITE_BATCH_SIZE: int = 32
+    CHECKPOINT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    CHECKPOINT_COMPACTION_INTERVAL_SECONDS: int = 300
+    # Message contents of this many characters are stored once in a blob store of their own
+    # and referenced from checkpoints (0 disables it); larger payloads are compressed
+    CHECKPOINT_BLOB_MIN_CHARS: int = 2048
+    CHECKPOINT_BLOB_STORE_PATH: str = "data/checkpoint_blobs"
+    CHECKPOINT_COMPRESSION_MIN_BYTES: int = 4096
+
+    # Settings for local blob store of spilled tool outputs
+    BLOB_STORE_PATH: str = "data/blobs"
+    BLOB_STORE_MAX_AGE_SECONDS: int = 7 * 24 * 3600
+
+    # Settings for per-thread scratchpad of sub-agent read tool results (0 entries disables it)
+    SCRATCHPAD_MAX_ENTRIES: int = 64
+    SCRATCHPAD_MAX_CHARS: int = 2_000_000
+    SCRATCHPAD_TTL_SECONDS: int = 3600
+
+    # Settings for sub-agent response cache
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 256
+    RESPONSE_CACHE_TTL_SECONDS: int = 900
+    RESPONSE_CACHE_EMBEDDING_MODEL: Optional[str] = None
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = 0.92
+
+    # Settings for metrics (Prometheus endpoint is off unless a port is set)
+    METRICS_PORT: Optional[int] = None
+    METRICS_JSON_LOG: bool = False
+
+    # Settings for logging: root level, per-module levels ("module=LEVEL,..."),
+    # "text" or "json" output, share of DEBUG records kept and log queue size
+    LOG_LEVEL: str = "DEBUG"
+    LOG_LEVELS: str = (
+        "httpx=WARNING,httpcore=WARNING,urllib3=WARNING,openai=WARNING,mcp=WARNING"
+    )
+    LOG_FORMAT: str = "text"
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0
+    LOG_QUEUE_SIZE: int = 10000
+
+    # Settings for HTTP API server
+    API_HOST: str = "0.0.0.0"
+    API_PORT: int = 8080
+    API_MAX_RUNNING_REQUESTS: int = 32
+    API_MAX_QUEUED_REQUESTS: int = 128
+    API_QUEUE_TIMEOUT_SECONDS: float = 30.0
+    API_DRAIN_TIMEOUT_SECONDS: float = 60.0
+
     # Directory with prompts
     SYSTEM_PROMPT_DIR: str = "prompts"
-    
+
     # Settings for Human-in-the-loop policy
     ENABLE_HUMAN_APPROVAL: bool = True
-    
+    # Only tool calls the approval policy classifies as writes wait for approval;
+    # the policy is a JSON file of rules (built-in rules when unset)
+    APPROVAL_AUTO_APPROVE_READS: bool = True
+    APPROVAL_POLICY_PATH: Optional[str] = None
+
     @property
     def confluence_mcp_config(self) -> dict:
         """Get Confluence MCP server config."""
-        return {"confluence": {"url": self.CONFLUENCE_MCP_URL, "transport": "streamable_http"}}
-    
+        return {
+            "confluence": {
+                "url": self.CONFLUENCE_MCP_URL,
+                "transport": "streamable_http",
+            }
+        }
+
+    @property
+    def confluence_mirror_spaces(self) -> list[str]:
+        """Get Confluence space keys to mirror locally."""
+        return [
+            key.strip()
+            for key in self.CONFLUENCE_MIRROR_SPACES.split(",")
+            if key.strip()
+        ]
+
     @property
     def obsidian_mcp_config(self) -> dict:
         """Get Obsidian MCP server config."""
-        return {"obsidian": {"url": self.OBSIDIAN_MCP_URL, "transport": "streamable_http"}}
+        return {
+            "obsidian": {"url": self.OBSIDIAN_MCP_URL, "transport": "streamable_http"}
+        }
+
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
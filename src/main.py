@@ -3,7 +3,8 @@ import logging
 import uuid
 from typing import Optional
 
-from agents.supervisor_graph import SupervisorSystem
+# First, so startup timings count from process start
+from utils.startup import startup_report
 from config.settings import settings
 from logger.logger import init_logs
 
@@ -14,70 +15,122 @@ class KnowledgeAssistant:
     def __init__(self):
         self.system = None
         self._initialized = False
-    
+
     async def initialize(self):
         if self._initialized:
             return
-        
+
         logger.info("=" * 60)
         logger.info("Starting Knowledge Assistant")
         logger.info("=" * 60)
         logger.info("Model: %s", settings.OPENAI_DEFAULT_MODEL)
         logger.info("Confluence MCP: %s", settings.CONFLUENCE_MCP_URL)
         logger.info("Obsidian MCP: %s", settings.OBSIDIAN_MCP_URL)
-        logger.info("Human-in-the-loop: %s", "Enabled" if settings.ENABLE_HUMAN_APPROVAL else "Disabled")
-        
+        logger.info(
+            "Human-in-the-loop: %s",
+            "Enabled" if settings.ENABLE_HUMAN_APPROVAL else "Disabled",
+        )
+
+        # LangChain, LangGraph, OpenAI and MCP modules load here, not at program start
+        with startup_report.phase("imports"):
+            from agents.supervisor_graph import SupervisorSystem
+
         self.system = SupervisorSystem()
-        await self.system.initialize()
-        
+        # input() blocks the event loop, so warm up before the first prompt instead of in the background
+        if settings.WARMUP_ON_START:
+            await self.system.warm_up()
+        else:
+            await self.system.initialize()
+            startup_report.log()
+
         self._initialized = True
         logger.info("System ready!")
-    
-    async def chat(self, user_input: str, thread_id: Optional[str] = None) -> tuple[dict, str]:
+
+    async def chat(
+        self, user_input: str, thread_id: Optional[str] = None
+    ) -> tuple[dict, str]:
         await self.initialize()
-        
+
         if thread_id is None:
             thread_id = str(uuid.uuid4())
             logger.info("New dialog: %s...", thread_id[:8])
-        
+
         try:
             response = await self.system.run(user_input, thread_id)
             return response, thread_id
         except Exception as e:
             logger.error("Error processing request: %s", e, exc_info=True)
             return {"status": "error", "content": str(e)}, thread_id
-    
+
+    async def stream_chat(self, user_input: str, thread_id: str):
+        await self.initialize()
+
+        try:
+            async for event in self.system.astream_run(user_input, thread_id):
+                yield event
+        except Exception as e:
+            logger.error("Error processing request: %s", e, exc_info=True)
+            yield {"type": "error", "status": "error", "content": str(e)}
+
+    async def _print_stream(self, user_input: str, thread_id: str):
+        started = False
+
+        async for event in self.stream_chat(user_input, thread_id):
+            if event["type"] == "progress":
+                print(f"  ↳ {event['agent']}: {event['tool']}", flush=True)
+                continue
+
+            if not started:
+                print("\nAssistant: ", end="", flush=True)
+
+            if event["type"] == "token":
+                print(event["content"], end="", flush=True)
+            elif not started:
+                print(event.get("content", ""), end="")
+
+            if event["type"] == "pending_approval":
+                for tc in event["tool_calls"]:
+                    print(f"\n  - {tc['name']}: {tc['args']}", end="")
+            elif event.get("partial"):
+                print("\n  [Time limit reached, partial answer]", end="")
+
+            started = True
+
+        print()
+
     async def interactive_session(self):
         await self.initialize()
-        
+
         logger.info("=" * 60)
         logger.info("Interactive mode")
         logger.info("=" * 60)
         logger.info("Commands: 'quit'/'exit' - exit, 'new' - new dialog")
         logger.info("=" * 60)
-        
+
         thread_id = None
-        
+
         while True:
             try:
                 user_input = input("\nYou: ").strip()
-                
+
                 if not user_input:
                     continue
-                
+
                 if user_input.lower() in ["quit", "exit"]:
                     logger.info("Goodbye!")
                     break
-                
+
                 if user_input.lower() == "new":
                     thread_id = None
                     logger.info("New dialog started")
                     continue
-                
-                result, thread_id = await self.chat(user_input, thread_id)
-                content = result.get("content", result) if isinstance(result, dict) else result
-                print(f"\nAssistant: {content}")
-                
+
+                if thread_id is None:
+                    thread_id = str(uuid.uuid4())
+                    logger.info("New dialog: %s...", thread_id[:8])
+
+                await self._print_stream(user_input, thread_id)
+
             except KeyboardInterrupt:
                 logger.warning("Interrupted. Type 'quit' to exit.")
             except Exception as e:
@@ -88,7 +141,7 @@ async def main():
     init_logs()
     settings.configure_langsmith()
     assistant = KnowledgeAssistant()
-    
+
     try:
         await assistant.interactive_session()
     except KeyboardInterrupt:
@@ -96,7 +149,7 @@ async def main():
     except Exception as e:
         logger.critical("Critical error: %s", e, exc_info=True)
         return 1
-    
+
     return 0
 
 
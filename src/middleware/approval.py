@@ -0,0 +1,158 @@
+"""Human approval of the Supervisor's write tool calls and its enforcement in sub-agents."""
+
+import logging
+from typing import Any
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.types import interrupt
+
+from utils.approval_policy import ApprovalPolicy
+from utils.metrics import metrics
+from utils.tool_access import in_read_only_delegation, is_read_only_tool
+
+logger = logging.getLogger(__name__)
+
+
+def is_approved(decision: Any) -> bool:
+    """Resume value approving the pending calls: ``True`` or ``{"action": "approved"}``."""
+    if isinstance(decision, dict):
+        return decision.get("action") in ("approve", "approved")
+    return decision is True
+
+
+class ApprovalPolicyMiddleware(AgentMiddleware):
+    """Interrupt for the tool calls of a model response that the policy classifies as writes.
+
+    Reads run without a pause. All writes of one response are pending in a
+    single interrupt whose value lists them under ``tool_calls``; resuming with
+    an approval runs them, anything else answers each of them with a rejection
+    so the model sees they were not executed. With ``auto_approve_reads`` off
+    every call is interrupted.
+    """
+
+    def __init__(
+        self,
+        policy: ApprovalPolicy,
+        auto_approve_reads: bool = True,
+        agent_name: str = "supervisor",
+    ):
+        super().__init__()
+        self.policy = policy
+        self.auto_approve_reads = auto_approve_reads
+        self.agent_name = agent_name
+
+    def _needs_approval(self, tool_call: dict) -> bool:
+        return not self.auto_approve_reads or self.policy.requires_approval(
+            tool_call["name"], tool_call["args"]
+        )
+
+    async def aafter_model(self, state, runtime):
+        messages = state["messages"]
+        last_ai = next(
+            (m for m in reversed(messages) if isinstance(m, AIMessage)), None
+        )
+        if last_ai is None or not last_ai.tool_calls:
+            return None
+
+        pending = [tc for tc in last_ai.tool_calls if self._needs_approval(tc)]
+        auto_approved = len(last_ai.tool_calls) - len(pending)
+        if not pending:
+            metrics.inc(
+                "tool_approvals_total",
+                auto_approved,
+                agent=self.agent_name,
+                outcome="auto",
+            )
+            return None
+
+        decision = interrupt(
+            {
+                "tool_calls": [
+                    {"name": tc["name"], "args": tc["args"], "id": tc["id"]}
+                    for tc in pending
+                ],
+            }
+        )
+        # The node runs again on resume, so calls are counted only once the decision is in
+        metrics.inc(
+            "tool_approvals_total", auto_approved, agent=self.agent_name, outcome="auto"
+        )
+        if is_approved(decision):
+            metrics.inc(
+                "tool_approvals_total",
+                len(pending),
+                agent=self.agent_name,
+                outcome="approved",
+            )
+            return None
+
+        metrics.inc(
+            "tool_approvals_total",
+            len(pending),
+            agent=self.agent_name,
+            outcome="rejected",
+        )
+        logger.debug("User rejected %d tool calls", len(pending))
+        return {
+            "messages": [
+                ToolMessage(
+                    content=(
+                        f"User rejected the tool call for `{tc['name']}`. The tool was not executed. "
+                        "Do not retry this tool call unless the user explicitly requests it."
+                    ),
+                    name=tc["name"],
+                    tool_call_id=tc["id"],
+                    status="error",
+                )
+                for tc in pending
+            ],
+        }
+
+
+def _tool_name(tool) -> str:
+    if isinstance(tool, dict):
+        return tool.get("function", tool).get("name", "")
+    return getattr(tool, "name", "")
+
+
+class ReadOnlyToolsMiddleware(AgentMiddleware):
+    """Keep a sub-agent to read-only tools while it runs a delegation approved as a read.
+
+    The Supervisor's approval covers the delegated request, not the tools the
+    sub-agent picks for it: a request auto-approved as a lookup ("find the
+    note and fix the typo") must not reach a write tool. Write tools are not
+    bound for such runs, and a write call the model makes anyway is answered
+    with an error instead of being executed. Other runs are left unchanged.
+    """
+
+    def __init__(self, agent_name: str):
+        super().__init__()
+        self.agent_name = agent_name
+
+    async def awrap_model_call(self, request, handler):
+        if in_read_only_delegation():
+            request = request.override(
+                tools=[t for t in request.tools if is_read_only_tool(_tool_name(t))]
+            )
+        return await handler(request)
+
+    async def awrap_tool_call(self, request, handler):
+        name = request.tool_call["name"]
+        if not in_read_only_delegation() or is_read_only_tool(name):
+            return await handler(request)
+
+        metrics.inc("tool_approvals_total", agent=self.agent_name, outcome="blocked")
+        logger.debug(
+            "%s: blocked write tool %s in a read-only delegation", self.agent_name, name
+        )
+        return ToolMessage(
+            content=(
+                f"`{name}` changes data, but this task was approved only as a lookup. "
+                "The tool was not executed. Report what you found and that the change needs "
+                "a separate request the user approves."
+            ),
+            name=name,
+            tool_call_id=request.tool_call["id"],
+            status="error",
+        )
@@ -0,0 +1,150 @@
+"""Stopping an agent at the request deadline with the results gathered so far."""
+
+import asyncio
+import logging
+
+from langchain.agents.middleware import (
+    AgentMiddleware,
+    ToolRetryMiddleware,
+    hook_config,
+)
+from langchain.agents.middleware._retry import calculate_delay, should_retry_exception
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langgraph.errors import GraphBubbleUp
+
+from middleware.tool_output_budget import text_content
+from utils.deadline import expired, fits, remaining
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# response_metadata key of answers cut short by the deadline
+PARTIAL_MARKER = "partial"
+# Characters of each gathered result kept in a partial answer
+PARTIAL_RESULT_CHARS = 2000
+
+
+def is_partial(message: BaseMessage) -> bool:
+    return bool(message.response_metadata.get(PARTIAL_MARKER))
+
+
+def partial_answer(messages: list) -> AIMessage:
+    """Answer made of the tool results of the current turn, marked as partial."""
+    last_human = max(
+        (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1
+    )
+    results = []
+    for message in messages[last_human + 1 :]:
+        if isinstance(message, ToolMessage) and message.status != "error":
+            text = text_content(message.content) or ""
+            if len(text) > PARTIAL_RESULT_CHARS:
+                text = text[:PARTIAL_RESULT_CHARS] + "\n[...]"
+            results.append(f"{message.name or 'tool'}:\n{text}")
+
+    if results:
+        content = (
+            "The time limit for this request ran out before the answer was complete. "
+            "Results gathered so far:\n\n" + "\n\n".join(results)
+        )
+    else:
+        content = (
+            "The time limit for this request ran out before any results were gathered."
+        )
+    return AIMessage(content=content, response_metadata={PARTIAL_MARKER: True})
+
+
+class DeadlineMiddleware(AgentMiddleware):
+    """End the agent's run with a partial answer once the request deadline passes.
+
+    No model call starts after the deadline, and one in flight is cancelled
+    when it passes; either way the agent answers with the tool results of the
+    turn, marked with ``PARTIAL_MARKER``. With ``limit_tool_calls`` tool calls
+    are cancelled at the deadline too; the Supervisor leaves that to the
+    sub-agents, so a delegation still returns what it gathered.
+    """
+
+    def __init__(self, agent_name: str = "agent", limit_tool_calls: bool = True):
+        super().__init__()
+        self.agent_name = agent_name
+        self.limit_tool_calls = limit_tool_calls
+
+    @hook_config(can_jump_to=["end"])
+    async def abefore_model(self, state, runtime):
+        if not expired():
+            return None
+        logger.warning(
+            "%s ran out of time, answering with partial results", self.agent_name
+        )
+        metrics.inc("deadline_exceeded_total", agent=self.agent_name, stage="model")
+        return {"messages": [partial_answer(state["messages"])], "jump_to": "end"}
+
+    async def awrap_model_call(self, request, handler):
+        left = remaining()
+        if left is None:
+            return await handler(request)
+        try:
+            async with asyncio.timeout(max(left, 0)) as timeout:
+                return await handler(request)
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+        logger.warning("%s model call cut off by the deadline", self.agent_name)
+        metrics.inc("deadline_exceeded_total", agent=self.agent_name, stage="model")
+        return partial_answer(request.messages)
+
+    async def awrap_tool_call(self, request, handler):
+        left = remaining()
+        if not self.limit_tool_calls or left is None:
+            return await handler(request)
+        name = request.tool_call["name"]
+        try:
+            async with asyncio.timeout(max(left, 0)) as timeout:
+                return await handler(request)
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+        metrics.inc("deadline_exceeded_total", agent=self.agent_name, stage="tool")
+        return ToolMessage(
+            content=f"Tool {name} did not finish before the request's time limit.",
+            name=name,
+            tool_call_id=request.tool_call["id"],
+            status="error",
+        )
+
+
+class DeadlineToolRetryMiddleware(ToolRetryMiddleware):
+    """ToolRetryMiddleware that gives up instead of backing off past the request deadline."""
+
+    # Mirrors ToolRetryMiddleware.awrap_tool_call of langchain 1.4 with a deadline check
+    # before the backoff; the upstream loop has no hook for it. The helpers come from
+    # the private langchain.agents.middleware._retry, so pyproject pins langchain to 1.4.x:
+    # re-check this copy against upstream when raising the pin.
+    async def awrap_tool_call(self, request, handler):
+        tool_name = request.tool.name if request.tool else request.tool_call["name"]
+        if not self._should_retry_tool(tool_name):
+            return await handler(request)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await handler(request)
+            except GraphBubbleUp:
+                raise
+            except Exception as exc:
+                if not should_retry_exception(exc, self.retry_on):
+                    raise
+                delay = calculate_delay(
+                    attempt,
+                    backoff_factor=self.backoff_factor,
+                    initial_delay=self.initial_delay,
+                    max_delay=self.max_delay,
+                    jitter=self.jitter,
+                )
+                if attempt >= self.max_retries or not fits(delay):
+                    if attempt < self.max_retries:
+                        metrics.inc("deadline_retries_skipped_total", kind="tool")
+                    return self._handle_failure(
+                        tool_name, request.tool_call["id"], exc, attempt + 1
+                    )
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        raise RuntimeError("Unexpected: retry loop completed without returning")
@@ -0,0 +1,150 @@
+import time
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage, ToolMessage
+
+from utils.metrics import log_event, metrics
+
+
+class MetricsMiddleware(AgentMiddleware):
+    """Record latency, tokens and payload sizes of an agent's LLM and tool calls."""
+
+    def __init__(self, agent_name: str):
+        super().__init__()
+        self.agent_name = agent_name
+
+    async def awrap_model_call(self, request, handler):
+        started = time.perf_counter()
+        status = "error"
+        prompt_tokens = completion_tokens = cached_tokens = 0
+        try:
+            response = await handler(request)
+            status = "success"
+            for message in getattr(response, "result", [response]):
+                usage = (
+                    getattr(message, "usage_metadata", None)
+                    if isinstance(message, AIMessage)
+                    else None
+                )
+                if usage:
+                    prompt_tokens += usage.get("input_tokens", 0)
+                    completion_tokens += usage.get("output_tokens", 0)
+                    cached_tokens += (usage.get("input_token_details") or {}).get(
+                        "cache_read", 0
+                    )
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.observe(
+                "llm_call_seconds", elapsed, agent=self.agent_name, status=status
+            )
+            metrics.inc("llm_prompt_tokens_total", prompt_tokens, agent=self.agent_name)
+            metrics.inc(
+                "llm_completion_tokens_total", completion_tokens, agent=self.agent_name
+            )
+            metrics.inc(
+                "llm_cached_prompt_tokens_total", cached_tokens, agent=self.agent_name
+            )
+            if prompt_tokens:
+                metrics.observe(
+                    "llm_prefix_cache_hit_ratio",
+                    cached_tokens / prompt_tokens,
+                    agent=self.agent_name,
+                )
+            log_event(
+                "llm_call",
+                agent=self.agent_name,
+                status=status,
+                seconds=round(elapsed, 4),
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                cached_tokens=cached_tokens,
+            )
+
+    async def awrap_tool_call(self, request, handler):
+        tool = request.tool_call["name"]
+        started = time.perf_counter()
+        status = "error"
+        payload_bytes = 0
+        try:
+            result = await handler(request)
+            if isinstance(result, ToolMessage):
+                status = result.status
+                payload_bytes = len(str(result.content).encode())
+            else:
+                status = "success"
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.observe(
+                "tool_call_seconds",
+                elapsed,
+                agent=self.agent_name,
+                tool=tool,
+                status=status,
+            )
+            metrics.observe(
+                "tool_payload_bytes", payload_bytes, agent=self.agent_name, tool=tool
+            )
+            log_event(
+                "tool_call",
+                agent=self.agent_name,
+                tool=tool,
+                status=status,
+                seconds=round(elapsed, 4),
+                payload_bytes=payload_bytes,
+            )
+
+
+class NodeTimingCallback(BaseCallbackHandler):
+    """Record the wall time of every graph node run, including sub-agent nodes."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._started: dict[UUID, tuple[float, str, str]] = {}
+
+    def on_chain_start(
+        self,
+        serialized: Optional[dict[str, Any]],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            agent = metadata.get("lc_agent_name", "unknown")
+            self._started[run_id] = (time.perf_counter(), agent, node)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "success")
+
+    def on_chain_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._finish(run_id, "error")
+
+    def _finish(self, run_id: UUID, status: str):
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        began, agent, node = started
+        elapsed = time.perf_counter() - began
+        metrics.observe(
+            "graph_node_seconds", elapsed, agent=agent, node=node, status=status
+        )
+        log_event(
+            "graph_node",
+            agent=agent,
+            node=node,
+            status=status,
+            seconds=round(elapsed, 4),
+        )
+
+
+node_timing = NodeTimingCallback()
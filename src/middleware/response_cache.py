@@ -0,0 +1,20 @@
+from langchain.agents.middleware import AgentMiddleware
+
+from utils.response_cache import ResponseCache
+from utils.tool_access import is_read_only_tool
+
+
+class ResponseCacheInvalidationMiddleware(AgentMiddleware):
+    """Invalidate an agent's cached answers whenever it calls a write tool."""
+
+    def __init__(self, cache: ResponseCache, agent_name: str):
+        super().__init__()
+        self.cache = cache
+        self.agent_name = agent_name
+
+    async def awrap_tool_call(self, request, handler):
+        try:
+            return await handler(request)
+        finally:
+            if not is_read_only_tool(request.tool_call["name"]):
+                self.cache.invalidate(self.agent_name)
@@ -0,0 +1,96 @@
+"""Reuse of sub-agent tool results across the turns of a thread."""
+
+import asyncio
+import json
+from typing import Annotated
+
+from langchain.agents.middleware import AgentMiddleware, AgentState
+from langchain.agents.middleware.types import PrivateStateAttr
+from langchain_core.messages import HumanMessage, ToolMessage
+from typing_extensions import NotRequired
+
+from middleware.tool_output_budget import READ_STORED_CONTENT_TOOL, text_content
+from storage.scratchpad import Scratchpad, merge_scratchpad
+from utils.metrics import metrics
+from utils.tool_access import is_read_only_tool
+
+# Stored calls listed to the sub-agent model
+LISTED_CALLS = 20
+
+
+class ScratchpadState(AgentState):
+    scratchpad: NotRequired[Annotated[dict, PrivateStateAttr, merge_scratchpad]]
+
+
+class ScratchpadStateMiddleware(AgentMiddleware):
+    """Keep the thread scratchpad in Supervisor state, so it is checkpointed with the thread."""
+
+    state_schema = ScratchpadState
+
+
+class ScratchpadMiddleware(AgentMiddleware):
+    """Serve repeated read tool calls of a sub-agent from the thread scratchpad.
+
+    The Supervisor passes the ``Scratchpad`` of the delegation as the run
+    context. Results of read tools are stored in it and returned for the same
+    call later in the thread; write tools drop the agent's entries. The model
+    sees which calls are stored, so follow-up questions reuse them; the list
+    goes after the task to keep the system prompt a stable prefix. Being the
+    innermost tool wrapper, it stores raw results and hits still go through
+    the tool output budget.
+    """
+
+    def __init__(self, agent_name: str = "agent"):
+        super().__init__()
+        self.agent_name = agent_name
+
+    async def awrap_model_call(self, request, handler):
+        scratchpad = request.runtime.context
+        if not isinstance(scratchpad, Scratchpad):
+            return await handler(request)
+        calls = scratchpad.calls(LISTED_CALLS)
+        if not calls:
+            return await handler(request)
+
+        listing = "\n".join(
+            f"- {tool} {json.dumps(args, ensure_ascii=False)}" for tool, args in calls
+        )
+        note = (
+            "\n\nResults of these tool calls from earlier in the conversation are stored "
+            f"and returned instantly when called with the same arguments:\n{listing}"
+        )
+        messages = list(request.messages)
+        for i, message in enumerate(messages):
+            if isinstance(message, HumanMessage):
+                messages[i] = HumanMessage(content=message.text + note, id=message.id)
+                break
+        else:
+            return await handler(request)
+        return await handler(request.override(messages=messages))
+
+    async def awrap_tool_call(self, request, handler):
+        scratchpad = request.runtime.context
+        name = request.tool_call["name"]
+        if not isinstance(scratchpad, Scratchpad) or name == READ_STORED_CONTENT_TOOL:
+            return await handler(request)
+        if not is_read_only_tool(name):
+            try:
+                return await handler(request)
+            finally:
+                scratchpad.invalidate()
+
+        args = request.tool_call.get("args", {})
+        cached = await asyncio.to_thread(scratchpad.get, name, args)
+        if cached is not None:
+            metrics.inc("scratchpad_hits_total", agent=self.agent_name, tool=name)
+            return ToolMessage(
+                content=cached, name=name, tool_call_id=request.tool_call["id"]
+            )
+
+        metrics.inc("scratchpad_misses_total", agent=self.agent_name, tool=name)
+        result = await handler(request)
+        if isinstance(result, ToolMessage) and result.status != "error":
+            text = text_content(result.content)
+            if text is not None:
+                await asyncio.to_thread(scratchpad.put, name, args, text)
+        return result
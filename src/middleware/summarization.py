@@ -0,0 +1,128 @@
+"""Summarization that extends the previous summary and scales with the context window."""
+
+import logging
+import time
+from typing import Optional
+
+from langchain.agents.middleware import SummarizationMiddleware
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AnyMessage, HumanMessage, get_buffer_string
+
+from config.settings import settings
+from utils.metrics import metrics
+from utils.tokens import get_token_counter
+
+logger = logging.getLogger(__name__)
+
+# Used when neither LLM_CONTEXT_WINDOW nor the model profile give a context window
+DEFAULT_TRIGGER_TOKENS = 4096
+
+INCREMENTAL_SUMMARY_PROMPT = """<role>
+Context Extraction Assistant
+</role>
+
+<primary_objective>
+Update the running summary of a conversation with the messages that happened after it.
+</primary_objective>
+
+<instructions>
+Return the complete updated summary, keeping the sections of the current summary
+(SESSION INTENT, SUMMARY, ARTIFACTS, NEXT STEPS). Keep everything from the current
+summary that still matters, add the important facts, decisions, page IDs, note paths
+and results from the new messages, and drop what the new messages made obsolete.
+Respond ONLY with the updated summary.
+</instructions>
+
+<current_summary>
+{summary}
+</current_summary>
+
+<new_messages>
+{messages}
+</new_messages>"""
+
+
+def _is_summary(message: AnyMessage) -> bool:
+    return (
+        isinstance(message, HumanMessage)
+        and message.additional_kwargs.get("lc_source") == "summarization"
+    )
+
+
+def _summary_text(message: HumanMessage) -> str:
+    text = message.text
+    _, separator, summary = text.partition("\n\n")
+    return summary if separator else text
+
+
+def context_window(model: BaseChatModel) -> Optional[int]:
+    """Context window from LLM_CONTEXT_WINDOW or the model profile."""
+    if settings.LLM_CONTEXT_WINDOW:
+        return settings.LLM_CONTEXT_WINDOW
+    profile = getattr(model, "profile", None)
+    window = profile.get("max_input_tokens") if isinstance(profile, dict) else None
+    return window if isinstance(window, int) else None
+
+
+def summarization_limits(model: BaseChatModel) -> tuple[int, int]:
+    """Token counts that trigger summarization and that are kept verbatim after it."""
+    window = context_window(model)
+    trigger = (
+        int(window * settings.SUMMARIZATION_TRIGGER_FRACTION)
+        if window
+        else DEFAULT_TRIGGER_TOKENS
+    )
+    if settings.SUMMARIZATION_TRIGGER_TOKENS:
+        trigger = min(trigger, settings.SUMMARIZATION_TRIGGER_TOKENS)
+    return trigger, max(1, int(trigger * settings.SUMMARIZATION_KEEP_RATIO))
+
+
+class RollingSummarizationMiddleware(SummarizationMiddleware):
+    """SummarizationMiddleware that keeps one rolling summary per thread.
+
+    Once the history exceeds the trigger, everything but the most recent
+    ``keep_tokens`` is folded into the summary: the previous summary is
+    extended with the messages after it instead of being summarized again
+    together with them. Keeping well below the trigger leaves room for
+    several turns before the next summary. Tokens are counted with the
+    model's tiktoken encoding, memoized per message.
+    """
+
+    def __init__(
+        self,
+        model: BaseChatModel,
+        trigger_tokens: int,
+        keep_tokens: int,
+        summarizer: Optional[BaseChatModel] = None,
+    ):
+        super().__init__(
+            model,
+            trigger=("tokens", trigger_tokens),
+            keep=("tokens", keep_tokens),
+            token_counter=get_token_counter(getattr(model, "model_name", None)),
+            summarizer=summarizer,
+            trim_tokens_to_summarize=trigger_tokens,
+        )
+
+    def _format_summary_prompt(self, messages: list[AnyMessage]) -> str:
+        if messages and _is_summary(messages[0]):
+            return INCREMENTAL_SUMMARY_PROMPT.format(
+                summary=_summary_text(messages[0]),
+                messages=get_buffer_string(messages[1:], format="xml"),
+            )
+        return super()._format_summary_prompt(messages)
+
+    async def abefore_model(self, state, runtime):
+        started = time.perf_counter()
+        update = await super().abefore_model(state, runtime)
+        if update is not None:
+            elapsed = time.perf_counter() - started
+            incremental = any(_is_summary(m) for m in state["messages"])
+            metrics.observe("summarization_seconds", elapsed, incremental=incremental)
+            logger.debug(
+                "Summarized %d messages in %.2fs (incremental=%s)",
+                len(state["messages"]),
+                elapsed,
+                incremental,
+            )
+        return update
@@ -0,0 +1,236 @@
+"""Cap the size of tool results kept in sub-agent message history."""
+
+import asyncio
+import json
+from typing import Any, Optional
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain.tools import tool
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from storage.blob_store import BlobStore
+from utils.html_markdown import html_to_markdown, looks_like_html
+from utils.metrics import metrics
+from utils.ranking import BM25, terms
+
+READ_STORED_CONTENT_TOOL = "read_stored_content"
+# Every call keeps at least this much so the agent still sees the content id
+MIN_CALL_CHARS = 1000
+# JSON string fields longer than this are rendered as markdown sections
+LONG_FIELD_CHARS = 500
+
+
+def text_content(content: Any) -> Optional[str]:
+    """Text of a tool result, or None when it contains non-text blocks."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list) and all(
+        isinstance(block, str)
+        or (isinstance(block, dict) and block.get("type") == "text")
+        for block in content
+    ):
+        return "\n".join(
+            block if isinstance(block, str) else block.get("text", "")
+            for block in content
+        )
+    return None
+
+
+def _compact_value(value: Any, path: str, sections: list[tuple[str, str]]) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: _compact_value(item, f"{path}.{key}" if path else key, sections)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [
+            _compact_value(item, f"{path}[{i}]", sections)
+            for i, item in enumerate(value)
+        ]
+    if isinstance(value, str):
+        if looks_like_html(value):
+            value = html_to_markdown(value)
+        if len(value) > LONG_FIELD_CHARS:
+            sections.append((path, value))
+            return f"<see section {path}>"
+    return value
+
+
+def compact_tool_output(text: str) -> str:
+    """Convert HTML to markdown and move long JSON text fields out of the JSON."""
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return html_to_markdown(text) if looks_like_html(text) else text
+    if not isinstance(payload, (dict, list)):
+        return text
+
+    sections: list[tuple[str, str]] = []
+    payload = _compact_value(payload, "", sections)
+    rendered = json.dumps(payload, ensure_ascii=False)
+    return "\n\n".join([rendered, *(f"## {path}\n\n{body}" for path, body in sections)])
+
+
+def split_chunks(text: str, size: int) -> list[tuple[int, str]]:
+    """Split text into ``(offset, chunk)`` pieces of at most ``size`` characters,
+    preferably on paragraph or line boundaries."""
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + size)
+        if end < len(text):
+            cut = text.rfind("\n\n", start + size // 2, end)
+            if cut == -1:
+                cut = text.rfind("\n", start + size // 2, end)
+            if cut != -1:
+                end = cut
+        chunks.append((start, text[start:end]))
+        start = end
+    return chunks
+
+
+def select_excerpt(text: str, query: str, budget: int, chunk_size: int) -> str:
+    """Most relevant chunks of ``text`` that fit into ``budget`` characters,
+    in document order and prefixed with their offsets."""
+    chunks = split_chunks(text, chunk_size)
+    scores = BM25([terms(chunk) for _, chunk in chunks]).scores(query)
+    # The first chunk usually holds the title and metadata
+    order = [0] + sorted(range(1, len(chunks)), key=lambda i: (-scores[i], i))
+
+    kept, used = [], 0
+    for i in order:
+        size = len(chunks[i][1]) + 40
+        if used + size > budget:
+            continue
+        kept.append(i)
+        used += size
+    if not kept:
+        return text[:budget]
+
+    parts = []
+    for i in sorted(kept):
+        offset, chunk = chunks[i]
+        parts.append(f"[offset {offset}]\n{chunk.strip()}")
+    return "\n\n[...]\n\n".join(parts)
+
+
+def _messages(state) -> list:
+    return (
+        state.get("messages", [])
+        if isinstance(state, dict)
+        else getattr(state, "messages", [])
+    )
+
+
+def _turn_usage(messages: list) -> tuple[int, int]:
+    """Characters of tool results since the last user message and the number of
+    tool calls in the latest model response."""
+    used = 0
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, ToolMessage):
+            used += len(str(message.content))
+    last_ai = next((m for m in reversed(messages) if isinstance(m, AIMessage)), None)
+    return used, max(1, len(last_ai.tool_calls) if last_ai is not None else 1)
+
+
+def create_read_stored_content_tool(store: BlobStore, max_chars: int):
+    """Create a tool paging through tool results spilled to the blob store."""
+
+    @tool(READ_STORED_CONTENT_TOOL)
+    async def read_stored_content(
+        content_id: str, offset: int = 0, length: int = max_chars
+    ) -> str:
+        """Read part of a truncated tool result by its content id, starting at a character offset."""
+        text = await asyncio.to_thread(store.get_text, content_id)
+        if text is None:
+            return f"No stored content with id {content_id}."
+
+        offset = max(0, offset)
+        end = min(len(text), offset + max(1, min(length, max_chars)))
+        more = f" Next offset: {end}." if end < len(text) else " End of content."
+        return f"[characters {offset}-{end} of {len(text)}.{more}]\n{text[offset:end]}"
+
+    return read_stored_content
+
+
+class ToolOutputBudgetMiddleware(AgentMiddleware):
+    """Keep tool results within a per-call and per-turn character budget.
+
+    HTML and Confluence storage format are converted to markdown first. A
+    result that is still over budget is stored in full in the blob store and
+    replaced by its chunks most relevant to the task and the tool arguments,
+    with the content id for ``read_stored_content``. The per-turn budget is
+    shared by the tool calls of one model response.
+    """
+
+    def __init__(
+        self,
+        store: BlobStore,
+        max_call_chars: int,
+        max_turn_chars: int,
+        chunk_chars: int,
+        agent_name: str = "agent",
+    ):
+        super().__init__()
+        self.store = store
+        self.max_call_chars = max_call_chars
+        self.max_turn_chars = max_turn_chars
+        self.chunk_chars = chunk_chars
+        self.agent_name = agent_name
+        self.tools = [create_read_stored_content_tool(store, max_call_chars)]
+
+    def _budget(self, state) -> int:
+        used, calls = _turn_usage(_messages(state))
+        remaining = (self.max_turn_chars - used) // calls
+        return max(MIN_CALL_CHARS, min(self.max_call_chars, remaining))
+
+    def _fit(self, text: str, budget: int, query: str) -> tuple[str, bool]:
+        """Compact ``text`` and, when still over budget, spill it and keep an excerpt."""
+        compact = compact_tool_output(text)
+        if len(compact) <= budget:
+            return compact, False
+
+        content_id = self.store.put_text(compact)
+        header = (
+            f"[Truncated {len(compact)} characters to the most relevant parts. "
+            f"Full content id: {content_id}; read more with {READ_STORED_CONTENT_TOOL}"
+            f"(content_id, offset).]\n\n"
+        )
+        return header + select_excerpt(
+            compact, query, budget - len(header), self.chunk_chars
+        ), True
+
+    async def awrap_tool_call(self, request, handler):
+        result = await handler(request)
+        name = request.tool_call["name"]
+        if not isinstance(result, ToolMessage) or name == READ_STORED_CONTENT_TOOL:
+            return result
+        text = text_content(result.content)
+        if text is None:
+            return result
+        budget = self._budget(request.state)
+        if len(text) <= budget and not looks_like_html(text):
+            return result
+
+        query = " ".join(
+            [
+                str(m.content)
+                for m in _messages(request.state)
+                if isinstance(m, HumanMessage)
+            ]
+            + [str(v) for v in request.tool_call.get("args", {}).values()]
+        )
+        content, truncated = await asyncio.to_thread(self._fit, text, budget, query)
+        if truncated:
+            metrics.inc(
+                "tool_output_truncations_total", agent=self.agent_name, tool=name
+            )
+        metrics.inc(
+            "tool_output_chars_saved_total",
+            max(0, len(text) - len(content)),
+            agent=self.agent_name,
+            tool=name,
+        )
+        return result.model_copy(update={"content": content})
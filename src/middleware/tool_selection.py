@@ -0,0 +1,155 @@
+"""Bind only the tools relevant to the task, with compact schemas."""
+
+import copy
+import json
+import re
+from typing import Iterable, Sequence
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from utils.metrics import metrics
+from utils.ranking import BM25, terms
+
+DESCRIPTION_MAX_CHARS = 160
+MAX_ENUM_VALUES = 8
+_DROPPED_SCHEMA_KEYS = ("title", "description", "examples", "$comment")
+
+
+def _short_description(description: str) -> str:
+    first = description.strip().split("\n\n", 1)[0]
+    first = " ".join(first.split())
+    sentence = re.split(r"(?<=[.!?])\s", first, maxsplit=1)[0]
+    if len(sentence) > DESCRIPTION_MAX_CHARS:
+        sentence = sentence[: DESCRIPTION_MAX_CHARS - 1].rstrip() + "…"
+    return sentence
+
+
+def _compact_schema(schema):
+    """Strip documentation keys from a JSON schema and drop long enums."""
+    if isinstance(schema, list):
+        return [_compact_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+
+    compact = {}
+    for key, value in schema.items():
+        if key in _DROPPED_SCHEMA_KEYS:
+            continue
+        if key == "enum" and isinstance(value, list) and len(value) > MAX_ENUM_VALUES:
+            continue
+        if key in ("properties", "$defs", "definitions") and isinstance(value, dict):
+            compact[key] = {name: _compact_schema(prop) for name, prop in value.items()}
+        else:
+            compact[key] = _compact_schema(value)
+    return compact
+
+
+def compact_tool_schema(tool: BaseTool) -> dict:
+    """OpenAI tool schema with a one-sentence description and no parameter docs."""
+    schema = copy.deepcopy(convert_to_openai_tool(tool))
+    function = schema["function"]
+    function["description"] = _short_description(function.get("description", ""))
+    if "parameters" in function:
+        function["parameters"] = _compact_schema(function["parameters"])
+    return schema
+
+
+def _tool_document(tool: BaseTool) -> list[str]:
+    """Searchable terms of a tool; the name counts twice."""
+    schema = tool.args if isinstance(tool.args, dict) else {}
+    name_terms = terms(tool.name)
+    return name_terms * 2 + terms(tool.description or "") + terms(" ".join(schema))
+
+
+class ToolSelectionMiddleware(AgentMiddleware):
+    """Rank the agent's tools against the task and bind only the top-k.
+
+    Tools are scored with BM25 over their names, descriptions and argument
+    names. Tools listed in ``always_include`` and tools the agent already
+    called in this run are always kept. When no tool matches the task at all,
+    every tool is bound. Schemas are compacted once at construction and
+    reused on every call.
+
+    The selection depends only on the task and keeps the original tool order,
+    so the ReAct steps of one task share the provider prefix cache. Different
+    tasks usually bind different tools, and tools come first in the prompt:
+    across tasks nothing is cached, not even the system prompt. ``top_k=0``,
+    the default setting, binds every tool and keeps that prefix shared, at
+    the cost of sending every schema.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        top_k: int,
+        always_include: Iterable[str] = (),
+        compact: bool = True,
+        agent_name: str = "agent",
+    ):
+        super().__init__()
+        self.top_k = top_k
+        self.always_include = set(always_include)
+        self.agent_name = agent_name
+        known = [t for t in tools if isinstance(t, BaseTool)]
+        self._names = [t.name for t in known]
+        self._ranker = BM25([_tool_document(t) for t in known])
+        self._schemas = {
+            t.name: compact_tool_schema(t) if compact else convert_to_openai_tool(t)
+            for t in known
+        }
+        self._schema_bytes = {
+            name: len(json.dumps(schema, ensure_ascii=False))
+            for name, schema in self._schemas.items()
+        }
+
+    def score(self, query: str) -> dict[str, float]:
+        """BM25 score of every known tool for the query."""
+        return dict(zip(self._names, self._ranker.scores(query)))
+
+    def select(
+        self, tool_names: Sequence[str], query: str, used: Iterable[str] = ()
+    ) -> set[str]:
+        """Names of the tools to bind for the query."""
+        known = [name for name in tool_names if name in self._schemas]
+        if self.top_k <= 0 or len(known) <= self.top_k:
+            return set(tool_names)
+
+        scores = self.score(query)
+        ranked = sorted(
+            (name for name in known if scores[name] > 0), key=lambda n: -scores[n]
+        )
+        if not ranked:
+            return set(tool_names)
+
+        pinned = (self.always_include | set(used)) & set(tool_names)
+        selected = set(ranked[: self.top_k]) | pinned
+        # Tools this middleware doesn't know (provider built-ins) are left alone
+        return selected | {name for name in tool_names if name not in self._schemas}
+
+    async def awrap_model_call(self, request, handler):
+        names = [t.name if isinstance(t, BaseTool) else None for t in request.tools]
+        query = "\n".join(
+            str(m.content) for m in request.messages if isinstance(m, HumanMessage)
+        )
+        used = {
+            call["name"]
+            for m in request.messages
+            if isinstance(m, AIMessage)
+            for call in m.tool_calls
+        }
+        selected = self.select([n for n in names if n], query, used)
+
+        tools = []
+        schema_bytes = 0
+        for tool, name in zip(request.tools, names):
+            if name is None:
+                tools.append(tool)
+            elif name in selected:
+                tools.append(self._schemas.get(name, tool))
+                schema_bytes += self._schema_bytes.get(name, 0)
+
+        metrics.observe("bound_tool_schema_bytes", schema_bytes, agent=self.agent_name)
+        return await handler(request.override(tools=tools))
@@ -0,0 +1,274 @@
+"""Local mirror of Confluence spaces, synced through the Confluence MCP tools."""
+
+import json
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from config.settings import settings
+from retrieval.fts_index import Document, FullTextIndex, SearchHit
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PAGE_SIZE = 50
+CQL_TIME_FORMAT = "%Y-%m-%d %H:%M"
+# CQL dates are in the server user's timezone; overlap syncs so no edit is missed
+SYNC_OVERLAP = timedelta(days=1)
+
+
+def chunk_text(text: str, size: int, overlap: int) -> list[str]:
+    """Split markdown into chunks of about ``size`` characters on paragraph boundaries."""
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    chunks, current = [], ""
+    for paragraph in paragraphs:
+        while len(paragraph) > size:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:size])
+            paragraph = paragraph[size - overlap :]
+        if current and len(current) + len(paragraph) + 2 > size:
+            chunks.append(current)
+            current = current[-overlap:] + "\n\n" + paragraph if overlap else paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _tool_payload(result: Any) -> Any:
+    """Decode the JSON text of an MCP tool result."""
+    if getattr(result, "isError", False):
+        raise RuntimeError(f"Confluence MCP tool failed: {result.content}")
+
+    text = "".join(getattr(block, "text", "") for block in result.content)
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def _page_version(page: dict) -> str:
+    version = page.get("version")
+    if isinstance(version, dict):
+        version = version.get("number")
+    return str(version or page.get("updated") or page.get("last_modified") or "")
+
+
+class ConfluenceMirror:
+    """Chunked BM25 index of Confluence pages.
+
+    ``sync`` walks each space with CQL ordered by ``lastmodified`` starting from
+    the previous sync time and only fetches pages whose version changed. A
+    ``full`` sync walks everything and also drops pages deleted upstream.
+    The sync time advances only after a pass that reached the end of the
+    results, so the next sync picks up the pages a stopped pass didn't reach.
+    Chunks are stored as ``<space>:<page_id>#<n>``.
+    """
+
+    def __init__(self, index_path: str, chunk_size: int, chunk_overlap: int):
+        self.index = FullTextIndex(index_path)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def search(self, query: str, limit: int = 5) -> list[SearchHit]:
+        """Return the best matching chunks, at most one per page."""
+        hits, seen = [], set()
+        for hit in self.index.search(query, limit * 3):
+            page_id = hit.metadata.get("page_id")
+            if page_id in seen:
+                continue
+            seen.add(page_id)
+            hits.append(hit)
+            if len(hits) == limit:
+                break
+        return hits
+
+    def last_synced(self, space: str) -> Optional[str]:
+        return self.index.get_state(f"synced:{space}")
+
+    async def sync(self, pool, spaces: list[str], full: bool = False) -> dict[str, int]:
+        """Mirror pages of the given spaces using the Confluence MCP tool pool."""
+        stats = {"fetched": 0, "deleted": 0}
+        for space in spaces:
+            started = (datetime.now(timezone.utc) - SYNC_OVERLAP).strftime(
+                CQL_TIME_FORMAT
+            )
+            since = None if full else self.last_synced(space)
+            fetched, deleted, complete = await self._sync_space(pool, space, since)
+            if complete:
+                self.index.set_state(f"synced:{space}", started)
+            else:
+                logger.warning(
+                    "Sync of space %s stopped before the end of the results, "
+                    "the next sync starts again from %s",
+                    space,
+                    since or "the beginning",
+                )
+            stats["fetched"] += fetched
+            stats["deleted"] += deleted
+            logger.info(
+                "Confluence space %s synced: %d pages fetched, %d deleted",
+                space,
+                fetched,
+                deleted,
+            )
+        return stats
+
+    async def _sync_space(
+        self, pool, space: str, since: Optional[str]
+    ) -> tuple[int, int, bool]:
+        """Return pages fetched and deleted, and whether the pass reached the end of the results."""
+        pages = self._indexed_pages(space)
+        seen: set[str] = set()
+        fetched = 0
+        cursor = since
+        # Only a sync that reached the end of the results knows which pages are gone
+        complete = False
+
+        while True:
+            cql = f'space = "{space}" AND type = page'
+            if cursor:
+                cql += f' AND lastmodified >= "{cursor}"'
+            cql += " ORDER BY lastmodified ASC"
+
+            results = _tool_payload(
+                await pool.call_tool(
+                    "confluence_search", {"query": cql, "limit": SEARCH_PAGE_SIZE}
+                )
+            )
+            if not isinstance(results, list):
+                raise RuntimeError(
+                    f"Unexpected confluence_search result: {str(results)[:200]}"
+                )
+
+            new_pages = [p for p in results if str(p.get("id")) not in seen]
+            for page in new_pages:
+                page_id = str(page["id"])
+                seen.add(page_id)
+                signature, chunks = pages.get(page_id, (None, []))
+                if signature != _page_version(page) or not signature:
+                    await self._fetch_page(pool, page_id, space, chunks)
+                    fetched += 1
+
+            if len(results) < SEARCH_PAGE_SIZE:
+                complete = True
+                break
+            if not new_pages:
+                logger.warning(
+                    "Cannot page past %d results in space %s: a full page of results "
+                    "was modified at the same time",
+                    len(seen),
+                    space,
+                )
+                break
+            next_cursor = self._cursor_after(results)
+            if next_cursor is None:
+                logger.warning(
+                    "Cannot page past %d results in space %s: no modification times",
+                    len(seen),
+                    space,
+                )
+                break
+            cursor = next_cursor
+
+        deleted = 0
+        # Pages a stopped full sync did not reach are kept
+        if since is None and complete:
+            stale = [page_id for page_id in pages if page_id not in seen]
+            self.index.apply(
+                deletes=[c for page_id in stale for c in pages[page_id][1]]
+            )
+            deleted = len(stale)
+        return fetched, deleted, complete
+
+    @staticmethod
+    def _cursor_after(results: list[dict]) -> Optional[str]:
+        """CQL cursor at the last modification time of a result page, in the page's own timezone."""
+        updated = [p.get("updated") or p.get("last_modified") for p in results]
+        updated = [u for u in updated if u]
+        if not updated:
+            return None
+        try:
+            latest = datetime.fromisoformat(str(max(updated)).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return latest.strftime(CQL_TIME_FORMAT)
+
+    async def _fetch_page(self, pool, page_id: str, space: str, old_chunks: list[str]):
+        payload = _tool_payload(
+            await pool.call_tool(
+                "confluence_get_page",
+                {
+                    "page_id": page_id,
+                    "include_metadata": True,
+                    "convert_to_markdown": True,
+                },
+            )
+        )
+        if not isinstance(payload, dict):
+            payload = {"content": {"value": str(payload)}}
+
+        page = payload.get("metadata") or payload
+        content = payload.get("content") or page.get("content") or ""
+        if isinstance(content, dict):
+            content = content.get("value", "")
+
+        title = page.get("title", "")
+        labels = [
+            label.get("name", "") if isinstance(label, dict) else str(label)
+            for label in page.get("labels") or []
+        ]
+        ancestors = " / ".join(
+            a.get("title", "")
+            for a in page.get("ancestors") or []
+            if isinstance(a, dict)
+        )
+        metadata = {
+            "page_id": page_id,
+            "space": space,
+            "url": page.get("url", ""),
+            "updated": page.get("updated") or page.get("last_modified") or "",
+        }
+        signature = _page_version(page)
+
+        self.index.apply(
+            deletes=old_chunks,
+            upserts=[
+                Document(
+                    doc_id=f"{space}:{page_id}#{n}",
+                    title=title,
+                    body=chunk,
+                    signature=signature,
+                    tags=labels,
+                    properties=f"space: {space}\nancestors: {ancestors}",
+                    metadata=metadata,
+                )
+                for n, chunk in enumerate(
+                    chunk_text(content, self.chunk_size, self.chunk_overlap) or [title]
+                )
+            ],
+        )
+
+    def _indexed_pages(self, space: str) -> dict[str, tuple[str, list[str]]]:
+        """Map page ids of a space to their stored version and chunk ids."""
+        pages: dict[str, tuple[str, list[str]]] = {}
+        prefix = f"{space}:"
+        for doc_id, signature in self.index.signatures().items():
+            if doc_id.startswith(prefix):
+                page_id = doc_id[len(prefix) :].split("#", 1)[0]
+                pages.setdefault(page_id, (signature, []))[1].append(doc_id)
+        return pages
+
+
+def create_confluence_mirror() -> Optional[ConfluenceMirror]:
+    """Create the mirror from settings, or None when no spaces are mirrored."""
+    if not settings.confluence_mirror_spaces:
+        return None
+    return ConfluenceMirror(
+        settings.CONFLUENCE_MIRROR_PATH,
+        settings.CONFLUENCE_MIRROR_CHUNK_SIZE,
+        settings.CONFLUENCE_MIRROR_CHUNK_OVERLAP,
+    )
@@ -0,0 +1,174 @@
+"""On-disk BM25 full-text index backed by SQLite FTS5."""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+# BM25 column weights: title, tags, properties, body
+COLUMN_WEIGHTS = (5.0, 3.0, 2.0, 1.0)
+SNIPPET_TOKENS = 16
+
+
+@dataclass
+class Document:
+    doc_id: str
+    title: str
+    body: str
+    signature: str
+    tags: list[str] = field(default_factory=list)
+    properties: str = ""
+    metadata: dict = field(default_factory=dict)
+
+
+@dataclass
+class SearchHit:
+    doc_id: str
+    title: str
+    tags: list[str]
+    snippet: str
+    body: str
+    score: float
+    metadata: dict
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 query matching any of its words (prefix match)."""
+    words = re.findall(r"\w+", query.lower())
+    if not words:
+        return None
+    return " OR ".join(f'"{w}"*' for w in dict.fromkeys(words))
+
+
+class FullTextIndex:
+    """Inverted index of documents ranked with BM25.
+
+    Each document carries a ``signature`` (e.g. mtime and size, or a version)
+    so callers can update the index incrementally and only re-index what changed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                doc_id TEXT NOT NULL UNIQUE,
+                signature TEXT NOT NULL,
+                metadata TEXT NOT NULL DEFAULT '{}'
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                title, tags, properties, body,
+                tokenize = 'unicode61 remove_diacritics 2'
+            );
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        return conn
+
+    def signatures(self) -> dict[str, str]:
+        """Return the stored signature of every indexed document."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT doc_id, signature FROM documents"))
+
+    def get_state(self, key: str) -> Optional[str]:
+        """Return a value stored alongside the index (e.g. a sync cursor)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM state WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value)
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def apply(self, upserts: Iterable[Document] = (), deletes: Iterable[str] = ()):
+        """Insert or replace and delete documents in one transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for doc_id in deletes:
+                    self._delete(doc_id)
+                for doc in upserts:
+                    self._upsert(doc)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _delete(self, doc_id: str):
+        row = self._conn.execute(
+            "SELECT id FROM documents WHERE doc_id = ?", (doc_id,)
+        ).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM documents_fts WHERE rowid = ?", row)
+            self._conn.execute("DELETE FROM documents WHERE id = ?", row)
+
+    def _upsert(self, doc: Document):
+        self._delete(doc.doc_id)
+        cursor = self._conn.execute(
+            "INSERT INTO documents (doc_id, signature, metadata) VALUES (?, ?, ?)",
+            (
+                doc.doc_id,
+                doc.signature,
+                json.dumps(doc.metadata, ensure_ascii=False, default=str),
+            ),
+        )
+        self._conn.execute(
+            "INSERT INTO documents_fts (rowid, title, tags, properties, body) VALUES (?, ?, ?, ?, ?)",
+            (cursor.lastrowid, doc.title, " ".join(doc.tags), doc.properties, doc.body),
+        )
+
+    def search(self, query: str, limit: int = 10) -> list[SearchHit]:
+        """Return the best matching documents, most relevant first."""
+        match = build_match_query(query)
+        if match is None:
+            return []
+
+        weights = ", ".join(str(w) for w in COLUMN_WEIGHTS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT d.doc_id, f.title, f.tags,
+                       snippet(documents_fts, 3, '**', '**', '…', {SNIPPET_TOKENS}), f.body,
+                       bm25(documents_fts, {weights}) AS score, d.metadata
+                FROM documents_fts f JOIN documents d ON d.id = f.rowid
+                WHERE documents_fts MATCH ?
+                ORDER BY score
+                LIMIT ?
+                """,
+                (match, limit),
+            ).fetchall()
+
+        return [
+            SearchHit(
+                doc_id, title, tags.split(), snippet, body, -score, json.loads(metadata)
+            )
+            for doc_id, title, tags, snippet, body, score, metadata in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,199 @@
+"""Incremental full-text index of an Obsidian vault."""
+
+import logging
+import os
+import re
+import threading
+import time
+from typing import Optional
+
+import yaml
+
+from config.settings import settings
+from retrieval.fts_index import Document, FullTextIndex, SearchHit
+
+logger = logging.getLogger(__name__)
+
+SKIPPED_DIRS = {".obsidian", ".trash", ".git"}
+BATCH_SIZE = 500
+INLINE_TAG = re.compile(r"(?<![\w#/&])#([^\s#.,;:!?()\[\]{}'\"`]+)")
+
+
+def parse_note(text: str) -> tuple[dict, str]:
+    """Split a note into its YAML frontmatter and body."""
+    if not text.startswith("---"):
+        return {}, text
+
+    match = re.match(r"---[ \t]*\r?\n(.*?)\r?\n---[ \t]*(?:\r?\n|$)", text, re.DOTALL)
+    if match is None:
+        return {}, text
+
+    try:
+        frontmatter = yaml.safe_load(match.group(1)) or {}
+    except yaml.YAMLError:
+        frontmatter = {}
+    if not isinstance(frontmatter, dict):
+        frontmatter = {}
+    return frontmatter, text[match.end() :]
+
+
+def extract_tags(frontmatter: dict, body: str) -> list[str]:
+    """Collect frontmatter and inline ``#tags`` without the leading '#'."""
+    raw = frontmatter.get("tags") or frontmatter.get("tag") or []
+    if isinstance(raw, str):
+        raw = re.split(r"[,\s]+", raw)
+
+    tags = [str(t).lstrip("#") for t in raw if t]
+    tags.extend(m.group(1) for m in INLINE_TAG.finditer(body))
+    return list(dict.fromkeys(t for t in tags if t and not t.isdigit()))
+
+
+def _format_properties(frontmatter: dict) -> str:
+    return "\n".join(
+        f"{key}: {value}"
+        for key, value in frontmatter.items()
+        if key not in ("tags", "tag")
+    )
+
+
+class VaultIndex:
+    """BM25 index of vault notes kept in sync from file mtimes and sizes.
+
+    ``sync`` walks the vault and re-indexes only added, changed or deleted
+    notes. ``search`` starts it in the background at most once per
+    ``refresh_interval_seconds`` and answers from the current index; it only
+    waits for the initial build.
+    """
+
+    def __init__(
+        self, vault_path: str, index_path: str, refresh_interval_seconds: float
+    ):
+        self.vault_path = os.path.abspath(os.path.expanduser(vault_path))
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.index = FullTextIndex(index_path)
+        self.ready = False
+        self._last_sync = 0.0
+        self._sync_lock = threading.Lock()
+
+    def sync(self) -> tuple[int, int]:
+        """Bring the index up to date and return (re-indexed, deleted) note counts."""
+        with self._sync_lock:
+            started = time.monotonic()
+            stored = self.index.signatures()
+            current = self._scan()
+
+            changed = [
+                doc_id for doc_id, sig in current.items() if stored.get(doc_id) != sig
+            ]
+            deleted = [doc_id for doc_id in stored if doc_id not in current]
+
+            for start in range(0, len(changed), BATCH_SIZE):
+                batch = [
+                    self._load(doc_id, current[doc_id])
+                    for doc_id in changed[start : start + BATCH_SIZE]
+                ]
+                self.index.apply(upserts=[doc for doc in batch if doc is not None])
+            if deleted:
+                self.index.apply(deletes=deleted)
+
+            self._last_sync = time.monotonic()
+            self.ready = True
+            if changed or deleted:
+                logger.info(
+                    "Vault index synced: %d re-indexed, %d deleted in %.2fs",
+                    len(changed),
+                    len(deleted),
+                    self._last_sync - started,
+                )
+            return len(changed), len(deleted)
+
+    def sync_in_background(self):
+        """Start a sync on a daemon thread (e.g. to build the index at startup)."""
+        threading.Thread(
+            target=self._safe_sync, name="vault-indexer", daemon=True
+        ).start()
+
+    def search(self, query: str, limit: int = 10) -> list[SearchHit]:
+        """Search notes, refreshing a stale index in the background."""
+        if not self.ready:
+            # Nothing to search yet: wait for the initial build, or run it if it failed
+            with self._sync_lock:
+                pass
+            if not self.ready:
+                self._safe_sync()
+        elif time.monotonic() - self._last_sync > self.refresh_interval_seconds:
+            if self._sync_lock.acquire(blocking=False):
+                self._sync_lock.release()
+                # Keeps the searches until the refresh ends from starting more of them
+                self._last_sync = time.monotonic()
+                self.sync_in_background()
+        return self.index.search(query, limit)
+
+    def _safe_sync(self):
+        try:
+            self.sync()
+        except Exception as e:
+            logger.warning("Vault index sync failed: %s", e)
+
+    def _scan(self) -> dict[str, str]:
+        """Map vault-relative note paths to their mtime/size signatures."""
+        signatures = {}
+        for root, dirs, files in os.walk(self.vault_path):
+            dirs[:] = [
+                d for d in dirs if d not in SKIPPED_DIRS and not d.startswith(".")
+            ]
+            for name in files:
+                if not name.endswith(".md"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                doc_id = os.path.relpath(path, self.vault_path).replace(os.sep, "/")
+                signatures[doc_id] = f"{stat.st_mtime_ns}:{stat.st_size}"
+        return signatures
+
+    def _load(self, doc_id: str, signature: str) -> Optional[Document]:
+        try:
+            with open(
+                os.path.join(self.vault_path, doc_id),
+                "r",
+                encoding="utf-8",
+                errors="replace",
+            ) as f:
+                text = f.read()
+        except OSError as e:
+            logger.debug("Skipping note %s: %s", doc_id, e)
+            return None
+
+        frontmatter, body = parse_note(text)
+        title = str(
+            frontmatter.get("title") or os.path.splitext(os.path.basename(doc_id))[0]
+        )
+        return Document(
+            doc_id=doc_id,
+            title=title,
+            body=body,
+            signature=signature,
+            tags=extract_tags(frontmatter, body),
+            properties=_format_properties(frontmatter),
+        )
+
+
+def create_vault_index() -> Optional[VaultIndex]:
+    """Create the vault index from settings, or None when no vault path is configured."""
+    if not settings.OBSIDIAN_VAULT_PATH:
+        return None
+    if not os.path.isdir(os.path.expanduser(settings.OBSIDIAN_VAULT_PATH)):
+        logger.warning(
+            "OBSIDIAN_VAULT_PATH %s is not a directory, local vault search disabled",
+            settings.OBSIDIAN_VAULT_PATH,
+        )
+        return None
+
+    return VaultIndex(
+        settings.OBSIDIAN_VAULT_PATH,
+        settings.OBSIDIAN_INDEX_PATH,
+        settings.OBSIDIAN_INDEX_REFRESH_SECONDS,
+    )
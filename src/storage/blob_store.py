@@ -0,0 +1,102 @@
+"""Content-addressed blob store on the local filesystem."""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+from typing import Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_KEY = re.compile(r"[0-9a-f]{64}")
+
+
+class BlobStore:
+    """Blobs stored under their SHA-256 as ``<root>/<key[:2]>/<key>``.
+
+    Writing the same content twice stores it once. Blobs not written or read
+    for ``max_age_seconds`` are removed by ``prune``.
+    """
+
+    def __init__(self, root: str, max_age_seconds: Optional[int] = None):
+        self.root = os.path.expanduser(root)
+        self.max_age_seconds = max_age_seconds
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        if not _KEY.fullmatch(key):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return os.path.join(self.root, key[:2], key)
+
+    def put(self, data: bytes) -> str:
+        """Store ``data`` and return its key."""
+        key = hashlib.sha256(data).hexdigest()
+        path = self._path(key)
+        if os.path.exists(path):
+            os.utime(path)
+            return key
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return key
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Blob stored under ``key``, or None when it is unknown or was pruned."""
+        try:
+            path = self._path(key)
+            with open(path, "rb") as f:
+                data = f.read()
+        except (ValueError, FileNotFoundError):
+            return None
+        os.utime(path)
+        return data
+
+    def touch(self, key: str):
+        """Mark a blob as used, so ``prune`` keeps it."""
+        try:
+            os.utime(self._path(key))
+        except (ValueError, FileNotFoundError):
+            pass
+
+    def put_text(self, text: str) -> str:
+        return self.put(text.encode("utf-8"))
+
+    def get_text(self, key: str) -> Optional[str]:
+        data = self.get(key)
+        return data.decode("utf-8") if data is not None else None
+
+    def prune(self) -> int:
+        """Remove blobs older than ``max_age_seconds``; return how many were removed."""
+        if not self.max_age_seconds:
+            return 0
+
+        cutoff = time.time() - self.max_age_seconds
+        removed = 0
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.unlink(path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        if removed:
+            logger.info("Pruned %d blobs from %s", removed, self.root)
+        return removed
+
+
+def create_blob_store() -> BlobStore:
+    """Create the blob store for spilled tool outputs from settings."""
+    return BlobStore(settings.BLOB_STORE_PATH, settings.BLOB_STORE_MAX_AGE_SECONDS)
@@ -0,0 +1,176 @@
+"""Checkpoint serializer keeping large message contents in the blob store."""
+
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Optional
+
+from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from config.settings import settings
+from storage.blob_store import BlobStore
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Type prefixes of payloads written by this serializer; other types are passed through
+REF_TYPE_PREFIX = "blobref:"
+ZLIB_TYPE_PREFIX = "blobref+zlib:"
+# Message content standing for a blob; a NUL byte never starts a real message
+REF_MARKER = "\x00blob:"
+MISSING_CONTENT = "[Content of this message is no longer available]"
+# Blobs of a thread are touched at most this often when its checkpoints are saved
+# or loaded; pruning keeps them for the thread TTL plus twice this interval
+TOUCH_INTERVAL_SECONDS = 3600
+
+
+class BlobRefSerializer(SerializerProtocol):
+    """Serializer that stores message contents of ``min_chars`` or more as blob references.
+
+    A long thread's checkpoints carry the same tool results and sub-agent
+    answers over and over; with this serializer each content is written to
+    the content-addressed ``BlobStore`` once and checkpoints hold its key.
+    Blobs are resolved eagerly, when a checkpoint referencing them is loaded:
+    message contents are plain strings, so they can't be read on first
+    access. The savers serialize off the event loop, and an LRU cache keeps
+    recent contents, so loading the latest checkpoint of an active thread
+    rarely touches the disk. The cache also remembers the keys of contents
+    already stored, so saving the next checkpoint neither rehashes nor
+    rewrites them. Payloads of ``compress_min_bytes`` or more are
+    zlib-compressed. Checkpoints written by other serializers still load.
+
+    Saving and loading touch the blobs of a thread, so a store pruned by
+    age keeps them as long as the thread is in use (see ``create_checkpoint_serde``).
+    """
+
+    def __init__(
+        self,
+        store: BlobStore,
+        min_chars: int = 2048,
+        compress_min_bytes: int = 4096,
+        cache_entries: int = 1024,
+        inner: Optional[SerializerProtocol] = None,
+    ):
+        self.store = store
+        self.min_chars = min_chars
+        self.compress_min_bytes = compress_min_bytes
+        self.cache_entries = cache_entries
+        self.inner = inner or JsonPlusSerializer()
+        # id(content) -> (content, key); the content is kept so the id stays valid
+        self._keys: OrderedDict[int, tuple[str, str]] = OrderedDict()
+        # key -> (content, last touch)
+        self._texts: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.inner.dumps_typed(self._swap(obj, self._to_ref))
+        if self.compress_min_bytes and len(data) >= self.compress_min_bytes:
+            type_, data = ZLIB_TYPE_PREFIX + type_, zlib.compress(data, 1)
+        else:
+            type_ = REF_TYPE_PREFIX + type_
+        metrics.observe("checkpoint_serialized_bytes", len(data))
+        return type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.startswith(ZLIB_TYPE_PREFIX):
+            type_, payload = type_[len(ZLIB_TYPE_PREFIX) :], zlib.decompress(payload)
+        elif type_.startswith(REF_TYPE_PREFIX):
+            type_ = type_[len(REF_TYPE_PREFIX) :]
+        else:
+            return self.inner.loads_typed(data)
+        return self._swap(self.inner.loads_typed((type_, payload)), self._from_ref)
+
+    def _swap(self, obj: Any, convert) -> Any:
+        """Copy of ``obj`` with the string content of every message passed through ``convert``."""
+        if isinstance(obj, BaseMessage):
+            if isinstance(obj.content, str):
+                content = convert(obj.content)
+                if content is not obj.content:
+                    return obj.model_copy(update={"content": content})
+            return obj
+        if type(obj) is dict:
+            return {k: self._swap(v, convert) for k, v in obj.items()}
+        if type(obj) is list:
+            return [self._swap(v, convert) for v in obj]
+        if type(obj) is tuple:
+            return tuple(self._swap(v, convert) for v in obj)
+        return obj
+
+    def _to_ref(self, content: str) -> str:
+        if len(content) < self.min_chars:
+            return content
+        with self._lock:
+            cached = self._keys.get(id(content))
+        if cached is not None and cached[0] is content:
+            self._touch(cached[1])
+            return REF_MARKER + cached[1]
+        key = self.store.put_text(content)
+        self._remember(content, key)
+        return REF_MARKER + key
+
+    def _from_ref(self, content: str) -> str:
+        if not content.startswith(REF_MARKER):
+            return content
+        key = content[len(REF_MARKER) :]
+        with self._lock:
+            cached = self._texts.get(key)
+        if cached is not None:
+            self._touch(key)
+            return cached[0]
+        text = self.store.get_text(key)
+        if text is None:
+            logger.warning("Checkpoint references missing blob %s", key)
+            return MISSING_CONTENT
+        self._remember(text, key)
+        return text
+
+    def _touch(self, key: str):
+        """Refresh the blob's age at most once per ``TOUCH_INTERVAL_SECONDS``."""
+        now = time.time()
+        with self._lock:
+            cached = self._texts.get(key)
+            if cached is None:
+                return
+            self._texts.move_to_end(key)
+            if now - cached[1] <= TOUCH_INTERVAL_SECONDS:
+                return
+            self._texts[key] = (cached[0], now)
+        self.store.touch(key)
+
+    def _remember(self, content: str, key: str):
+        """Cache a content just written or read, which refreshed its blob's age."""
+        with self._lock:
+            self._keys[id(content)] = (content, key)
+            self._keys.move_to_end(id(content))
+            self._texts[key] = (content, time.time())
+            self._texts.move_to_end(key)
+            while len(self._keys) > self.cache_entries:
+                self._keys.popitem(last=False)
+            while len(self._texts) > self.cache_entries:
+                self._texts.popitem(last=False)
+
+
+def create_checkpoint_serde() -> Optional[BlobRefSerializer]:
+    """Create the checkpoint serializer from settings; None keeps the saver's default.
+
+    Checkpoint blobs get their own store: the shared one prunes by an age
+    unrelated to thread lifetime. Its blobs are pruned only well after the
+    thread that last used them expired; without a thread TTL, never.
+    """
+    if settings.CHECKPOINT_BLOB_MIN_CHARS <= 0:
+        return None
+    ttl = settings.CHECKPOINT_THREAD_TTL_SECONDS
+    store = BlobStore(
+        settings.CHECKPOINT_BLOB_STORE_PATH,
+        ttl + 2 * TOUCH_INTERVAL_SECONDS if ttl else None,
+    )
+    return BlobRefSerializer(
+        store,
+        min_chars=settings.CHECKPOINT_BLOB_MIN_CHARS,
+        compress_min_bytes=settings.CHECKPOINT_COMPRESSION_MIN_BYTES,
+    )
@@ -0,0 +1,730 @@
+"""Bounded checkpoint savers with thread eviction and compaction."""
+
+import asyncio
+import atexit
+import functools
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+from config.settings import settings
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ROOT_NS = ""
+MIN_CHECKPOINTS_PER_THREAD = 2
+
+
+def _timed(operation: str):
+    """Record the latency of a checkpointer operation under the saver's backend name."""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with metrics.timer(
+                "checkpoint_operation_seconds",
+                backend=self.backend_name,
+                operation=operation,
+            ):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class ThreadTracker:
+    """LRU/TTL bookkeeping of when each thread was last used."""
+
+    def __init__(self, max_threads: int, ttl_seconds: float):
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self._last_access: OrderedDict[str, float] = OrderedDict()
+        self._dirty: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, thread_id: str, at: Optional[float] = None, dirty: bool = True):
+        with self._lock:
+            self._last_access[thread_id] = at or time.time()
+            self._last_access.move_to_end(thread_id)
+            if dirty:
+                self._dirty[thread_id] = self._last_access[thread_id]
+
+    def forget(self, thread_id: str):
+        with self._lock:
+            self._last_access.pop(thread_id, None)
+            self._dirty.pop(thread_id, None)
+
+    def pop_dirty(self) -> dict[str, float]:
+        """Return access times changed since the last call."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            return dirty
+
+    def to_evict(self) -> list[str]:
+        """Threads idle past the TTL plus the least recently used beyond the limit."""
+        with self._lock:
+            now = time.time()
+            victims = [
+                thread_id
+                for thread_id, last_access in self._last_access.items()
+                if self.ttl_seconds and now - last_access > self.ttl_seconds
+            ]
+            overflow = len(self._last_access) - len(victims) - self.max_threads
+            if overflow > 0:
+                expired = set(victims)
+                victims.extend(
+                    [t for t in self._last_access if t not in expired][:overflow]
+                )
+            return victims
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """In-memory saver that caps checkpoints per thread and evicts idle threads."""
+
+    backend_name = "memory"
+
+    def __init__(
+        self,
+        *,
+        max_per_thread: int,
+        max_threads: int,
+        thread_ttl_seconds: float,
+        compaction_interval_seconds: float,
+        serde: Optional[SerializerProtocol] = None,
+    ):
+        super().__init__(serde=serde)
+        self.max_per_thread = max(max_per_thread, MIN_CHECKPOINTS_PER_THREAD)
+        self.compaction_interval_seconds = compaction_interval_seconds
+        self._threads = ThreadTracker(max_threads, thread_ttl_seconds)
+        self._last_compaction = time.monotonic()
+        self._lock = threading.RLock()
+
+    @_timed("get_tuple")
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self._lock:
+            self._threads.touch(config["configurable"]["thread_id"], dirty=False)
+            return super().get_tuple(config)
+
+    @_timed("put")
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = config["configurable"]["thread_id"]
+            self._threads.touch(thread_id, dirty=False)
+            self._trim(thread_id, config["configurable"]["checkpoint_ns"])
+
+        if time.monotonic() - self._last_compaction >= self.compaction_interval_seconds:
+            self.compact()
+        return result
+
+    @_timed("put_writes")
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._threads.forget(thread_id)
+
+    # The serializer may read and write blob files, so keep it off the event loop
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def compact(self):
+        """Evict idle threads and drop superseded checkpoints, writes and blobs."""
+        with self._lock:
+            self._last_compaction = time.monotonic()
+
+            evicted = self._threads.to_evict()
+            for thread_id in evicted:
+                self.delete_thread(thread_id)
+
+            for thread_id in list(self.storage):
+                self._drop_finished_namespaces(thread_id)
+
+            live_checkpoints = set()
+            live_blobs = set()
+            for thread_id, namespaces in self.storage.items():
+                for checkpoint_ns, checkpoints in namespaces.items():
+                    for checkpoint_id, (saved, _, _) in checkpoints.items():
+                        live_checkpoints.add((thread_id, checkpoint_ns, checkpoint_id))
+                        versions = self.serde.loads_typed(saved)["channel_versions"]
+                        live_blobs.update(
+                            (thread_id, checkpoint_ns, channel, version)
+                            for channel, version in versions.items()
+                        )
+
+            for key in [k for k in self.writes if k not in live_checkpoints]:
+                del self.writes[key]
+            for key in [k for k in self.blobs if k not in live_blobs]:
+                del self.blobs[key]
+
+        logger.debug(
+            "Checkpoint compaction: evicted %d threads, %d remain",
+            len(evicted),
+            len(self.storage),
+        )
+
+    def _trim(self, thread_id: str, checkpoint_ns: str):
+        """Keep only the newest checkpoints of a namespace."""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.max_per_thread:
+            return
+        for checkpoint_id in sorted(checkpoints)[: -self.max_per_thread]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+    def _drop_finished_namespaces(self, thread_id: str):
+        """Drop sub-agent namespaces that finished before the latest root checkpoint."""
+        namespaces = self.storage[thread_id]
+        root = namespaces.get(ROOT_NS)
+        if not root:
+            return
+        latest_root = max(root)
+        for checkpoint_ns in [ns for ns in namespaces if ns != ROOT_NS]:
+            checkpoints = namespaces[checkpoint_ns]
+            if not checkpoints or max(checkpoints) < latest_root:
+                del namespaces[checkpoint_ns]
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """SQLite-backed saver with batched writes, eviction and compaction.
+
+    Writes are buffered and flushed by a background thread when the batch is
+    full or the flush interval elapses. Reads flush pending writes first, so a
+    thread always sees its own latest checkpoint.
+    """
+
+    backend_name = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_per_thread: int,
+        max_threads: int,
+        thread_ttl_seconds: float,
+        write_batch_size: int,
+        flush_interval_seconds: float,
+        compaction_interval_seconds: float,
+        serde: Optional[SerializerProtocol] = None,
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.max_per_thread = max(max_per_thread, MIN_CHECKPOINTS_PER_THREAD)
+        self.write_batch_size = write_batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.compaction_interval_seconds = compaction_interval_seconds
+
+        self._threads = ThreadTracker(max_threads, thread_ttl_seconds)
+        self._pending: list[tuple[str, tuple]] = []
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+        self._load_threads()
+
+        self._last_compaction = time.monotonic()
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._worker = threading.Thread(
+            target=self._run_background, name="checkpoint-flusher", daemon=True
+        )
+        self._worker.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                parent_checkpoint_id TEXT,
+                type TEXT,
+                checkpoint BLOB,
+                metadata_type TEXT,
+                metadata BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                type TEXT,
+                value BLOB,
+                task_path TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            CREATE TABLE IF NOT EXISTS threads (
+                thread_id TEXT PRIMARY KEY,
+                last_access REAL NOT NULL
+            );
+        """)
+        return conn
+
+    def _load_threads(self):
+        rows = self._conn.execute(
+            "SELECT thread_id, last_access FROM threads ORDER BY last_access"
+        ).fetchall()
+        for thread_id, last_access in rows:
+            self._threads.touch(thread_id, at=last_access, dirty=False)
+
+    def _run_background(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval_seconds)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if (
+                    time.monotonic() - self._last_compaction
+                    >= self.compaction_interval_seconds
+                ):
+                    self.compact()
+            except Exception as e:
+                logger.error("Checkpoint background flush failed: %s", e, exc_info=True)
+
+    def _enqueue(self, sql: str, params: tuple):
+        with self._lock:
+            self._pending.append((sql, params))
+            if len(self._pending) >= self.write_batch_size:
+                self._wakeup.set()
+
+    def flush(self):
+        """Write buffered checkpoints, writes and thread access times in one transaction."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            touched = self._threads.pop_dirty()
+            if not pending and not touched:
+                return
+
+            with metrics.timer(
+                "checkpoint_operation_seconds",
+                backend=self.backend_name,
+                operation="flush",
+            ):
+                self._conn.execute("BEGIN")
+                try:
+                    for sql, params in pending:
+                        self._conn.execute(sql, params)
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO threads (thread_id, last_access) VALUES (?, ?)",
+                        touched.items(),
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+
+    def compact(self):
+        """Evict idle threads and drop superseded checkpoints and orphaned writes."""
+        self.flush()
+        with self._lock:
+            self._last_compaction = time.monotonic()
+
+            evicted = self._threads.to_evict()
+            for thread_id in evicted:
+                self._delete_thread_locked(thread_id)
+
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                """
+                DELETE FROM checkpoints WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, ROW_NUMBER() OVER (
+                            PARTITION BY thread_id, checkpoint_ns
+                            ORDER BY checkpoint_id DESC
+                        ) AS rn FROM checkpoints
+                    ) WHERE rn > ?
+                )
+                """,
+                (self.max_per_thread,),
+            )
+            # Sub-agent namespaces that finished before the latest root checkpoint
+            self._conn.execute(
+                """
+                DELETE FROM checkpoints WHERE checkpoint_ns != '' AND checkpoint_id < (
+                    SELECT MAX(r.checkpoint_id) FROM checkpoints r
+                    WHERE r.thread_id = checkpoints.thread_id AND r.checkpoint_ns = ''
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                DELETE FROM writes WHERE NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = writes.thread_id
+                    AND c.checkpoint_ns = writes.checkpoint_ns
+                    AND c.checkpoint_id = writes.checkpoint_id
+                )
+                """
+            )
+            self._conn.execute("COMMIT")
+            self._conn.execute("PRAGMA incremental_vacuum")
+
+        logger.debug("Checkpoint compaction: evicted %d threads", len(evicted))
+
+    def close(self):
+        """Stop the background flusher and write out pending data."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._worker.join(timeout=5)
+        self.flush()
+        self._conn.close()
+
+    @_timed("get_tuple")
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", ROOT_NS)
+        self._threads.touch(thread_id)
+
+        with self._lock:
+            self.flush()
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._conn.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                    "metadata_type, metadata FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                    "metadata_type, metadata FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+            writes = self._load_writes(thread_id, checkpoint_ns, row[0])
+
+        return self._to_tuple(thread_id, checkpoint_ns, row, writes)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (
+                checkpoint_ns := config["configurable"].get("checkpoint_ns")
+            ) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, "
+                f"checkpoint, metadata_type, metadata FROM checkpoints {where} "
+                "ORDER BY checkpoint_id DESC",
+                params,
+            ).fetchall()
+
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            metadata = self.serde.loads_typed((row[4], row[5]))
+            if filter and not all(metadata.get(k) == v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            with self._lock:
+                writes = self._load_writes(thread_id, checkpoint_ns, row[0])
+            yield self._to_tuple(thread_id, checkpoint_ns, row, writes)
+
+    @_timed("put")
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        self._threads.touch(thread_id)
+
+        self._enqueue(
+            "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, "
+            "parent_checkpoint_id, type, checkpoint, metadata_type, metadata) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                thread_id,
+                checkpoint_ns,
+                checkpoint["id"],
+                config["configurable"].get("checkpoint_id"),
+                *self.serde.dumps_typed(checkpoint),
+                *self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+            ),
+        )
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    @_timed("put_writes")
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        verb = "REPLACE" if all(c in WRITES_IDX_MAP for c, _ in writes) else "IGNORE"
+        for idx, (channel, value) in enumerate(writes):
+            self._enqueue(
+                f"INSERT OR {verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, "
+                "task_id, idx, channel, type, value, task_path) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    config["configurable"]["thread_id"],
+                    config["configurable"].get("checkpoint_ns", ROOT_NS),
+                    config["configurable"]["checkpoint_id"],
+                    task_id,
+                    WRITES_IDX_MAP.get(channel, idx),
+                    channel,
+                    *self.serde.dumps_typed(value),
+                    task_path,
+                ),
+            )
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self.flush()
+            self._delete_thread_locked(thread_id)
+
+    def _delete_thread_locked(self, thread_id: str):
+        self._conn.execute("BEGIN")
+        self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+        self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+        self._conn.execute("DELETE FROM threads WHERE thread_id = ?", (thread_id,))
+        self._conn.execute("COMMIT")
+        self._threads.forget(thread_id)
+
+    def _load_writes(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str
+    ) -> list:
+        rows = self._conn.execute(
+            "SELECT task_id, channel, type, value, task_path, idx FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return sorted(rows, key=lambda r: writes_sort_key(r[4], r[0], r[5]))
+
+    def _to_tuple(
+        self, thread_id: str, checkpoint_ns: str, row: tuple, writes: list
+    ) -> CheckpointTuple:
+        (
+            checkpoint_id,
+            parent_checkpoint_id,
+            type_,
+            checkpoint,
+            metadata_type,
+            metadata,
+        ) = row
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self.serde.loads_typed((type_, checkpoint)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value, _, _ in writes
+            ],
+        )
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        # Serializing may write blob files
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+def create_checkpointer(
+    serde: Optional[SerializerProtocol] = None,
+) -> BaseCheckpointSaver:
+    """Create the checkpointer selected by settings."""
+    backend = settings.CHECKPOINT_BACKEND.lower()
+
+    if backend == "memory":
+        return BoundedMemorySaver(
+            max_per_thread=settings.CHECKPOINT_MAX_PER_THREAD,
+            max_threads=settings.CHECKPOINT_MAX_THREADS,
+            thread_ttl_seconds=settings.CHECKPOINT_THREAD_TTL_SECONDS,
+            compaction_interval_seconds=settings.CHECKPOINT_COMPACTION_INTERVAL_SECONDS,
+            serde=serde,
+        )
+    if backend == "sqlite":
+        return SqliteCheckpointSaver(
+            settings.CHECKPOINT_SQLITE_PATH,
+            max_per_thread=settings.CHECKPOINT_MAX_PER_THREAD,
+            max_threads=settings.CHECKPOINT_MAX_THREADS,
+            thread_ttl_seconds=settings.CHECKPOINT_THREAD_TTL_SECONDS,
+            write_batch_size=settings.CHECKPOINT_WRITE_BATCH_SIZE,
+            flush_interval_seconds=settings.CHECKPOINT_FLUSH_INTERVAL_SECONDS,
+            compaction_interval_seconds=settings.CHECKPOINT_COMPACTION_INTERVAL_SECONDS,
+            serde=serde,
+        )
+
+    raise ValueError(f"Unknown checkpoint backend: {settings.CHECKPOINT_BACKEND}")
@@ -0,0 +1,124 @@
+"""Per-thread scratchpad of sub-agent tool results."""
+
+import hashlib
+import json
+import time
+from typing import Optional
+
+from config.settings import settings
+from storage.blob_store import BlobStore
+
+
+def entry_key(agent: str, tool: str, args: dict) -> str:
+    payload = json.dumps(
+        [agent, tool, args], sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def merge_scratchpad(current: Optional[dict], update: Optional[dict]) -> dict:
+    """Reducer of the scratchpad state channel.
+
+    ``update`` maps entry keys to new entries, or to None to drop them. Entries
+    older than ``SCRATCHPAD_TTL_SECONDS`` are dropped, then the least recently
+    used ones until at most ``SCRATCHPAD_MAX_ENTRIES`` entries of at most
+    ``SCRATCHPAD_MAX_CHARS`` characters in total are left.
+    """
+    merged = dict(current or {})
+    for key, entry in (update or {}).items():
+        if entry is None:
+            merged.pop(key, None)
+        else:
+            merged[key] = entry
+
+    cutoff = time.time() - settings.SCRATCHPAD_TTL_SECONDS
+    entries = sorted(
+        ((key, entry) for key, entry in merged.items() if entry["used_at"] >= cutoff),
+        key=lambda item: item[1]["used_at"],
+        reverse=True,
+    )
+    kept, chars = {}, 0
+    for key, entry in entries:
+        if (
+            len(kept) >= settings.SCRATCHPAD_MAX_ENTRIES
+            or chars + entry["chars"] > settings.SCRATCHPAD_MAX_CHARS
+        ):
+            break
+        kept[key] = entry
+        chars += entry["chars"]
+    return kept
+
+
+class Scratchpad:
+    """One sub-agent's working view of the thread scratchpad during a delegation.
+
+    Entries in the state hold only the tool call and the blob store key of its
+    result, so checkpoints stay small. ``changes`` collects the update for
+    ``merge_scratchpad``.
+    """
+
+    def __init__(self, store: BlobStore, entries: Optional[dict], agent: str):
+        self.store = store
+        self.entries = dict(entries or {})
+        self.agent = agent
+        self.changes: dict[str, Optional[dict]] = {}
+        self._listed: Optional[list[tuple[str, dict]]] = None
+
+    def get(self, tool: str, args: dict) -> Optional[str]:
+        """Stored result of the same call, or None (blob I/O, run it off the event loop)."""
+        key = entry_key(self.agent, tool, args)
+        entry = self.entries.get(key)
+        if (
+            entry is None
+            or time.time() - entry["used_at"] > settings.SCRATCHPAD_TTL_SECONDS
+        ):
+            return None
+        text = self.store.get_text(entry["content_id"])
+        if text is None:
+            self._set(key, None)
+            return None
+        self._set(key, {**entry, "used_at": time.time()})
+        return text
+
+    def put(self, tool: str, args: dict, text: str):
+        if len(text) > settings.SCRATCHPAD_MAX_CHARS:
+            return
+        self._set(
+            entry_key(self.agent, tool, args),
+            {
+                "agent": self.agent,
+                "tool": tool,
+                "args": args,
+                "content_id": self.store.put_text(text),
+                "chars": len(text),
+                "used_at": time.time(),
+            },
+        )
+
+    def invalidate(self):
+        """Drop the agent's entries, e.g. after it changed something."""
+        for key, entry in list(self.entries.items()):
+            if entry is not None and entry["agent"] == self.agent:
+                self._set(key, None)
+
+    def calls(self, limit: int) -> list[tuple[str, dict]]:
+        """The agent's calls stored before the delegation, most recently used first.
+
+        Listed once, so the prompt stays the same for every step of the delegation.
+        """
+        if self._listed is None:
+            entries = [
+                e
+                for e in self.entries.values()
+                if e is not None and e["agent"] == self.agent
+            ]
+            entries.sort(key=lambda e: e["used_at"], reverse=True)
+            self._listed = [(e["tool"], e["args"]) for e in entries[:limit]]
+        return self._listed
+
+    def _set(self, key: str, entry: Optional[dict]):
+        self.changes[key] = entry
+        if entry is None:
+            self.entries.pop(key, None)
+        else:
+            self.entries[key] = entry
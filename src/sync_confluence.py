@@ -0,0 +1,67 @@
+import argparse
+import asyncio
+import logging
+
+from config.settings import settings
+from logger.logger import init_logs
+from retrieval.confluence_mirror import ConfluenceMirror
+from utils.mcp_pool import get_tool_pool
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync the local Confluence mirror")
+    parser.add_argument(
+        "--space",
+        action="append",
+        dest="spaces",
+        help="Space key to sync (repeatable, defaults to CONFLUENCE_MIRROR_SPACES)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-walk whole spaces and drop pages deleted in Confluence",
+    )
+    return parser.parse_args()
+
+
+async def main():
+    init_logs()
+    args = parse_args()
+
+    spaces = args.spaces or settings.confluence_mirror_spaces
+    if not spaces:
+        logger.error("No spaces to sync: pass --space or set CONFLUENCE_MIRROR_SPACES")
+        return 1
+
+    mirror = ConfluenceMirror(
+        settings.CONFLUENCE_MIRROR_PATH,
+        settings.CONFLUENCE_MIRROR_CHUNK_SIZE,
+        settings.CONFLUENCE_MIRROR_CHUNK_OVERLAP,
+    )
+    pool = get_tool_pool(settings.confluence_mcp_config)
+
+    try:
+        stats = await mirror.sync(pool, spaces, full=args.full)
+    except Exception as e:
+        logger.critical("Confluence sync failed: %s", e, exc_info=True)
+        return 1
+    finally:
+        await pool.aclose()
+        mirror.index.close()
+
+    logger.info(
+        "Confluence mirror synced: %d pages fetched, %d deleted",
+        stats["fetched"],
+        stats["deleted"],
+    )
+    return 0
+
+
+def run():
+    return asyncio.run(main())
+
+
+if __name__ == "__main__":
+    exit(run())
@@ -0,0 +1,126 @@
+"""Read/write classification of tool calls for human approval."""
+
+import fnmatch
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from config.settings import settings
+from utils.tool_access import is_read_only_tool
+
+logger = logging.getLogger(__name__)
+
+READ = "read"
+WRITE = "write"
+
+# Word stems of requests that ask a sub-agent to change something
+WRITE_REQUEST_PATTERN = (
+    r"(?iu)\b(creat|writ|add|updat|edit|delet|remov|renam|move|append|save|replac|insert|"
+    r"chang|modif|archiv|publish|make|jot|log|record|note\s+down|put|"
+    r"fix|correct|clean|tidy|tick\b|check\s+off|cross\s+off|mark\b|merge|"
+    r"созда|запиш|записа|добав|обнов|измен|редакт|удал|сдела|отмет|внес|занес|"
+    r"переимен|перемест|перенес|сохран|замен|допиш|встав|опубликуй|"
+    r"исправ|поправ|почин|почист|очист|убер|вычеркн)"
+)
+# Word stems of requests that only look something up
+READ_REQUEST_PATTERN = (
+    r"(?iu)\b(search|find|look|show|list|read|what|which|where|when|summar|"
+    r"найд|найти|поиск|ищи|покаж|прочит|что|где|когда|какие|какая|какой|перечисл)"
+)
+
+# Supervisor tools delegate free-text requests: a request is a write when it
+# asks for a change. Obsidian requests stay writes unless they only look
+# something up; any other call falls back to the tool name
+DEFAULT_POLICY = {
+    "rules": [
+        {"tool": "*", "args": {"request": WRITE_REQUEST_PATTERN}, "access": WRITE},
+        {
+            "tool": "manage_obsidian_notes",
+            "args": {"request": READ_REQUEST_PATTERN},
+            "access": READ,
+        },
+        {"tool": "manage_obsidian_notes", "access": WRITE},
+    ],
+}
+
+
+@dataclass
+class ApprovalRule:
+    """Classify calls of tools matching the ``tool`` glob whose arguments match
+    all ``args`` patterns; the ``*`` argument matches any argument."""
+
+    access: str
+    tool: str = "*"
+    args: dict[str, re.Pattern] = field(default_factory=dict)
+
+    def matches(self, name: str, args: dict) -> bool:
+        if not fnmatch.fnmatchcase(name, self.tool):
+            return False
+        for arg, pattern in self.args.items():
+            values = args.values() if arg == "*" else [args[arg]] if arg in args else []
+            if not any(pattern.search(_arg_text(value)) for value in values):
+                return False
+        return True
+
+
+def _arg_text(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+class ApprovalPolicy:
+    """Ordered rules; the first matching rule decides whether a call reads or writes.
+
+    Calls no rule matches are classified by tool name with ``is_read_only_tool``.
+    """
+
+    def __init__(self, rules: list[ApprovalRule]):
+        self.rules = rules
+
+    @classmethod
+    def from_dict(cls, config: dict) -> "ApprovalPolicy":
+        rules = []
+        for i, rule in enumerate(config.get("rules", [])):
+            access = rule.get("access")
+            if access not in (READ, WRITE):
+                raise ValueError(
+                    f"Approval rule {i}: 'access' must be '{READ}' or '{WRITE}', got {access!r}"
+                )
+            try:
+                args = {
+                    arg: re.compile(pattern)
+                    for arg, pattern in rule.get("args", {}).items()
+                }
+            except re.error as e:
+                raise ValueError(f"Approval rule {i}: invalid pattern: {e}") from e
+            rules.append(
+                ApprovalRule(access=access, tool=rule.get("tool", "*"), args=args)
+            )
+        return cls(rules)
+
+    def classify(self, name: str, args: Optional[dict] = None) -> str:
+        args = args or {}
+        for rule in self.rules:
+            if rule.matches(name, args):
+                return rule.access
+        return READ if is_read_only_tool(name) else WRITE
+
+    def requires_approval(self, name: str, args: Optional[dict] = None) -> bool:
+        return self.classify(name, args) == WRITE
+
+
+def load_approval_policy(path: Optional[str] = None) -> ApprovalPolicy:
+    """Load the policy from a JSON file, or the built-in policy when no path is set.
+
+    A policy that can't be read or parsed raises instead of silently approving.
+    """
+    path = path or settings.APPROVAL_POLICY_PATH
+    if not path:
+        return ApprovalPolicy.from_dict(DEFAULT_POLICY)
+
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    policy = ApprovalPolicy.from_dict(config)
+    logger.info("Loaded %d approval rules from %s", len(policy.rules), path)
+    return policy
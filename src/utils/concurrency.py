@@ -0,0 +1,141 @@
+"""Helpers for asyncio primitives shared across event loops."""
+
+import asyncio
+import threading
+import weakref
+from contextlib import asynccontextmanager
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LoopLocal(Generic[T]):
+    """Lazily create one object (lock, semaphore, ...) per running event loop.
+
+    asyncio primitives bind to the loop they are first used on, so module-level
+    instances break when callers run on several loops (e.g. ``asyncio.run`` per request).
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._items: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            item = self._items.get(loop)
+            if item is None:
+                item = self._items[loop] = self._factory()
+            return item
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a request can neither run nor wait in the queue."""
+
+
+class KeyedLocks:
+    """One asyncio lock per key, dropped once nobody holds or waits for it."""
+
+    def __init__(self):
+        self._locks: dict[str, tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: str, timeout: Optional[float] = None):
+        """Hold the key's lock; waiting longer than ``timeout`` raises ``QueueFullError``."""
+        lock, users = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            try:
+                await asyncio.wait_for(lock.acquire(), timeout)
+            except asyncio.TimeoutError:
+                raise QueueFullError(
+                    "Timed out waiting for the previous request of this thread"
+                ) from None
+            try:
+                yield
+            finally:
+                lock.release()
+        finally:
+            lock, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._locks
+
+
+class AdmissionController:
+    """Run at most ``max_running`` requests and queue at most ``max_queued`` more.
+
+    Requests beyond the queue, or queued longer than ``queue_timeout``
+    seconds, are rejected with ``QueueFullError``. ``stop`` rejects new
+    requests from then on; ``drain`` also waits for the running and queued
+    ones to finish.
+    """
+
+    def __init__(self, max_running: int, max_queued: int, queue_timeout: float):
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.running = 0
+        self.queued = 0
+        self.draining = False
+        self._slots = asyncio.Semaphore(max_running)
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def check(self):
+        """Raise ``QueueFullError`` if a request arriving now would be rejected."""
+        if self.draining:
+            raise QueueFullError("Server is shutting down")
+        if self._slots.locked() and self.queued >= self.max_queued:
+            raise QueueFullError("Too many requests in the queue")
+
+    @asynccontextmanager
+    async def admit(self, timeout: Optional[float] = None):
+        """Run the enclosed request in a slot, waiting ``timeout`` (default ``queue_timeout``) for one."""
+        self.check()
+        self.queued += 1
+        self._idle.clear()
+        try:
+            await asyncio.wait_for(
+                self._slots.acquire(),
+                self.queue_timeout if timeout is None else timeout,
+            )
+        except asyncio.TimeoutError:
+            raise QueueFullError("Timed out waiting in the queue") from None
+        else:
+            self.running += 1
+        finally:
+            self.queued -= 1
+            self._check_idle()
+
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._slots.release()
+            self._check_idle()
+
+    def _check_idle(self):
+        if self.running == 0 and self.queued == 0:
+            self._idle.set()
+        else:
+            self._idle.clear()
+
+    def stop(self):
+        """Reject new requests from now on."""
+        self.draining = True
+
+    async def drain(self, timeout: float) -> bool:
+        """Stop admitting requests and wait for the admitted ones; False on timeout."""
+        self.stop()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
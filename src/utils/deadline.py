@@ -0,0 +1,41 @@
+"""Per-request deadline shared by everything a request runs, through a context variable."""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# time.monotonic() at which the current request runs out of time; asyncio tasks
+# inherit it, so it reaches sub-agents, tool calls and LLM retries
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]):
+    """Give the enclosed request ``seconds`` to finish; None or 0 means no deadline."""
+    token = _deadline.set(time.monotonic() + seconds if seconds else None)
+    try:
+        yield
+    finally:
+        try:
+            _deadline.reset(token)
+        except ValueError:
+            # An async generator closed from another task finishes in another context
+            pass
+
+
+def remaining() -> Optional[float]:
+    """Seconds left until the current request's deadline, or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def fits(seconds: float) -> bool:
+    """Whether ``seconds`` more can be spent before the deadline."""
+    left = remaining()
+    return left is None or seconds < left
@@ -0,0 +1,160 @@
+"""Convert HTML and Confluence storage format to compact markdown."""
+
+import re
+from html.parser import HTMLParser
+
+_HTML_TAG = re.compile(
+    r"<(p|div|h[1-6]|ul|ol|li|table|tr|td|th|br|span|strong|a|ac:[\w-]+)\b[^>]*>", re.I
+)
+_SKIPPED = {"script", "style", "head", "ac:parameter", "ri:attachment", "ac:image"}
+_BLOCKS = {
+    "p",
+    "div",
+    "section",
+    "article",
+    "blockquote",
+    "ul",
+    "ol",
+    "table",
+    "pre",
+    "ac:structured-macro",
+    "ac:rich-text-body",
+    "ac:layout-section",
+    "ac:layout-cell",
+}
+_INLINE = {"strong": "**", "b": "**", "em": "_", "i": "_", "code": "`"}
+
+
+def looks_like_html(text: str) -> bool:
+    """Whether the text contains HTML or Confluence storage format markup."""
+    return len(_HTML_TAG.findall(text[:20000])) >= 2
+
+
+class _MarkdownParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self.skip_depth = 0
+        self.lists: list[list] = []
+        self.links: list[str] = []
+        # [rows, cells of the current row] of each open table
+        self.tables: list[list[int]] = []
+        self.pre = 0
+
+    def _newlines(self, count: int):
+        tail = "".join(self.parts[-2:])
+        missing = count - (len(tail) - len(tail.rstrip("\n")))
+        if self.parts and missing > 0:
+            self.parts.append("\n" * missing)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self.skip_depth or tag in _SKIPPED:
+            self.skip_depth += tag in _SKIPPED
+            return
+        if re.fullmatch(r"h[1-6]", tag):
+            self._newlines(2)
+            self.parts.append("#" * int(tag[1]) + " ")
+        elif tag in ("ul", "ol"):
+            self._newlines(1 if self.lists else 2)
+            self.lists.append([tag, 0])
+        elif tag == "li":
+            self._newlines(1)
+            indent = "  " * (len(self.lists) - 1)
+            if self.lists and self.lists[-1][0] == "ol":
+                self.lists[-1][1] += 1
+                self.parts.append(f"{indent}{self.lists[-1][1]}. ")
+            else:
+                self.parts.append(f"{indent}- ")
+        elif tag == "table":
+            self._newlines(2)
+            self.tables.append([0, 0])
+        elif tag == "tr":
+            self._newlines(1)
+            if self.tables:
+                self.tables[-1][1] = 0
+        elif tag in ("td", "th"):
+            self.parts.append("| ")
+            if self.tables:
+                self.tables[-1][1] += 1
+        elif tag == "br":
+            self.parts.append("\n")
+        elif tag in ("pre", "ac:plain-text-body"):
+            self._newlines(2)
+            self.parts.append("```\n")
+            self.pre += 1
+        elif tag in _INLINE and not self.pre:
+            self.parts.append(_INLINE[tag])
+        elif tag == "a":
+            self.links.append(attrs.get("href") or "")
+            self.parts.append("[")
+        elif tag == "ri:page":
+            self.parts.append(attrs.get("ri:content-title") or "")
+        elif tag in _BLOCKS:
+            self._newlines(2)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in _SKIPPED and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_endtag(self, tag):
+        if self.skip_depth:
+            self.skip_depth -= tag in _SKIPPED
+            return
+        if re.fullmatch(r"h[1-6]", tag):
+            self._newlines(2)
+        elif tag in ("ul", "ol"):
+            if self.lists:
+                self.lists.pop()
+            self._newlines(1 if self.lists else 2)
+        elif tag in ("td", "th"):
+            self.parts.append(" ")
+        elif tag == "tr":
+            self.parts.append("|\n")
+            if self.tables:
+                table = self.tables[-1]
+                table[0] += 1
+                # Markdown tables need a separator after the header row
+                if table[0] == 1 and table[1]:
+                    self.parts.append("|" + "---|" * table[1] + "\n")
+        elif tag == "table":
+            if self.tables:
+                self.tables.pop()
+            self._newlines(2)
+        elif tag in ("pre", "ac:plain-text-body"):
+            self._newlines(1)
+            self.parts.append("```")
+            self._newlines(2)
+            self.pre = max(0, self.pre - 1)
+        elif tag in _INLINE and not self.pre:
+            self.parts.append(_INLINE[tag])
+        elif tag == "a":
+            href = self.links.pop() if self.links else ""
+            self.parts.append(
+                f"]({href})" if href and not href.startswith("#") else "]"
+            )
+        elif tag in _BLOCKS:
+            self._newlines(2)
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        self.parts.append(
+            data if self.pre else re.sub(r"\s+", " ", data.replace("\xa0", " "))
+        )
+
+    def unknown_decl(self, data):
+        if data.startswith("CDATA[") and not self.skip_depth:
+            self.parts.append(data[len("CDATA[") :])
+
+
+def html_to_markdown(html: str) -> str:
+    """Render HTML as markdown keeping headings, lists, tables, links and code."""
+    parser = _MarkdownParser()
+    parser.feed(html)
+    parser.close()
+    text = "".join(parser.parts)
+    text = re.sub(r"[ \t]+\n", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
@@ -0,0 +1,117 @@
+"""Per-role LLM clients with shared HTTP connection pools."""
+
+import logging
+import threading
+from typing import Optional
+
+import httpx
+import openai
+
+from config.settings import settings
+from utils.llm_retry import DEFAULT_CONCURRENCY_GROUP, RetryableLLM, create_llm
+
+logger = logging.getLogger(__name__)
+
+SUPERVISOR = "supervisor"
+SUBAGENT = "subagent"
+SUMMARIZER = "summarizer"
+
+# Settings prefix of each role's model, API base, key, max tokens and concurrency
+_ROLE_PREFIXES = {SUBAGENT: "SUBAGENT", SUMMARIZER: "SUMMARIZER"}
+
+
+def _role_setting(role: str, name: str):
+    prefix = _ROLE_PREFIXES.get(role)
+    return getattr(settings, f"{prefix}_{name}") if prefix else None
+
+
+class LLMRegistry:
+    """Build each role's LLM once and share HTTP clients between roles.
+
+    Roles are configured by ``<ROLE>_MODEL``, ``_API_BASE``, ``_API_KEY``,
+    ``_MAX_TOKENS`` and ``_MAX_CONCURRENCY`` settings falling back to the
+    Supervisor's. Roles on the same API base with the same limit reuse one
+    connection pool sized to that limit.
+    """
+
+    def __init__(self):
+        self._llms: dict[str, RetryableLLM] = {}
+        self._clients: dict[tuple, tuple[httpx.Client, httpx.AsyncClient]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, role: str) -> RetryableLLM:
+        llm = self._llms.get(role)
+        if llm is None:
+            with self._lock:
+                llm = self._llms.get(role)
+                if llm is None:
+                    llm = self._llms[role] = self._create(role)
+        return llm
+
+    def _create(self, role: str) -> RetryableLLM:
+        base_url = _role_setting(role, "API_BASE") or settings.OPENAI_API_BASE
+        limit = _role_setting(role, "MAX_CONCURRENCY")
+        own_group = bool(_role_setting(role, "API_BASE")) or limit is not None
+        limit = settings.LLM_MAX_CONCURRENCY if limit is None else limit
+        sync_client, async_client = self._http_clients(base_url, limit)
+
+        overrides = {
+            "concurrency_group": role if own_group else DEFAULT_CONCURRENCY_GROUP,
+            "max_concurrency": limit,
+            "http_client": sync_client,
+            "http_async_client": async_client,
+        }
+        for field, name in (
+            ("model", "MODEL"),
+            ("api_key", "API_KEY"),
+            ("max_tokens", "MAX_TOKENS"),
+        ):
+            value = _role_setting(role, name)
+            if value:
+                overrides[field] = value
+        if base_url:
+            overrides["base_url"] = base_url
+        if role == SUMMARIZER:
+            overrides["temperature"] = 0
+
+        llm = create_llm(**overrides)
+        logger.info(
+            "LLM for %s: %s at %s", role, llm.model_name, base_url or "default API base"
+        )
+        return llm
+
+    def _http_clients(
+        self, base_url: Optional[str], limit: int
+    ) -> tuple[httpx.Client, httpx.AsyncClient]:
+        connections = limit if limit > 0 else None
+        key = (base_url or "", connections)
+        clients = self._clients.get(key)
+        if clients is None:
+            limits = httpx.Limits(
+                max_connections=connections, max_keepalive_connections=connections
+            )
+            clients = self._clients[key] = (
+                httpx.Client(limits=limits, timeout=openai.DEFAULT_TIMEOUT),
+                httpx.AsyncClient(limits=limits, timeout=openai.DEFAULT_TIMEOUT),
+            )
+        return clients
+
+    async def aclose(self):
+        """Close the HTTP clients of all roles."""
+        with self._lock:
+            clients, self._clients, self._llms = list(self._clients.values()), {}, {}
+        for sync_client, async_client in clients:
+            sync_client.close()
+            await async_client.aclose()
+
+
+_registry = LLMRegistry()
+
+
+def get_llm(role: str) -> RetryableLLM:
+    """Shared LLM for a role (``SUPERVISOR``, ``SUBAGENT`` or ``SUMMARIZER``)."""
+    return _registry.get(role)
+
+
+async def close_llm_clients():
+    await _registry.aclose()
@@ -1,62 +1,271 @@
-"""LLM with temperature-based retry for vLLM cache bypass."""
+"""LLM with per-call retries: temperature bump on parsing errors, backoff on transient errors."""
 
+import asyncio
 import logging
-from typing import Any
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Optional
 
+import httpx
+import openai
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import BaseMessage
+from pydantic import PrivateAttr
 
 from config.settings import settings
+from utils.concurrency import LoopLocal
+from utils.deadline import fits
+from utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
-PARSING_ERROR_KEYWORDS = ('parse', 'json', 'tool', 'function', 'schema', 'validation', 'malformed')
+PARSING_ERROR_KEYWORDS = (
+    "parse",
+    "json",
+    "tool",
+    "function",
+    "schema",
+    "validation",
+    "malformed",
+)
+TRANSIENT_ERRORS = (
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.APIConnectionError,
+    httpx.TransportError,
+)
+
+
+DEFAULT_CONCURRENCY_GROUP = "default"
+
+# Semaphores per concurrency group, created with the limit of their first user
+_llm_slots: LoopLocal[dict[str, asyncio.Semaphore]] = LoopLocal(dict)
+
+
+@asynccontextmanager
+async def llm_slot(group: str = DEFAULT_CONCURRENCY_GROUP, limit: Optional[int] = None):
+    """Hold one of the ``limit`` slots of a concurrency group for an LLM request.
+
+    The limit defaults to ``LLM_MAX_CONCURRENCY``; 0 means unlimited.
+    """
+    limit = settings.LLM_MAX_CONCURRENCY if limit is None else limit
+    if limit <= 0:
+        yield
+        return
+    slots = _llm_slots.get()
+    semaphore = slots.get(group)
+    if semaphore is None:
+        semaphore = slots[group] = asyncio.Semaphore(limit)
+    started = time.perf_counter()
+    async with semaphore:
+        metrics.observe(
+            "llm_slot_wait_seconds", time.perf_counter() - started, group=group
+        )
+        yield
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the LLM while its circuit breaker is open."""
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether an error is worth retrying with backoff (429, 5xx, connection errors)."""
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    status = getattr(error, "status_code", None)
+    return status == 429 or (isinstance(status, int) and status >= 500)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive transient failures.
+
+    While open, calls fail fast with ``CircuitOpenError``; after ``reset_timeout``
+    seconds one trial call is let through and closes the circuit if it succeeds.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if (
+                self._trial_in_flight
+                or time.monotonic() - self._opened_at < self.reset_timeout
+            ):
+                metrics.inc("llm_circuit_breaker_rejections_total")
+                raise CircuitOpenError("LLM circuit breaker is open, failing fast")
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("LLM circuit breaker closed")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(
+                        "LLM circuit breaker opened after %d failures", self._failures
+                    )
+                    metrics.inc("llm_circuit_breaker_open_total")
+                self._opened_at = time.monotonic()
+
+    def abort_call(self):
+        """Release a trial call that ended without an outcome (e.g. was cancelled)."""
+        with self._lock:
+            self._trial_in_flight = False
 
 
 class RetryableLLM(ChatOpenAI):
-    """ChatOpenAI with temperature bump on parsing errors (bypasses vLLM cache)."""
-    
+    """ChatOpenAI with per-call retries that is safe to share between concurrent calls.
+
+    Parsing errors are retried with a temperature bump (bypasses vLLM cache),
+    passed as a call argument so the shared instance is never mutated.
+    Transient errors are retried with jittered exponential backoff unless the
+    wait would outlast the request deadline, and a circuit breaker fails fast
+    once the API keeps failing.
+    """
+
     max_retries_on_parse: int = 1
     retry_temperature_boost: float = 0.3
-    
+    max_retries_on_transient: int = 3
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 20.0
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+    # Calls of instances in one group share its concurrency limit
+    concurrency_group: str = DEFAULT_CONCURRENCY_GROUP
+    max_concurrency: Optional[int] = None
+
+    _breaker: Optional[CircuitBreaker] = PrivateAttr(default=None)
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        if self._breaker is None:
+            self._breaker = CircuitBreaker(
+                self.circuit_failure_threshold, self.circuit_reset_timeout
+            )
+        return self._breaker
+
     def _should_retry(self, error: Exception) -> bool:
         return any(kw in str(error).lower() for kw in PARSING_ERROR_KEYWORDS)
-    
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = random.uniform(
+            0, min(self.retry_max_delay, self.retry_base_delay * 2**attempt)
+        )
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.retry_max_delay))
+        return delay
+
+    def _next_attempt(
+        self, error: Exception, attempts: dict, kwargs: dict
+    ) -> Optional[float]:
+        """Record the error and prepare kwargs for a retry; return its delay or None to give up."""
+        if is_transient_error(error):
+            self.circuit_breaker.record_failure()
+            if (
+                attempts["transient"] >= self.max_retries_on_transient
+                or self.circuit_breaker.is_open
+            ):
+                return None
+            delay = self._backoff(attempts["transient"], error)
+            if not fits(delay):
+                metrics.inc("deadline_retries_skipped_total", kind="llm")
+                return None
+            attempts["transient"] += 1
+            metrics.inc("llm_retries_total", reason="transient")
+            logger.warning(
+                "Transient LLM error, retrying in %.1fs: %s", delay, str(error)[:100]
+            )
+            return delay
+
+        self.circuit_breaker.record_success()
+        if self._should_retry(error) and attempts["parse"] < self.max_retries_on_parse:
+            attempts["parse"] += 1
+            metrics.inc("llm_retries_total", reason="parse")
+            kwargs["temperature"] = min(
+                (self.temperature or 0.0) + self.retry_temperature_boost, 1.0
+            )
+            logger.warning(
+                "Parsing error, retrying with temp=%s: %s",
+                kwargs["temperature"],
+                str(error)[:100],
+            )
+            return 0.0
+        return None
+
     def _call_with_retry(self, method: str, *args, **kwargs) -> BaseMessage:
-        original_temp = self.temperature
-        
-        for attempt in range(self.max_retries_on_parse + 1):
+        attempts = {"parse": 0, "transient": 0}
+        while True:
+            self.circuit_breaker.before_call()
             try:
-                return getattr(super(), method)(*args, **kwargs)
+                result = getattr(super(), method)(*args, **kwargs)
             except Exception as e:
-                if self._should_retry(e) and attempt < self.max_retries_on_parse:
-                    self.temperature = min(original_temp + self.retry_temperature_boost, 1.0)
-                    logger.warning("Parsing error, retrying with temp=%s: %s", self.temperature, str(e)[:100])
-                else:
+                delay = self._next_attempt(e, attempts, kwargs)
+                if delay is None:
                     raise
-            finally:
-                self.temperature = original_temp
-    
+                time.sleep(delay)
+            except BaseException:
+                self.circuit_breaker.abort_call()
+                raise
+            else:
+                self.circuit_breaker.record_success()
+                return result
+
     async def _acall_with_retry(self, method: str, *args, **kwargs) -> BaseMessage:
-        original_temp = self.temperature
-        
-        for attempt in range(self.max_retries_on_parse + 1):
+        attempts = {"parse": 0, "transient": 0}
+        while True:
+            self.circuit_breaker.before_call()
             try:
-                return await getattr(super(), method)(*args, **kwargs)
+                async with llm_slot(self.concurrency_group, self.max_concurrency):
+                    result = await getattr(super(), method)(*args, **kwargs)
             except Exception as e:
-                if self._should_retry(e) and attempt < self.max_retries_on_parse:
-                    self.temperature = min(original_temp + self.retry_temperature_boost, 1.0)
-                    logger.warning("Parsing error, retrying with temp=%s: %s", self.temperature, str(e)[:100])
-                else:
+                delay = self._next_attempt(e, attempts, kwargs)
+                if delay is None:
                     raise
-            finally:
-                self.temperature = original_temp
-    
+                await asyncio.sleep(delay)
+            except BaseException:
+                self.circuit_breaker.abort_call()
+                raise
+            else:
+                self.circuit_breaker.record_success()
+                return result
+
     def invoke(self, input: Any, config=None, **kwargs) -> BaseMessage:
-        return self._call_with_retry('invoke', input, config=config, **kwargs)
-    
+        return self._call_with_retry("invoke", input, config=config, **kwargs)
+
     async def ainvoke(self, input: Any, config=None, **kwargs) -> BaseMessage:
-        return await self._acall_with_retry('ainvoke', input, config=config, **kwargs)
+        return await self._acall_with_retry("ainvoke", input, config=config, **kwargs)
 
 
 def create_llm(**overrides) -> RetryableLLM:
@@ -65,11 +274,20 @@ def create_llm(**overrides) -> RetryableLLM:
         "api_key": settings.OPENAI_API_KEY,
         "model": settings.OPENAI_DEFAULT_MODEL,
         "temperature": settings.TEMPERATURE,
+        # Report token usage for streamed responses too
+        "stream_usage": True,
+        # Transient errors are retried by RetryableLLM, not the OpenAI client
+        "max_retries": 0,
+        "max_retries_on_transient": settings.LLM_MAX_RETRIES,
+        "retry_base_delay": settings.LLM_RETRY_BASE_DELAY,
+        "retry_max_delay": settings.LLM_RETRY_MAX_DELAY,
+        "circuit_failure_threshold": settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+        "circuit_reset_timeout": settings.LLM_CIRCUIT_RESET_SECONDS,
     }
     if settings.OPENAI_API_BASE:
         kwargs["base_url"] = settings.OPENAI_API_BASE
     if settings.MAX_TOKENS:
         kwargs["max_tokens"] = settings.MAX_TOKENS
-    
+
     kwargs.update(overrides)
     return RetryableLLM(**kwargs)
@@ -0,0 +1,325 @@
+"""Process-wide MCP tool cache with warm, pooled sessions."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import anyio
+import httpx
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp import ClientSession, types
+
+from config.settings import settings
+from utils.concurrency import LoopLocal
+from utils.metrics import metrics
+from utils.tool_access import is_read_only_tool
+
+logger = logging.getLogger(__name__)
+
+SESSION_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    httpx.TransportError,
+)
+
+
+class _PooledSession:
+    """Stand-in session for converted tools that routes calls to the pool's live session."""
+
+    def __init__(self, pool: "McpToolPool"):
+        self._pool = pool
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None, **kwargs):
+        return await self._pool.call_tool(name, arguments, **kwargs)
+
+
+class McpToolPool:
+    """Cached tool schemas and one long-lived session for an MCP server.
+
+    Tools are shared by every ``SupervisorSystem`` in the process. They are
+    refreshed in the background once ``ttl_seconds`` pass or when the server
+    sends ``notifications/tools/list_changed``; ``version`` changes whenever the
+    tool schemas do. Tool calls reuse one warm session that is reopened on
+    demand if it breaks or the event loop changes.
+
+    Concurrent identical calls of read-only tools (same name and arguments)
+    share one upstream request, and their successful results are reused for
+    ``call_cache_ttl`` seconds. Any write call clears the result cache.
+    """
+
+    def __init__(
+        self,
+        server_name: str,
+        connection: dict,
+        ttl_seconds: float,
+        call_cache_ttl: float = 0.0,
+        call_cache_max_entries: int = 512,
+    ):
+        self.server_name = server_name
+        self.ttl_seconds = ttl_seconds
+        self.call_cache_ttl = call_cache_ttl
+        self.call_cache_max_entries = call_cache_max_entries
+        self.version = 0
+
+        connection = {
+            **connection,
+            "session_kwargs": {
+                **connection.get("session_kwargs", {}),
+                "message_handler": self._on_message,
+            },
+        }
+        self._client = MultiServerMCPClient({server_name: connection})
+        self._proxy = _PooledSession(self)
+
+        self._tools: Optional[list[BaseTool]] = None
+        self._signature: Optional[str] = None
+        self._loaded_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._load_lock = LoopLocal(asyncio.Lock)
+
+        self._session: Optional[ClientSession] = None
+        self._session_task: Optional[asyncio.Task] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session_lock = LoopLocal(asyncio.Lock)
+
+        self._in_flight: LoopLocal[dict[str, asyncio.Task]] = LoopLocal(dict)
+        self._results: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._results_lock = threading.Lock()
+        # Bumped by write calls; reads started before a write don't fill the cache
+        self._write_generation = 0
+
+    async def get_tools(self) -> list[BaseTool]:
+        """Return cached tools, loading them on first use."""
+        if self._tools is None:
+            async with self._load_lock.get():
+                if self._tools is None:
+                    await self.refresh()
+        elif time.monotonic() - self._loaded_at > self.ttl_seconds:
+            self._schedule_refresh()
+        return self._tools
+
+    async def refresh(self):
+        """Reload tool schemas from the server."""
+        session = await self._get_session()
+
+        mcp_tools, cursor = [], None
+        while True:
+            page = await session.list_tools(cursor=cursor)
+            mcp_tools.extend(page.tools)
+            if not page.nextCursor:
+                break
+            cursor = page.nextCursor
+
+        signature = hashlib.sha256(
+            json.dumps(
+                [t.model_dump(mode="json") for t in mcp_tools], sort_keys=True
+            ).encode()
+        ).hexdigest()
+        if signature != self._signature:
+            self._tools = [
+                convert_mcp_tool_to_langchain_tool(
+                    self._proxy, t, server_name=self.server_name
+                )
+                for t in mcp_tools
+            ]
+            self._signature = signature
+            self.version += 1
+            logger.info(
+                "Loaded %d tools from MCP server '%s' (version %d)",
+                len(mcp_tools),
+                self.server_name,
+                self.version,
+            )
+        self._loaded_at = time.monotonic()
+
+    async def call_tool(
+        self, name: str, arguments: Optional[dict] = None, **kwargs: Any
+    ):
+        """Call a tool, sharing concurrent identical read calls and recent read results."""
+        if not is_read_only_tool(name):
+            self._clear_results()
+            return await self._call_upstream(name, arguments, **kwargs)
+        # Calls reporting progress to their caller can't be shared
+        if any(value is not None for value in kwargs.values()):
+            return await self._call_upstream(name, arguments, **kwargs)
+
+        key = _call_key(name, arguments)
+        cached = self._cached_result(key)
+        if cached is not None:
+            metrics.inc("mcp_call_cache_hits_total", server=self.server_name, tool=name)
+            return cached
+
+        in_flight = self._in_flight.get()
+        task = in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._call_upstream(name, arguments, **kwargs))
+            in_flight[key] = task
+            generation = self._write_generation
+            task.add_done_callback(
+                lambda done: self._finish_call(in_flight, key, done, generation)
+            )
+        else:
+            metrics.inc("mcp_calls_coalesced_total", server=self.server_name, tool=name)
+        # Shielded so a cancelled caller doesn't cancel the request the others wait for
+        return await asyncio.shield(task)
+
+    def _finish_call(
+        self, in_flight: dict, key: str, task: asyncio.Task, generation: int
+    ):
+        if in_flight.get(key) is task:
+            del in_flight[key]
+        if (
+            task.cancelled()
+            or task.exception() is not None
+            or getattr(task.result(), "isError", False)
+        ):
+            return
+        if self.call_cache_ttl > 0:
+            with self._results_lock:
+                if generation != self._write_generation:
+                    return
+                self._results[key] = (time.monotonic(), task.result())
+                self._results.move_to_end(key)
+                while len(self._results) > self.call_cache_max_entries:
+                    self._results.popitem(last=False)
+
+    def _cached_result(self, key: str):
+        with self._results_lock:
+            entry = self._results.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.call_cache_ttl:
+                del self._results[key]
+                return None
+            return entry[1]
+
+    def _clear_results(self):
+        with self._results_lock:
+            self._write_generation += 1
+            self._results.clear()
+
+    async def _call_upstream(
+        self, name: str, arguments: Optional[dict] = None, **kwargs: Any
+    ):
+        """Call a tool on the warm session, reconnecting once if the session broke."""
+        session = await self._get_session()
+        try:
+            return await session.call_tool(name, arguments, **kwargs)
+        except SESSION_ERRORS as e:
+            logger.warning(
+                "MCP session '%s' broken, reconnecting: %s", self.server_name, e
+            )
+            await self._close_session()
+            session = await self._get_session()
+            return await session.call_tool(name, arguments, **kwargs)
+
+    async def aclose(self):
+        """Close the pooled session."""
+        await self._close_session()
+
+    def _schedule_refresh(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(
+                "Background refresh of MCP tools '%s' failed: %s", self.server_name, e
+            )
+
+    async def _on_message(self, message) -> None:
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ToolListChangedNotification
+        ):
+            logger.info("MCP server '%s' changed its tool list", self.server_name)
+            self._schedule_refresh()
+
+    async def _get_session(self) -> ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session_alive(loop):
+            return self._session
+
+        async with self._session_lock.get():
+            if self._session_alive(loop):
+                return self._session
+
+            ready = loop.create_future()
+            self._session_loop = loop
+            self._session_task = loop.create_task(self._hold_session(ready))
+            self._session = await ready
+            return self._session
+
+    def _session_alive(self, loop: asyncio.AbstractEventLoop) -> bool:
+        return (
+            self._session is not None
+            and self._session_loop is loop
+            and not self._session_task.done()
+        )
+
+    async def _hold_session(self, ready: asyncio.Future):
+        """Own the session context for its whole life (anyio scopes are task-bound)."""
+        session = None
+        try:
+            async with self._client.session(self.server_name) as session:
+                ready.set_result(session)
+                await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning("MCP session '%s' closed: %s", self.server_name, e)
+        finally:
+            if session is not None and self._session is session:
+                self._session = None
+
+    async def _close_session(self):
+        task = self._session_task
+        self._session = None
+        if (
+            task is not None
+            and not task.done()
+            and self._session_loop is asyncio.get_running_loop()
+        ):
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+def _call_key(name: str, arguments: Optional[dict]) -> str:
+    """Tool name and arguments with unset arguments dropped and keys sorted."""
+    arguments = {k: v for k, v in (arguments or {}).items() if v is not None}
+    return json.dumps(
+        [name, arguments], sort_keys=True, ensure_ascii=False, default=str
+    )
+
+
+_pools: dict[str, McpToolPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_tool_pool(mcp_config: dict) -> McpToolPool:
+    """Return the process-wide pool for a single-server MCP config."""
+    ((server_name, connection),) = mcp_config.items()
+    key = json.dumps({server_name: connection}, sort_keys=True, default=str)
+
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = McpToolPool(
+                server_name,
+                connection,
+                settings.MCP_TOOLS_TTL_SECONDS,
+                call_cache_ttl=settings.MCP_CALL_CACHE_TTL_SECONDS,
+                call_cache_max_entries=settings.MCP_CALL_CACHE_MAX_ENTRIES,
+            )
+        return _pools[key]
@@ -0,0 +1,198 @@
+"""In-process metrics with a Prometheus text endpoint and a JSON event log."""
+
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+event_logger = logging.getLogger("metrics")
+
+METRIC_PREFIX = "knowledge_assistant_"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+RATIO_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0)
+
+METRIC_HELP = {
+    "graph_node_seconds": "Wall time of graph node executions",
+    "llm_call_seconds": "Latency of LLM calls including retries",
+    "llm_prompt_tokens_total": "Prompt tokens reported by the LLM",
+    "llm_completion_tokens_total": "Completion tokens reported by the LLM",
+    "llm_cached_prompt_tokens_total": "Prompt tokens the LLM provider served from its prefix cache",
+    "llm_prefix_cache_hit_ratio": "Share of each LLM call's prompt tokens served from the prefix cache",
+    "llm_slot_wait_seconds": "Time LLM calls waited for a concurrency slot",
+    "llm_retries_total": "LLM call retries by reason",
+    "llm_circuit_breaker_open_total": "Times the LLM circuit breaker opened",
+    "llm_circuit_breaker_rejections_total": "LLM calls rejected by the open circuit breaker",
+    "tool_call_seconds": "Latency of tool calls",
+    "tool_payload_bytes": "Size of tool results",
+    "tool_output_truncations_total": "Tool results cut to the output budget",
+    "tool_output_chars_saved_total": "Characters removed from tool results by conversion and truncation",
+    "bound_tool_schema_bytes": "Size of the tool schemas bound to each LLM call",
+    "scratchpad_hits_total": "Sub-agent tool calls served from the thread scratchpad",
+    "scratchpad_misses_total": "Sub-agent read tool calls not found in the thread scratchpad",
+    "mcp_calls_coalesced_total": "MCP tool calls that joined an identical in-flight request",
+    "mcp_call_cache_hits_total": "MCP tool calls served from the short-lived result cache",
+    "checkpoint_operation_seconds": "Latency of checkpointer reads and writes",
+    "checkpoint_serialized_bytes": "Size of serialized checkpoints and writes after moving message contents to blobs",
+    "tool_approvals_total": "Tool calls by approval outcome: auto, approved, rejected or blocked",
+    "deadline_exceeded_total": "Agent runs cut short by the request deadline",
+    "deadline_retries_skipped_total": "LLM and tool retries given up because the backoff would outlast the request deadline",
+    "summarization_seconds": "Duration of history summarizations, full or incremental",
+    "startup_phase_seconds": "Duration of startup and warm-up phases",
+    "log_records_dropped_total": "Log records dropped because the log queue was full",
+    "api_requests_total": "API requests by endpoint and outcome",
+    "api_queue_wait_seconds": "Time API requests waited for their thread and a run slot",
+}
+HISTOGRAM_BUCKETS = {
+    "tool_payload_bytes": BYTES_BUCKETS,
+    "bound_tool_schema_bytes": BYTES_BUCKETS,
+    "checkpoint_serialized_bytes": BYTES_BUCKETS,
+    "llm_prefix_cache_hit_ratio": RATIO_BUCKETS,
+}
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: tuple, extra: Optional[tuple] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (
+        v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for _, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by name and labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, _Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = _Histogram(HISTOGRAM_BUCKETS.get(name, LATENCY_BUCKETS))
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe the wall time of the block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full_name = METRIC_PREFIX + name
+                lines.append(f"# HELP {full_name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {full_name} counter")
+                for key, value in series.items():
+                    lines.append(f"{full_name}{_format_labels(key)} {value}")
+
+            for name, series in sorted(self._histograms.items()):
+                full_name = METRIC_PREFIX + name
+                lines.append(f"# HELP {full_name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {full_name} histogram")
+                for key, hist in series.items():
+                    cumulative = 0
+                    for bound, count in zip((*hist.buckets, "+Inf"), hist.counts):
+                        cumulative += count
+                        lines.append(
+                            f"{full_name}_bucket{_format_labels(key, ('le', str(bound)))} {cumulative}"
+                        )
+                    lines.append(f"{full_name}_sum{_format_labels(key)} {hist.sum}")
+                    lines.append(f"{full_name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+metrics = MetricsRegistry()
+
+
+def log_event(event: str, **fields):
+    """Write one structured JSON line to the ``metrics`` logger when enabled."""
+    if settings.METRICS_JSON_LOG:
+        event_logger.info(
+            json.dumps(
+                {"event": event, "ts": round(time.time(), 3), **fields},
+                ensure_ascii=False,
+                default=str,
+            )
+        )
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("Metrics request: " + format, *args)
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve ``/metrics`` on a daemon thread; later calls return the running server."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(
+                target=_server.serve_forever, name="metrics-server", daemon=True
+            ).start()
+            logger.info("Metrics endpoint listening on %s:%d/metrics", host, port)
+        return _server
@@ -0,0 +1,21 @@
+"""System prompts, read from disk once per process."""
+
+import os
+from functools import lru_cache
+
+from config.settings import settings
+
+
+@lru_cache(maxsize=None)
+def _read_prompt(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def load_prompt(name: str) -> str:
+    """Text of the prompt file ``name`` in ``SYSTEM_PROMPT_DIR``.
+
+    Agents are rebuilt whenever the MCP tools change; the cached text keeps
+    their system prompt byte-identical, so provider prefix caches keep hitting.
+    """
+    return _read_prompt(os.path.join(settings.SYSTEM_PROMPT_DIR, name))
@@ -0,0 +1,58 @@
+"""In-memory BM25 ranking of short texts."""
+
+import math
+import re
+from collections import Counter
+from typing import Sequence
+
+# Stems are cut to this length so "deploy" matches "deployment"
+STEM_LENGTH = 6
+
+
+def terms(text: str) -> list[str]:
+    """Lowercased word stems of ``text``."""
+    return [
+        word[:STEM_LENGTH]
+        for word in re.findall(r"[^\W_]+", text.lower())
+        if len(word) > 1
+    ]
+
+
+class BM25:
+    """BM25 scores of a fixed list of documents, each given as a list of terms."""
+
+    def __init__(
+        self, documents: Sequence[list[str]], k1: float = 1.2, b: float = 0.75
+    ):
+        self.k1 = k1
+        self.b = b
+        self._documents = [Counter(doc) for doc in documents]
+        self._lengths = [len(doc) for doc in documents]
+        self._avg_length = (
+            sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        )
+        document_frequency = Counter(term for doc in self._documents for term in doc)
+        total = len(self._documents)
+        self._idf = {
+            term: math.log(1 + (total - count + 0.5) / (count + 0.5))
+            for term, count in document_frequency.items()
+        }
+
+    def scores(self, query: str) -> list[float]:
+        """Score of every document for the query, in document order."""
+        query_terms = set(terms(query))
+        scores = []
+        for doc, length in zip(self._documents, self._lengths):
+            norm = (
+                self.k1 * (1 - self.b + self.b * length / self._avg_length)
+                if self._avg_length
+                else self.k1
+            )
+            scores.append(
+                sum(
+                    self._idf[term] * doc[term] * (self.k1 + 1) / (doc[term] + norm)
+                    for term in query_terms
+                    if term in doc
+                )
+            )
+        return scores
@@ -0,0 +1,160 @@
+"""Semantic cache of sub-agent answers."""
+
+import logging
+import math
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from langchain_core.embeddings import Embeddings
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+RECENT_EMBEDDINGS = 64
+
+
+def normalize_request(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+@dataclass
+class _Entry:
+    value: str
+    created_at: float
+    embedding: Optional[list[float]] = None
+
+
+class ResponseCache:
+    """LRU/TTL cache of sub-agent answers keyed by agent, scope and normalized request.
+
+    Answers are only served within their scope, e.g. the conversation thread,
+    so one user's answers never reach another; the empty scope is shared. With an embeddings model, an
+    exact-key miss falls back to the most similar cached request of the same
+    agent and scope above ``similarity_threshold``. Each agent has a
+    generation counter bumped by ``invalidate``; answers computed across an
+    invalidation are not stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        embeddings: Optional[Embeddings] = None,
+        similarity_threshold: float = 0.92,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self._entries: OrderedDict[tuple[str, str, str], _Entry] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._recent_embeddings: OrderedDict[str, list[float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, agent: str) -> int:
+        return self._generations.get(agent, 0)
+
+    def invalidate(self, agent: str):
+        """Drop all cached answers of an agent."""
+        self._generations[agent] = self.generation(agent) + 1
+        for key in [k for k in self._entries if k[0] == agent]:
+            del self._entries[key]
+        logger.debug("Response cache invalidated for %s", agent)
+
+    async def aget(self, agent: str, request: str, scope: str = "") -> Optional[str]:
+        key = (agent, scope, normalize_request(request))
+        self._evict_expired()
+
+        if key not in self._entries and self.embeddings is not None:
+            key = await self._find_similar(agent, scope, key[2]) or key
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry.value
+
+    async def aset(
+        self, agent: str, request: str, value: str, generation: int, scope: str = ""
+    ):
+        """Store an answer unless the agent was invalidated since ``generation``."""
+        if generation != self.generation(agent):
+            return
+
+        key = (agent, scope, normalize_request(request))
+        embedding = await self._embed(key[2]) if self.embeddings is not None else None
+        self._entries[key] = _Entry(value, time.monotonic(), embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _find_similar(
+        self, agent: str, scope: str, normalized: str
+    ) -> Optional[tuple[str, str, str]]:
+        query = await self._embed(normalized)
+        best, best_score = None, self.similarity_threshold
+        for key, entry in self._entries.items():
+            if key[:2] != (agent, scope) or entry.embedding is None:
+                continue
+            score = sum(a * b for a, b in zip(query, entry.embedding))
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+    async def _embed(self, text: str) -> list[float]:
+        """Embed and L2-normalize text, reusing recent embeddings."""
+        if text in self._recent_embeddings:
+            return self._recent_embeddings[text]
+
+        vector = await self.embeddings.aembed_query(text)
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        vector = [v / norm for v in vector]
+
+        self._recent_embeddings[text] = vector
+        if len(self._recent_embeddings) > RECENT_EMBEDDINGS:
+            self._recent_embeddings.popitem(last=False)
+        return vector
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        expired = [
+            k for k, e in self._entries.items() if now - e.created_at > self.ttl_seconds
+        ]
+        for key in expired:
+            del self._entries[key]
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """Create the response cache from settings, or None when disabled."""
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+
+    embeddings = None
+    if settings.RESPONSE_CACHE_EMBEDDING_MODEL:
+        from langchain_openai import OpenAIEmbeddings
+
+        embeddings = OpenAIEmbeddings(
+            model=settings.RESPONSE_CACHE_EMBEDDING_MODEL,
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_API_BASE,
+            check_embedding_ctx_length=False,
+        )
+
+    return ResponseCache(
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+        embeddings=embeddings,
+        similarity_threshold=settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+    )
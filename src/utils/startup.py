@@ -0,0 +1,51 @@
+"""Timings of startup phases, from process start to a warm graph."""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Entry points import this module first, so this is close to process start;
+# it imports nothing heavy itself to keep it that way
+_process_started = time.perf_counter()
+
+
+class StartupReport:
+    """Record how long each startup phase took and log them once startup is done."""
+
+    def __init__(self):
+        self.phases: list[tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float):
+        from utils.metrics import metrics
+
+        with self._lock:
+            self.phases.append((name, seconds))
+        metrics.observe("startup_phase_seconds", seconds, phase=name)
+
+    def log(self, title: str = "Startup"):
+        total = time.perf_counter() - _process_started
+        with self._lock:
+            phases = ", ".join(
+                f"{name} {seconds:.2f}s" for name, seconds in self.phases
+            )
+        logger.info(
+            "%s took %.2fs since process start: %s",
+            title,
+            total,
+            phases or "no phases recorded",
+        )
+
+
+startup_report = StartupReport()
@@ -0,0 +1,116 @@
+"""Token counting with a cached tiktoken encoding and per-message memoization."""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from langchain_core.messages import BaseMessage, convert_to_messages
+from langchain_core.messages.utils import count_tokens_approximately
+
+logger = logging.getLogger(__name__)
+
+# Per-message overhead of the chat format (role and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+DEFAULT_ENCODING = "o200k_base"
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str):
+    """tiktoken encoding for the model, or None when tiktoken can't provide one."""
+    try:
+        import tiktoken
+    except ImportError:
+        logger.warning("tiktoken is not installed, token counts are approximate")
+        return None
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception as e:
+        logger.warning(
+            "Could not load tiktoken encoding for %s, token counts are approximate: %s",
+            model,
+            e,
+        )
+        return None
+    try:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        logger.warning(
+            "Could not load tiktoken encoding %s, token counts are approximate: %s",
+            DEFAULT_ENCODING,
+            e,
+        )
+        return None
+
+
+def _message_text(message: BaseMessage) -> str:
+    text = message.text if isinstance(message.content, list) else str(message.content)
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        text += json.dumps(
+            [{"name": tc["name"], "args": tc["args"]} for tc in tool_calls],
+            ensure_ascii=False,
+        )
+    return text
+
+
+class TokenCounter:
+    """Count message tokens, remembering the count of each message text.
+
+    Conversation history is recounted before every model call, so most
+    messages hit the memo and only new ones are encoded.
+    """
+
+    def __init__(self, model: str, max_entries: int = 20000):
+        self.model = model
+        self.max_entries = max_entries
+        self._memo: OrderedDict[tuple, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count_message(self, message: BaseMessage) -> int:
+        text = _message_text(message)
+        key = (message.type, len(text), hash(text))
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+
+        encoding = get_encoding(self.model)
+        if encoding is None:
+            tokens = count_tokens_approximately(
+                [message], use_usage_metadata_scaling=False
+            )
+        else:
+            tokens = (
+                len(encoding.encode(text, disallowed_special=()))
+                + MESSAGE_OVERHEAD_TOKENS
+            )
+
+        with self._lock:
+            self._memo[key] = tokens
+            if len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return tokens
+
+    def __call__(self, messages: Iterable) -> int:
+        return sum(
+            self.count_message(message)
+            for message in convert_to_messages(list(messages))
+        )
+
+
+_counters: dict[str, TokenCounter] = {}
+
+
+def get_token_counter(model: Optional[str]) -> TokenCounter:
+    """Shared counter for a model name."""
+    model = model or DEFAULT_ENCODING
+    counter = _counters.get(model)
+    if counter is None:
+        counter = _counters.setdefault(model, TokenCounter(model))
+    return counter
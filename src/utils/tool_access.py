@@ -0,0 +1,58 @@
+"""Read/write classification of MCP tools by name."""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+WRITE_TOOL_MARKERS = (
+    "create",
+    "update",
+    "write",
+    "delete",
+    "remove",
+    "replace",
+    "append",
+    "patch",
+    "add",
+    "set",
+    "move",
+    "rename",
+    "upload",
+    "edit",
+    "manage",
+)
+READ_TOOL_MARKERS = ("search", "read", "get", "list", "find", "fetch")
+
+
+def is_read_only_tool(name: str) -> bool:
+    """Classify a tool as read-only by the words in its name.
+
+    Write markers win (``obsidian_search_replace`` writes), and names without
+    any known marker are treated as writes to stay on the safe side.
+    """
+    words = set(name.lower().replace("-", "_").split("_"))
+    if words & set(WRITE_TOOL_MARKERS):
+        return False
+    return bool(words & set(READ_TOOL_MARKERS))
+
+
+# Set while a sub-agent runs a delegation approved only as a read; asyncio
+# tasks inherit it, so it reaches the sub-agent's model and tool calls
+_read_only: ContextVar[bool] = ContextVar("read_only_delegation", default=False)
+
+
+@contextmanager
+def read_only_delegation(enabled: bool = True):
+    """Restrict the enclosed sub-agent run to read-only tools."""
+    token = _read_only.set(enabled)
+    try:
+        yield
+    finally:
+        try:
+            _read_only.reset(token)
+        except ValueError:
+            # An async generator closed from another task finishes in another context
+            pass
+
+
+def in_read_only_delegation() -> bool:
+    return _read_only.get()
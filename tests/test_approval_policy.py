@@ -0,0 +1,200 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agents.supervisor_agent import _delegate_with_scratchpad
+from middleware.approval import ReadOnlyToolsMiddleware
+from utils.approval_policy import (
+    READ,
+    WRITE,
+    ApprovalPolicy,
+    DEFAULT_POLICY,
+    load_approval_policy,
+)
+from utils.tool_access import in_read_only_delegation, read_only_delegation
+
+
+@pytest.fixture
+def policy():
+    return ApprovalPolicy.from_dict(DEFAULT_POLICY)
+
+
+@pytest.mark.parametrize(
+    "request_text",
+    [
+        "Find my notes about the release meeting",
+        "Покажи заметки про релиз",
+        "Which notes mention the canary rollout?",
+    ],
+)
+def test_obsidian_lookups_are_reads(policy, request_text):
+    assert policy.classify("manage_obsidian_notes", {"request": request_text}) == READ
+
+
+@pytest.mark.parametrize(
+    "request_text",
+    [
+        "Make a note about today's standup",
+        "Note down the action items",
+        "Log this incident in my journal",
+        "Сделай заметку о встрече",
+        "What did I write yesterday? Update it with the new date",
+        "Meeting with Anna at 5",
+    ],
+)
+def test_obsidian_requests_default_to_writes(policy, request_text):
+    assert policy.classify("manage_obsidian_notes", {"request": request_text}) == WRITE
+
+
+def test_confluence_requests_are_writes_only_when_they_ask_for_a_change(policy):
+    assert (
+        policy.classify("search_confluence", {"request": "How do we deploy payments?"})
+        == READ
+    )
+    assert (
+        policy.classify("search_confluence", {"request": "Update the deployment page"})
+        == WRITE
+    )
+
+
+def test_calls_no_rule_matches_fall_back_to_the_tool_name():
+    policy = ApprovalPolicy.from_dict({"rules": []})
+
+    assert policy.classify("confluence_get_page", {}) == READ
+    assert policy.classify("obsidian_search_replace", {}) == WRITE
+    assert policy.classify("unknown_tool", {}) == WRITE
+
+
+def test_first_matching_rule_wins():
+    policy = ApprovalPolicy.from_dict(
+        {
+            "rules": [
+                {"tool": "obsidian_*", "args": {"path": "^Inbox/"}, "access": READ},
+                {"tool": "obsidian_*", "access": WRITE},
+            ]
+        }
+    )
+
+    assert policy.classify("obsidian_update_note", {"path": "Inbox/todo.md"}) == READ
+    assert policy.classify("obsidian_update_note", {"path": "Projects/x.md"}) == WRITE
+    assert policy.requires_approval("obsidian_read_note", {"path": "Projects/x.md"})
+
+
+def test_invalid_policies_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ApprovalPolicy.from_dict({"rules": [{"tool": "*", "access": "maybe"}]})
+    with pytest.raises(ValueError):
+        ApprovalPolicy.from_dict(
+            {"rules": [{"args": {"request": "("}, "access": READ}]}
+        )
+
+    path = tmp_path / "policy.json"
+    path.write_text("{not json", encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError):
+        load_approval_policy(str(path))
+
+
+MIXED_REQUESTS = [
+    ("manage_obsidian_notes", "Find the release checklist note and fix the typo in it"),
+    ("manage_obsidian_notes", "Find my todo note and tick off the deploy item"),
+    ("search_confluence", "Find the onboarding page and fix the broken link"),
+    ("manage_obsidian_notes", "Find notes tagged #old and clean them up"),
+]
+
+
+@pytest.mark.parametrize("tool_name, request_text", MIXED_REQUESTS)
+def test_lookups_that_ask_for_a_change_are_writes(policy, tool_name, request_text):
+    assert policy.classify(tool_name, {"request": request_text}) == WRITE
+
+
+def _model_request(tools):
+    def override(**changes):
+        return SimpleNamespace(**{"tools": tools, **changes})
+
+    return SimpleNamespace(tools=tools, override=override)
+
+
+def _tool_request(name):
+    return SimpleNamespace(
+        tool=None, tool_call={"name": name, "id": "call_1", "args": {}}
+    )
+
+
+def test_read_only_delegation_binds_and_runs_only_read_tools():
+    middleware = ReadOnlyToolsMiddleware("Obsidian agent")
+    tools = [
+        {"type": "function", "function": {"name": "obsidian_global_search"}},
+        {"type": "function", "function": {"name": "obsidian_update_note"}},
+        SimpleNamespace(name="obsidian_read_note"),
+        SimpleNamespace(name="obsidian_append_content"),
+    ]
+    executed = []
+
+    async def model(request):
+        return [
+            t["function"]["name"] if isinstance(t, dict) else t.name
+            for t in request.tools
+        ]
+
+    async def tool(request):
+        executed.append(request.tool_call["name"])
+        return ToolMessage(content="done", tool_call_id="call_1")
+
+    async def run(read_only):
+        with read_only_delegation(read_only):
+            bound = await middleware.awrap_model_call(_model_request(tools), model)
+            write = await middleware.awrap_tool_call(
+                _tool_request("obsidian_update_note"), tool
+            )
+            read = await middleware.awrap_tool_call(
+                _tool_request("obsidian_read_note"), tool
+            )
+        return bound, write, read
+
+    bound, write, read = asyncio.run(run(True))
+    assert bound == ["obsidian_global_search", "obsidian_read_note"]
+    assert write.status == "error"
+    assert read.content == "done"
+    assert executed == ["obsidian_read_note"]
+
+    bound, write, _ = asyncio.run(run(False))
+    assert len(bound) == 4
+    assert write.content == "done"
+
+
+class FakeAgent:
+    """Sub-agent recording whether each run was restricted to read-only tools."""
+
+    def __init__(self):
+        self.read_only: list[bool] = []
+
+    async def ainvoke(self, state, context=None):
+        self.read_only.append(in_read_only_delegation())
+        return {"messages": [AIMessage("answer")]}
+
+
+def _runtime():
+    return SimpleNamespace(
+        state={"messages": [HumanMessage("hi")]},
+        config={"configurable": {"thread_id": "t1"}},
+        tool_call_id="call_1",
+    )
+
+
+@pytest.mark.parametrize("tool_name, request_text", MIXED_REQUESTS)
+def test_sub_agents_of_read_delegations_run_read_only(policy, tool_name, request_text):
+    agent = FakeAgent()
+
+    async def delegate(request):
+        return await _delegate_with_scratchpad(
+            agent, "agent", tool_name, request, _runtime(), None, None, policy
+        )
+
+    asyncio.run(delegate("Find the release checklist note"))
+    asyncio.run(delegate(request_text))
+
+    assert agent.read_only == [True, False]
+    assert not in_read_only_delegation()
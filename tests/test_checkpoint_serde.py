@@ -0,0 +1,125 @@
+import os
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from config.settings import settings
+from storage import checkpoint_serde
+from storage.blob_store import BlobStore
+from storage.checkpoint_serde import (
+    MISSING_CONTENT,
+    BlobRefSerializer,
+    create_checkpoint_serde,
+)
+
+BIG = "page " * 1000
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(str(tmp_path / "blobs"))
+
+
+def _checkpoint(*contents: str) -> dict:
+    messages = [HumanMessage("hi")]
+    for n, content in enumerate(contents):
+        messages.append(ToolMessage(content=content, tool_call_id=f"call_{n}"))
+    return {"channel_values": {"messages": messages}, "v": 1}
+
+
+def _blob_count(store: BlobStore) -> int:
+    return sum(len(files) for _, _, files in os.walk(store.root))
+
+
+def test_round_trip_stores_large_contents_once(store):
+    serde = BlobRefSerializer(store, min_chars=100)
+    checkpoint = _checkpoint(BIG, "short", BIG)
+
+    data = serde.dumps_typed(checkpoint)
+    loaded = BlobRefSerializer(store, min_chars=100).loads_typed(data)
+
+    assert [m.content for m in loaded["channel_values"]["messages"]] == [
+        "hi",
+        BIG,
+        "short",
+        BIG,
+    ]
+    assert _blob_count(store) == 1
+    assert BIG not in data[1].decode("latin-1")
+
+
+def test_serializing_leaves_the_checkpoint_untouched(store):
+    checkpoint = _checkpoint(BIG)
+
+    BlobRefSerializer(store, min_chars=100).dumps_typed(checkpoint)
+
+    assert checkpoint["channel_values"]["messages"][1].content == BIG
+
+
+def test_large_payloads_are_compressed(store):
+    serde = BlobRefSerializer(store, min_chars=10**6, compress_min_bytes=1024)
+
+    type_, data = serde.dumps_typed(_checkpoint(BIG))
+
+    assert type_.startswith(checkpoint_serde.ZLIB_TYPE_PREFIX)
+    assert len(data) < len(BIG)
+    assert (
+        serde.loads_typed((type_, data))["channel_values"]["messages"][1].content == BIG
+    )
+
+
+def test_loads_checkpoints_of_the_default_serializer(store):
+    checkpoint = {"channel_values": {"messages": [AIMessage("plain")]}}
+
+    loaded = BlobRefSerializer(store).loads_typed(
+        JsonPlusSerializer().dumps_typed(checkpoint)
+    )
+
+    assert loaded["channel_values"]["messages"][0].content == "plain"
+
+
+def test_missing_blob_loads_as_placeholder(store):
+    data = BlobRefSerializer(store, min_chars=100).dumps_typed(_checkpoint(BIG))
+    for root, _, files in os.walk(store.root):
+        for name in files:
+            os.remove(os.path.join(root, name))
+
+    loaded = BlobRefSerializer(store, min_chars=100).loads_typed(data)
+
+    assert loaded["channel_values"]["messages"][1].content == MISSING_CONTENT
+
+
+def test_loading_touches_blobs_at_most_once_per_interval(store):
+    serde = BlobRefSerializer(store, min_chars=100)
+    data = serde.dumps_typed(_checkpoint(BIG))
+    key = next(iter(serde._texts))
+    path = store._path(key)
+
+    os.utime(path, (0, 0))
+    serde.loads_typed(data)
+    assert os.path.getmtime(path) == 0
+
+    serde._texts[key] = (BIG, time.time() - 2 * checkpoint_serde.TOUCH_INTERVAL_SECONDS)
+    serde.loads_typed(data)
+    assert os.path.getmtime(path) > 0
+
+
+def test_checkpoint_blobs_outlive_the_thread_ttl(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        settings, "CHECKPOINT_BLOB_STORE_PATH", str(tmp_path / "checkpoint_blobs")
+    )
+    monkeypatch.setattr(settings, "CHECKPOINT_BLOB_MIN_CHARS", 2048)
+    monkeypatch.setattr(settings, "CHECKPOINT_THREAD_TTL_SECONDS", 3600)
+
+    serde = create_checkpoint_serde()
+
+    assert serde.store.root != os.path.expanduser(settings.BLOB_STORE_PATH)
+    assert serde.store.max_age_seconds > 3600 + checkpoint_serde.TOUCH_INTERVAL_SECONDS
+
+    monkeypatch.setattr(settings, "CHECKPOINT_THREAD_TTL_SECONDS", 0)
+    assert create_checkpoint_serde().store.max_age_seconds is None
+
+    monkeypatch.setattr(settings, "CHECKPOINT_BLOB_MIN_CHARS", 0)
+    assert create_checkpoint_serde() is None
@@ -0,0 +1,120 @@
+import asyncio
+import operator
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+from storage.checkpointer import BoundedMemorySaver, SqliteCheckpointSaver
+
+
+class State(TypedDict):
+    items: Annotated[list, operator.add]
+
+
+def _graph(saver):
+    builder = StateGraph(State)
+    builder.add_node("step", lambda state: {"items": [len(state["items"])]})
+    builder.add_edge(START, "step")
+    builder.add_edge("step", END)
+    return builder.compile(checkpointer=saver)
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _memory_saver(**overrides) -> BoundedMemorySaver:
+    options = dict(
+        max_per_thread=3,
+        max_threads=10,
+        thread_ttl_seconds=3600,
+        compaction_interval_seconds=3600,
+    )
+    options.update(overrides)
+    return BoundedMemorySaver(**options)
+
+
+@pytest.fixture
+def sqlite_saver(tmp_path):
+    saver = SqliteCheckpointSaver(
+        str(tmp_path / "checkpoints.sqlite"),
+        max_per_thread=3,
+        max_threads=10,
+        thread_ttl_seconds=3600,
+        write_batch_size=32,
+        flush_interval_seconds=60,
+        compaction_interval_seconds=3600,
+    )
+    yield saver
+    saver.close()
+
+
+def test_memory_saver_keeps_latest_checkpoints_per_thread():
+    saver = _memory_saver()
+    graph = _graph(saver)
+    for _ in range(5):
+        graph.invoke({"items": ["x"]}, _config("t1"))
+
+    assert len(list(saver.list(_config("t1")))) == 3
+    assert len(graph.get_state(_config("t1")).values["items"]) == 10
+
+
+def test_memory_saver_evicts_least_recently_used_threads():
+    saver = _memory_saver(max_threads=2)
+    graph = _graph(saver)
+    for thread_id in ("t1", "t2", "t3"):
+        graph.invoke({"items": ["x"]}, _config(thread_id))
+
+    saver.compact()
+
+    assert saver.get_tuple(_config("t1")) is None
+    assert saver.get_tuple(_config("t3")) is not None
+
+
+def test_memory_saver_async_methods():
+    graph = _graph(_memory_saver())
+
+    async def run():
+        await graph.ainvoke({"items": ["x"]}, _config("t1"))
+        await graph.ainvoke({"items": ["y"]}, _config("t1"))
+        return await graph.aget_state(_config("t1"))
+
+    assert asyncio.run(run()).values["items"] == ["x", 1, "y", 3]
+
+
+def test_sqlite_saver_reads_its_own_buffered_writes(sqlite_saver):
+    graph = _graph(sqlite_saver)
+    graph.invoke({"items": ["x"]}, _config("t1"))
+
+    assert graph.get_state(_config("t1")).values["items"] == ["x", 1]
+
+
+def test_sqlite_saver_persists_across_instances(sqlite_saver):
+    _graph(sqlite_saver).invoke({"items": ["x"]}, _config("t1"))
+    sqlite_saver.close()
+
+    reopened = SqliteCheckpointSaver(
+        sqlite_saver.path,
+        max_per_thread=3,
+        max_threads=10,
+        thread_ttl_seconds=3600,
+        write_batch_size=32,
+        flush_interval_seconds=60,
+        compaction_interval_seconds=3600,
+    )
+    try:
+        assert _graph(reopened).get_state(_config("t1")).values["items"] == ["x", 1]
+    finally:
+        reopened.close()
+
+
+def test_sqlite_saver_compaction_trims_checkpoints(sqlite_saver):
+    graph = _graph(sqlite_saver)
+    for _ in range(5):
+        graph.invoke({"items": ["x"]}, _config("t1"))
+
+    sqlite_saver.compact()
+
+    assert len(list(sqlite_saver.list(_config("t1")))) == 3
+    assert len(graph.get_state(_config("t1")).values["items"]) == 10
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from retrieval.confluence_mirror import SEARCH_PAGE_SIZE, ConfluenceMirror
+
+
+class FakeConfluence:
+    """Confluence MCP pool answering the mirror's CQL searches from a dict of pages."""
+
+    def __init__(self, pages: dict[str, dict]):
+        self.pages = pages
+        self.fetched: list[str] = []
+
+    async def call_tool(self, name: str, args: dict):
+        if name == "confluence_search":
+            since = re.search(r'lastmodified >= "([^"]+)"', args["query"])
+            pages = sorted(self.pages.values(), key=lambda p: p["updated"])
+            if since:
+                pages = [
+                    p
+                    for p in pages
+                    if p["updated"][:16].replace("T", " ") >= since.group(1)
+                ]
+            return _result(pages[: args["limit"]])
+
+        page = self.pages[args["page_id"]]
+        self.fetched.append(page["id"])
+        return _result(
+            {"metadata": page, "content": {"value": f"Body of {page['title']}"}}
+        )
+
+
+def _result(payload):
+    return SimpleNamespace(
+        isError=False, content=[SimpleNamespace(text=json.dumps(payload))]
+    )
+
+
+def _page(n: int, updated: str = None, version: int = 1) -> dict:
+    return {
+        "id": str(n),
+        "title": f"Page {n}",
+        "updated": updated or f"2026-01-01T{n // 60:02d}:{n % 60:02d}:00+00:00",
+        "version": {"number": version},
+    }
+
+
+def _indexed(mirror: ConfluenceMirror) -> set[str]:
+    return set(mirror._indexed_pages("ENG"))
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    return ConfluenceMirror(
+        str(tmp_path / "mirror.sqlite"), chunk_size=500, chunk_overlap=0
+    )
+
+
+def test_full_sync_pages_through_all_results(mirror):
+    pool = FakeConfluence({str(n): _page(n) for n in range(SEARCH_PAGE_SIZE * 2 + 10)})
+
+    stats = asyncio.run(mirror.sync(pool, ["ENG"], full=True))
+
+    assert stats == {"fetched": SEARCH_PAGE_SIZE * 2 + 10, "deleted": 0}
+    assert len(_indexed(mirror)) == SEARCH_PAGE_SIZE * 2 + 10
+
+
+def test_sync_fetches_only_changed_pages(mirror):
+    pool = FakeConfluence({str(n): _page(n) for n in range(10)})
+    asyncio.run(mirror.sync(pool, ["ENG"], full=True))
+    pool.fetched.clear()
+
+    pool.pages["3"] = _page(3, version=2)
+    asyncio.run(mirror.sync(pool, ["ENG"], full=True))
+
+    assert pool.fetched == ["3"]
+
+
+def test_full_sync_drops_pages_deleted_upstream(mirror):
+    pool = FakeConfluence({str(n): _page(n) for n in range(10)})
+    asyncio.run(mirror.sync(pool, ["ENG"], full=True))
+
+    del pool.pages["4"]
+    stats = asyncio.run(mirror.sync(pool, ["ENG"], full=True))
+
+    assert stats["deleted"] == 1
+    assert "4" not in _indexed(mirror)
+
+
+def test_full_sync_stopped_early_keeps_pages_it_did_not_reach(mirror):
+    pool = FakeConfluence({str(n): _page(n) for n in range(SEARCH_PAGE_SIZE + 10)})
+    asyncio.run(mirror.sync(pool, ["ENG"], full=True))
+
+    # A full page of results modified at the same minute can't be paged past
+    for n in range(SEARCH_PAGE_SIZE):
+        pool.pages[str(n)] = _page(n, updated="2025-12-31T10:00:00+00:00", version=2)
+    stats = asyncio.run(mirror.sync(pool, ["ENG"], full=True))
+
+    assert stats["deleted"] == 0
+    assert len(_indexed(mirror)) == SEARCH_PAGE_SIZE + 10
+
+
+def test_search_returns_one_hit_per_page(mirror):
+    pool = FakeConfluence({"1": _page(1)})
+    asyncio.run(mirror.sync(pool, ["ENG"], full=True))
+
+    hits = mirror.search("Body")
+
+    assert [hit.metadata["page_id"] for hit in hits] == ["1"]
+
+
+def test_sync_after_an_early_stop_fetches_the_remaining_pages(mirror):
+    # A full page of results modified at the same minute stops the first pass
+    pages = {
+        str(n): _page(n, updated="2025-12-31T10:00:00+00:00")
+        for n in range(SEARCH_PAGE_SIZE)
+    }
+    pages.update(
+        {str(n): _page(n) for n in range(SEARCH_PAGE_SIZE, SEARCH_PAGE_SIZE + 10)}
+    )
+    pool = FakeConfluence(pages)
+    asyncio.run(mirror.sync(pool, ["ENG"], full=True))
+
+    assert mirror.last_synced("ENG") is None
+    assert len(_indexed(mirror)) == SEARCH_PAGE_SIZE
+
+    for n in range(5):
+        pool.pages[str(n)] = _page(n, updated="2026-02-01T00:00:00+00:00", version=2)
+    pool.fetched.clear()
+    asyncio.run(mirror.sync(pool, ["ENG"]))
+
+    remaining = {str(n) for n in range(SEARCH_PAGE_SIZE, SEARCH_PAGE_SIZE + 10)}
+    assert remaining <= set(pool.fetched)
+    assert len(_indexed(mirror)) == SEARCH_PAGE_SIZE + 10
+    assert mirror.last_synced("ENG") is not None
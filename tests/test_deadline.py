@@ -0,0 +1,153 @@
+import asyncio
+from types import SimpleNamespace
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from middleware.deadline import (
+    PARTIAL_MARKER,
+    DeadlineMiddleware,
+    DeadlineToolRetryMiddleware,
+    is_partial,
+    partial_answer,
+)
+from utils.deadline import expired, fits, remaining, request_deadline
+
+
+def _tool_request(name: str = "confluence_search"):
+    return SimpleNamespace(
+        tool=None, tool_call={"name": name, "id": "call_1", "args": {}}
+    )
+
+
+def test_no_deadline_by_default():
+    assert remaining() is None
+    assert not expired()
+    assert fits(10**6)
+
+
+def test_request_deadline_is_scoped():
+    with request_deadline(5):
+        assert 4 < remaining() <= 5
+        assert fits(1) and not fits(10)
+    assert remaining() is None
+
+    with request_deadline(0):
+        assert remaining() is None
+
+
+def test_deadline_reaches_tasks_started_within_the_request():
+    async def left():
+        await asyncio.sleep(0)
+        return remaining()
+
+    async def run():
+        with request_deadline(5):
+            return await asyncio.create_task(left())
+
+    assert asyncio.run(run()) is not None
+
+
+def test_partial_answer_lists_results_of_the_current_turn():
+    messages = [
+        HumanMessage("first"),
+        ToolMessage(content="old result", name="search", tool_call_id="1"),
+        HumanMessage("second"),
+        ToolMessage(content="new result", name="search", tool_call_id="2"),
+        ToolMessage(content="boom", name="read", tool_call_id="3", status="error"),
+    ]
+
+    answer = partial_answer(messages)
+
+    assert is_partial(answer)
+    assert "new result" in answer.content
+    assert "old result" not in answer.content
+    assert "boom" not in answer.content
+
+
+def test_model_call_is_skipped_after_the_deadline():
+    middleware = DeadlineMiddleware("test")
+    state = {"messages": [HumanMessage("q")]}
+
+    async def run():
+        with request_deadline(0.01):
+            await asyncio.sleep(0.02)
+            return await middleware.abefore_model(state, None)
+
+    update = asyncio.run(run())
+
+    assert update["jump_to"] == "end"
+    assert is_partial(update["messages"][0])
+    assert asyncio.run(middleware.abefore_model(state, None)) is None
+
+
+def test_model_call_in_flight_is_cut_off_at_the_deadline():
+    middleware = DeadlineMiddleware("test")
+    request = SimpleNamespace(messages=[HumanMessage("q")])
+
+    async def slow_model(_):
+        await asyncio.sleep(1)
+        return AIMessage("late")
+
+    async def run():
+        with request_deadline(0.05):
+            return await middleware.awrap_model_call(request, slow_model)
+
+    answer = asyncio.run(run())
+
+    assert answer.response_metadata[PARTIAL_MARKER]
+
+
+def test_tool_call_is_cut_off_only_when_limited():
+    async def slow_tool(_):
+        await asyncio.sleep(0.2)
+        return ToolMessage(content="done", tool_call_id="call_1")
+
+    async def run(middleware):
+        with request_deadline(0.05):
+            return await middleware.awrap_tool_call(_tool_request(), slow_tool)
+
+    assert asyncio.run(run(DeadlineMiddleware("test"))).status == "error"
+    assert (
+        asyncio.run(run(DeadlineMiddleware("test", limit_tool_calls=False))).content
+        == "done"
+    )
+
+
+def test_tool_retry_gives_up_when_the_backoff_outlasts_the_deadline():
+    middleware = DeadlineToolRetryMiddleware(
+        max_retries=3, initial_delay=1.0, jitter=False
+    )
+    calls = []
+
+    async def failing_tool(_):
+        calls.append(1)
+        raise ConnectionError("down")
+
+    async def run():
+        with request_deadline(0.5):
+            return await middleware.awrap_tool_call(_tool_request(), failing_tool)
+
+    result = asyncio.run(run())
+
+    assert result.status == "error"
+    assert len(calls) == 1
+
+
+def test_tool_retry_backs_off_within_the_deadline():
+    middleware = DeadlineToolRetryMiddleware(
+        max_retries=2, initial_delay=0.01, jitter=False
+    )
+    calls = []
+
+    async def flaky_tool(_):
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("down")
+        return ToolMessage(content="ok", tool_call_id="call_1")
+
+    async def run():
+        with request_deadline(5):
+            return await middleware.awrap_tool_call(_tool_request(), flaky_tool)
+
+    assert asyncio.run(run()).content == "ok"
+    assert len(calls) == 3
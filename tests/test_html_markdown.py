@@ -0,0 +1,48 @@
+from utils.html_markdown import html_to_markdown, looks_like_html
+
+
+def test_tables_get_a_separator_after_the_header_row():
+    html = (
+        "<table><tbody><tr><th>Env</th><th>Owner</th></tr>"
+        "<tr><td>prod</td><td>SRE</td></tr></tbody></table>"
+    )
+
+    assert html_to_markdown(html) == "| Env | Owner |\n|---|---|\n| prod | SRE |"
+
+
+def test_code_macro_keeps_its_body_verbatim_and_drops_parameters():
+    html = (
+        "<p>Run:</p>"
+        '<ac:structured-macro ac:name="code">'
+        '<ac:parameter ac:name="language">bash</ac:parameter>'
+        "<ac:plain-text-body><![CDATA[make deploy\n  --env <prod>]]></ac:plain-text-body>"
+        "</ac:structured-macro>"
+    )
+
+    assert html_to_markdown(html) == "Run:\n\n```\nmake deploy\n  --env <prod>\n```"
+
+
+def test_links_keep_their_targets_and_page_links_their_titles():
+    html = (
+        '<p>See <a href="https://wiki.example.com/x">the guide</a>, <a href="#top">top</a> and '
+        '<ac:link><ri:page ri:content-title="Runbook" /></ac:link>.</p>'
+    )
+
+    assert (
+        html_to_markdown(html)
+        == "See [the guide](https://wiki.example.com/x), [top] and Runbook."
+    )
+
+
+def test_headings_nested_lists_and_attachments():
+    html = (
+        "<h2>Steps</h2><ol><li>Build</li><li>Ship<ul><li>canary</li></ul></li></ol>"
+        '<ac:image><ri:attachment ri:filename="diagram.png" /></ac:image><p>a&nbsp;b</p>'
+    )
+
+    assert html_to_markdown(html) == "## Steps\n\n1. Build\n2. Ship\n  - canary\n\na b"
+
+
+def test_plain_text_is_not_taken_for_html():
+    assert looks_like_html("<p>one</p><p>two</p>")
+    assert not looks_like_html("if a < b and c > d then <p>")
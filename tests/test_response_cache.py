@@ -0,0 +1,74 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agents.supervisor_agent import (
+    CONFLUENCE_AGENT_NAME,
+    OBSIDIAN_AGENT_NAME,
+    _delegate,
+)
+from utils.response_cache import ResponseCache
+
+
+class FakeAgent:
+    """Sub-agent counting its runs."""
+
+    def __init__(self):
+        self.runs = 0
+
+    async def ainvoke(self, state, context=None):
+        self.runs += 1
+        return {"messages": [AIMessage(f"answer {self.runs}")]}
+
+
+def _ask(agent, agent_name, cache, thread_id, user_message, request):
+    return asyncio.run(
+        _delegate(
+            agent,
+            agent_name,
+            request,
+            [HumanMessage(user_message)],
+            cache,
+            thread_id=thread_id,
+        )
+    )
+
+
+def test_confluence_answers_are_shared_across_threads():
+    cache = ResponseCache(max_entries=16, ttl_seconds=60)
+    agent = FakeAgent()
+
+    first = _ask(
+        agent,
+        CONFLUENCE_AGENT_NAME,
+        cache,
+        "t1",
+        "How do we deploy?",
+        "How do we deploy payments?",
+    )
+    second = _ask(
+        agent,
+        CONFLUENCE_AGENT_NAME,
+        cache,
+        "t2",
+        "deploy payments, please",
+        "how do we deploy payments",
+    )
+
+    assert second == first == ("answer 1", False)
+    assert agent.runs == 1
+    assert cache.hits == 1
+
+
+def test_obsidian_answers_stay_within_their_thread():
+    cache = ResponseCache(max_entries=16, ttl_seconds=60)
+    agent = FakeAgent()
+
+    _ask(agent, OBSIDIAN_AGENT_NAME, cache, "t1", "My notes?", "Find my release notes")
+    _ask(agent, OBSIDIAN_AGENT_NAME, cache, "t1", "My notes?", "Find my release notes")
+    other = _ask(
+        agent, OBSIDIAN_AGENT_NAME, cache, "t2", "My notes?", "Find my release notes"
+    )
+
+    assert other == ("answer 2", False)
+    assert agent.runs == 2
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from middleware.tool_output_budget import (
+    READ_STORED_CONTENT_TOOL,
+    ToolOutputBudgetMiddleware,
+    compact_tool_output,
+)
+from storage.blob_store import BlobStore
+
+MAX_CALL_CHARS = 2000
+
+
+@pytest.fixture
+def middleware(tmp_path):
+    return ToolOutputBudgetMiddleware(
+        BlobStore(str(tmp_path / "blobs")),
+        max_call_chars=MAX_CALL_CHARS,
+        max_turn_chars=10 * MAX_CALL_CHARS,
+        chunk_chars=400,
+    )
+
+
+def _page() -> str:
+    sections = [
+        f"<h2>Section {n}</h2><p>{'Filler text about the service. ' * 12}</p>"
+        for n in range(30)
+    ]
+    sections[20] = (
+        "<h2>Rollback</h2><p>To roll back, run the rollback job with the previous release tag.</p>"
+    )
+    return json.dumps({"title": "Payments runbook", "body": "".join(sections)})
+
+
+def _call(middleware, content: str, name: str = "confluence_get_page"):
+    tool_call = {"name": name, "id": "call_1", "args": {"page_id": "42"}}
+    request = SimpleNamespace(
+        tool=None,
+        tool_call=tool_call,
+        state={
+            "messages": [
+                HumanMessage("How do I roll back payments?"),
+                AIMessage("", tool_calls=[tool_call]),
+            ]
+        },
+    )
+
+    async def handler(_):
+        return ToolMessage(content=content, name=name, tool_call_id="call_1")
+
+    return asyncio.run(middleware.awrap_tool_call(request, handler))
+
+
+def _read_all(middleware, content_id: str) -> str:
+    read_stored_content = middleware.tools[0]
+    assert read_stored_content.name == READ_STORED_CONTENT_TOOL
+
+    parts, offset = [], 0
+    while True:
+        page = asyncio.run(
+            read_stored_content.ainvoke({"content_id": content_id, "offset": offset})
+        )
+        header, text = page.split("\n", 1)
+        parts.append(text)
+        more = re.search(r"Next offset: (\d+)", header)
+        if more is None:
+            return "".join(parts)
+        offset = int(more.group(1))
+
+
+def test_oversized_result_keeps_relevant_parts_and_round_trips_through_the_blob_store(
+    middleware,
+):
+    result = _call(middleware, _page())
+
+    assert len(result.content) <= MAX_CALL_CHARS
+    assert "roll back, run the rollback job" in result.content
+    content_id = re.search(r"Full content id: ([\w-]+)", result.content).group(1)
+    assert _read_all(middleware, content_id) == compact_tool_output(_page())
+
+
+def test_small_results_are_left_alone(middleware):
+    assert _call(middleware, "short answer").content == "short answer"
+
+
+def test_html_is_converted_even_within_budget(middleware):
+    result = _call(middleware, json.dumps({"body": "<p>Hello</p><p>world</p>"}))
+
+    assert json.loads(result.content) == {"body": "Hello\n\nworld"}
+
+
+def test_unknown_content_ids_are_reported(middleware):
+    answer = asyncio.run(middleware.tools[0].ainvoke({"content_id": "missing"}))
+
+    assert answer == "No stored content with id missing."
@@ -0,0 +1,71 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import StructuredTool
+
+from config.settings import settings
+from middleware.tool_selection import ToolSelectionMiddleware
+
+
+def _tool(name: str, description: str) -> StructuredTool:
+    return StructuredTool.from_function(
+        lambda page_id: page_id, name=name, description=description
+    )
+
+
+# More tools than any usual top-k, each matching a different task
+TOOLS = [_tool("confluence_search", "Search Confluence pages with CQL.")] + [
+    _tool(f"confluence_get_{thing}", f"Read the {thing} of a Confluence page.")
+    for thing in (
+        "page",
+        "comments",
+        "labels",
+        "attachments",
+        "children",
+        "ancestors",
+        "history",
+        "versions",
+        "restrictions",
+        "watchers",
+        "likes",
+    )
+]
+
+
+def _prefix(middleware: ToolSelectionMiddleware, task: str) -> str:
+    """System prompt and bound tool schemas of the first model call for the task."""
+    request = SimpleNamespace(
+        system_prompt="You answer from Confluence.",
+        tools=TOOLS,
+        messages=[HumanMessage(task)],
+        override=lambda **changes: SimpleNamespace(**{**vars(request), **changes}),
+    )
+
+    async def model(request):
+        return json.dumps([request.system_prompt, request.tools], sort_keys=True)
+
+    return asyncio.run(middleware.awrap_model_call(request, model))
+
+
+def test_default_selection_keeps_the_prefix_stable_across_tasks():
+    middleware = ToolSelectionMiddleware(TOOLS, top_k=settings.TOOL_SELECTION_TOP_K)
+
+    assert _prefix(middleware, "Show the watchers of the release page") == _prefix(
+        middleware, "List the restrictions of the architecture page"
+    )
+
+
+def test_top_k_binds_the_tools_ranked_for_the_task():
+    middleware = ToolSelectionMiddleware(
+        TOOLS, top_k=2, always_include=["confluence_search"]
+    )
+
+    selected = middleware.select(
+        [t.name for t in TOOLS], "comments of the release page"
+    )
+
+    assert "confluence_get_comments" in selected
+    assert "confluence_search" in selected
+    assert len(selected) < len(TOOLS)